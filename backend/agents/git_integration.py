@@ -18,7 +18,6 @@ import re
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Optional, Dict, Any
-from uuid import uuid4
 
 try:
     from git import Repo, Commit, GitCommandError
@@ -42,6 +41,7 @@ from ..models.git_trace import (
     CodeEvolution,
     GitN2CorrelationResult,
 )
+from ..database.base import new_uuid7_str
 from ..database.repositories import GitTraceRepository
 from ..models.trace import CognitiveTrace
 
@@ -79,6 +79,7 @@ class GitIntegrationAgent:
         student_id: str,
         activity_id: str,
         cognitive_traces: Optional[List[CognitiveTrace]] = None,
+        persist: bool = True,
     ) -> GitTrace:
         """
         Capture a Git commit as a N2-level trace
@@ -90,6 +91,7 @@ class GitIntegrationAgent:
             student_id: Student ID
             activity_id: Activity ID
             cognitive_traces: Related N4 cognitive traces for correlation
+            persist: If False, skip persistence (el caller persiste en lote)
 
         Returns:
             GitTrace instance
@@ -117,7 +119,7 @@ class GitIntegrationAgent:
 
         # Create GitTrace
         git_trace = GitTrace(
-            id=str(uuid4()),
+            id=new_uuid7_str(),
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
@@ -147,33 +149,8 @@ class GitIntegrationAgent:
         )
 
         # Persist to database if repository is available
-        if self.git_trace_repo:
-            self.git_trace_repo.create(
-                session_id=git_trace.session_id,
-                student_id=git_trace.student_id,
-                activity_id=git_trace.activity_id,
-                event_type=git_trace.event_type.value,
-                commit_hash=git_trace.commit_hash,
-                commit_message=git_trace.commit_message,
-                author_name=git_trace.author_name,
-                author_email=git_trace.author_email,
-                timestamp=git_trace.timestamp,
-                branch_name=git_trace.branch_name,
-                parent_commits=git_trace.parent_commits,
-                files_changed=[f.model_dump() for f in git_trace.files_changed],
-                total_lines_added=git_trace.total_lines_added,
-                total_lines_deleted=git_trace.total_lines_deleted,
-                diff=git_trace.diff,
-                is_merge=git_trace.is_merge,
-                is_revert=git_trace.is_revert,
-                detected_patterns=[p.value for p in git_trace.detected_patterns],
-                complexity_delta=git_trace.complexity_delta,
-                related_cognitive_traces=git_trace.related_cognitive_traces,
-                cognitive_state_during_commit=git_trace.cognitive_state_during_commit,
-                time_since_last_interaction_minutes=git_trace.time_since_last_interaction_minutes,
-                repo_path=git_trace.repo_path,
-                remote_url=git_trace.remote_url,
-            )
+        if self.git_trace_repo and persist:
+            self.git_trace_repo.create(**self._trace_row(git_trace))
 
         logger.info(
             "Git commit captured",
@@ -223,6 +200,7 @@ class GitIntegrationAgent:
                     student_id=student_id,
                     activity_id=activity_id,
                     cognitive_traces=cognitive_traces,
+                    persist=False,
                 )
                 git_traces.append(git_trace)
             except Exception as e:
@@ -232,12 +210,48 @@ class GitIntegrationAgent:
                     extra={"commit_hash": commit.hexsha, "session_id": session_id},
                 )
 
+        # Persistir todo el historial en una sola transacción
+        if self.git_trace_repo and git_traces:
+            self.git_trace_repo.bulk_create(
+                [self._trace_row(git_trace) for git_trace in git_traces]
+            )
+
         logger.info(
             f"Captured {len(git_traces)} commits for session",
             extra={"session_id": session_id, "total_commits": len(git_traces)},
         )
         return git_traces
 
+    @staticmethod
+    def _trace_row(git_trace: GitTrace) -> dict:
+        """Campos de GitTraceRepository.create()/bulk_create() para un GitTrace"""
+        return dict(
+            session_id=git_trace.session_id,
+            student_id=git_trace.student_id,
+            activity_id=git_trace.activity_id,
+            event_type=git_trace.event_type.value,
+            commit_hash=git_trace.commit_hash,
+            commit_message=git_trace.commit_message,
+            author_name=git_trace.author_name,
+            author_email=git_trace.author_email,
+            timestamp=git_trace.timestamp,
+            branch_name=git_trace.branch_name,
+            parent_commits=git_trace.parent_commits,
+            files_changed=[f.model_dump() for f in git_trace.files_changed],
+            total_lines_added=git_trace.total_lines_added,
+            total_lines_deleted=git_trace.total_lines_deleted,
+            diff=git_trace.diff,
+            is_merge=git_trace.is_merge,
+            is_revert=git_trace.is_revert,
+            detected_patterns=[p.value for p in git_trace.detected_patterns],
+            complexity_delta=git_trace.complexity_delta,
+            related_cognitive_traces=git_trace.related_cognitive_traces,
+            cognitive_state_during_commit=git_trace.cognitive_state_during_commit,
+            time_since_last_interaction_minutes=git_trace.time_since_last_interaction_minutes,
+            repo_path=git_trace.repo_path,
+            remote_url=git_trace.remote_url,
+        )
+
     def analyze_code_evolution(
         self, session_id: str, git_traces: List[GitTrace]
     ) -> CodeEvolution:
@@ -11,12 +11,15 @@ from sqlalchemy.orm import Session
 from ..database import get_db_session
 from ..database.repositories import (
     EvaluationRepository,
+    LTIDeploymentRepository,
     RiskRepository,
     SessionRepository,
     TraceRepository,
     TraceSequenceRepository,
     UserRepository,
 )
+from ..database.user_cache import get_user_cache
+from ..database.lti_cache import get_lti_deployment_cache
 from ..core import AIGateway
 from ..core.cache import get_llm_cache
 from ..llm import LLMProviderFactory
@@ -77,8 +80,13 @@ def get_sequence_repository(db: Session = Depends(get_db)) -> TraceSequenceRepos
 
 
 def get_user_repository(db: Session = Depends(get_db)) -> UserRepository:
-    """Dependency para obtener el repositorio de usuarios"""
-    return UserRepository(db)
+    """Dependency para obtener el repositorio de usuarios (con cache TTL de lookups)"""
+    return UserRepository(db, cache=get_user_cache())
+
+
+def get_lti_deployment_repository(db: Session = Depends(get_db)) -> LTIDeploymentRepository:
+    """Dependency para obtener el repositorio de deployments LTI (con cache TTL por issuer)"""
+    return LTIDeploymentRepository(db, cache=get_lti_deployment_cache())
 
 
 # =============================================================================
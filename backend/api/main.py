@@ -9,7 +9,9 @@ Arquitectura C4 Extendida + Clean Architecture + Repository Pattern
 Autores: AI-Native Research Team
 Versión: 0.1.0
 """
+import asyncio
 import logging
+import os
 import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -75,6 +77,13 @@ async def lifespan(app: FastAPI):
         app: Instancia de FastAPI
     """
     # Startup
+    # Logging en cola: los handlers (stdout/red) corren en un thread aparte,
+    # fuera del camino de cada request. LOG_QUEUE_ENABLED=false lo desactiva.
+    queue_logging = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+    if queue_logging:
+        from ..core.structured_logging import start_queue_logging
+        start_queue_logging()
+
     logger.info("=" * 80)
     logger.info("AI-Native MVP - Starting up")
     logger.info(f"Version: {__version__}")
@@ -101,6 +110,30 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    # Pre-compilar los statements del hot path (evita el pico del primer request)
+    try:
+        from ..database.config import get_session
+        from ..database.repositories import warm_statement_cache
+        warmup_db = get_session()
+        try:
+            warmed = warm_statement_cache(warmup_db)
+        finally:
+            warmup_db.close()
+        logger.info(f"Statement cache warmed up ({warmed} statements)")
+    except Exception as e:
+        logger.warning(f"Statement cache warm-up failed (non-critical): {e}")
+
+    # Cargar el modelo del LLM provider en background (Ollama: evita el cold
+    # start del primer generate; otros providers no tienen warmup)
+    llm_warmup_task = None
+    try:
+        from .deps import get_llm_provider
+        llm_warmup = getattr(get_llm_provider(), "warmup", None)
+        if llm_warmup:
+            llm_warmup_task = asyncio.create_task(llm_warmup())
+    except Exception as e:
+        logger.warning(f"LLM provider warm-up failed (non-critical): {e}")
+
     # Inicializar Prometheus metrics
     try:
         logger.info("Initializing Prometheus metrics...")
@@ -110,10 +143,51 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to initialize Prometheus metrics (non-critical): {e}")
 
+    # Write-behind de last_login/login_count (flush en lote cada 500 ms)
+    from ..database.config import get_db_config
+    from ..database.login_buffer import get_login_buffer, run_login_flusher
+    login_flusher = asyncio.create_task(
+        run_login_flusher(get_login_buffer(), get_db_config().get_session_factory())
+    )
+
+    # Write-behind de pasos de diagnóstico de incidentes (flush en lote cada 500 ms)
+    from ..database.diagnosis_buffer import get_diagnosis_buffer, run_diagnosis_flusher
+    diagnosis_flusher = asyncio.create_task(
+        run_diagnosis_flusher(get_diagnosis_buffer(), get_db_config().get_session_factory())
+    )
+
+    # Transactional outbox: notificaciones de alertas fuera del request
+    from ..database.outbox import get_outbox_dispatcher, run_outbox_dispatcher
+    outbox_dispatcher = asyncio.create_task(
+        run_outbox_dispatcher(get_outbox_dispatcher(), get_db_config().get_session_factory())
+    )
+
     yield  # Aplicación en ejecución
 
     # Shutdown
     logger.info("AI-Native MVP - Shutting down")
+    if llm_warmup_task is not None:
+        llm_warmup_task.cancel()
+        try:
+            await llm_warmup_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"LLM provider warm-up failed (non-critical): {e}")
+    for task in (login_flusher, diagnosis_flusher, outbox_dispatcher):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    # Pools HTTP compartidos de los providers Ollama
+    from ..llm.ollama_provider import close_shared_clients
+    await close_shared_clients()
+
+    if queue_logging:
+        from ..core.structured_logging import stop_queue_logging
+        stop_queue_logging()
 
 
 # =============================================================================
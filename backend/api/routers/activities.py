@@ -8,7 +8,6 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, select
 
 from ...database.repositories import ActivityRepository
-from ...database.models import ActivityDB
 from ..deps import get_db
 from ..schemas.activity import (
     ActivityCreate,
@@ -96,26 +95,24 @@ async def create_activity(
             }
         }
     """
-    # Verificar que no exista ya
-    existing = activity_repo.get_by_activity_id(activity_data.activity_id)
-    if existing:
+    # Crear actividad en la base de datos (el UNIQUE constraint detecta duplicados)
+    try:
+        db_activity = activity_repo.create(
+            activity_id=activity_data.activity_id,
+            title=activity_data.title,
+            instructions=activity_data.instructions,
+            teacher_id=activity_data.teacher_id,
+            policies=activity_data.policies.model_dump(),  # Convertir PolicyConfig a dict
+            description=activity_data.description,
+            evaluation_criteria=activity_data.evaluation_criteria or [],
+            subject=activity_data.subject,
+            difficulty=activity_data.difficulty,
+            estimated_duration_minutes=activity_data.estimated_duration_minutes,
+            tags=activity_data.tags or [],
+        )
+    except ValueError:
         raise ActivityAlreadyExistsError(activity_data.activity_id)
 
-    # Crear actividad en la base de datos
-    db_activity = activity_repo.create(
-        activity_id=activity_data.activity_id,
-        title=activity_data.title,
-        instructions=activity_data.instructions,
-        teacher_id=activity_data.teacher_id,
-        policies=activity_data.policies.model_dump(),  # Convertir PolicyConfig a dict
-        description=activity_data.description,
-        evaluation_criteria=activity_data.evaluation_criteria or [],
-        subject=activity_data.subject,
-        difficulty=activity_data.difficulty,
-        estimated_duration_minutes=activity_data.estimated_duration_minutes,
-        tags=activity_data.tags or [],
-    )
-
     # Convertir a schema de respuesta
     response_data = ActivityResponse.model_validate(db_activity)
 
@@ -140,7 +137,6 @@ async def list_activities(
     page: int = Query(1, ge=MIN_PAGE_SIZE, description="Número de página"),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=MIN_PAGE_SIZE, le=MAX_PAGE_SIZE, description="Elementos por página"),
     activity_repo: ActivityRepository = Depends(get_activity_repository),
-    db: Session = Depends(get_db),
 ) -> PaginatedResponse[ActivityResponse]:
     """
     Lista actividades con filtros y paginación.
@@ -153,43 +149,27 @@ async def list_activities(
         page: Número de página (default: 1)
         page_size: Elementos por página (default: 20, max: 100)
         activity_repo: Repositorio de actividades (inyectado)
-        db: Sesión de base de datos (inyectado)
 
     Returns:
         PaginatedResponse con lista de actividades
     """
-    # Construir query base con filtros
-    query = db.query(ActivityDB)
-
-    if teacher_id:
-        query = query.filter(ActivityDB.teacher_id == teacher_id)
-    if status:
-        query = query.filter(ActivityDB.status == status)
-    if subject:
-        query = query.filter(ActivityDB.subject == subject)
-    if difficulty:
-        query = query.filter(ActivityDB.difficulty == difficulty)
+    filters = dict(
+        teacher_id=teacher_id, status=status, subject=subject, difficulty=difficulty
+    )
 
     # Contar total de elementos
-    total_items = query.count()
+    total_items = activity_repo.count(**filters)
 
     # Calcular paginación
     offset = (page - 1) * page_size
     total_pages = (total_items + page_size - 1) // page_size
 
-    # Aplicar paginación y ordenar por fecha de creación descendente
-    db_activities = (
-        query.order_by(ActivityDB.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
-        .all()
-    )
+    # Página ordenada por fecha de creación descendente, proyectada como filas
+    # (sin hidratar instancias ORM: el listado solo se serializa)
+    rows = activity_repo.list_rows(**filters, offset=offset, limit=page_size)
 
     # Convertir a schemas de respuesta
-    activities_data = [
-        ActivityResponse.model_validate(activity)
-        for activity in db_activities
-    ]
+    activities_data = [ActivityResponse.model_validate(row) for row in rows]
 
     # Crear metadatos de paginación
     pagination_meta = PaginationMeta(
@@ -8,6 +8,7 @@ from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, List
 
 from backend.database.config import get_db
+from backend.database.login_buffer import get_login_buffer
 from backend.models.user import User, UserRole
 from backend.core.security import (
     verify_password,
@@ -128,6 +129,10 @@ async def login(
             detail="User account is disabled"
         )
     
+    # Registrar login: sin read-modify-write de login_count en el request, el
+    # flusher lo incrementa en SQL (login_count + n) con un UPDATE por lote
+    get_login_buffer().record(user.id)
+
     # Create token
     access_token = create_access_token(data={"sub": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
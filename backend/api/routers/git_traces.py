@@ -21,7 +21,13 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from ..deps import get_db, get_session_repository, get_trace_repository
-from ...database.repositories import GitTraceRepository, SessionRepository, TraceRepository
+from ...database.repositories import (
+    GIT_TRACE_AUTHOR_COLUMNS,
+    GitTraceRepository,
+    SessionRepository,
+    TraceRepository,
+)
+from ...database.models import GitTraceDB
 from ...agents.git_integration import GitIntegrationAgent
 from ...models.git_trace import GitTrace, CodeEvolution, GitN2CorrelationResult
 from ..schemas.common import APIResponse
@@ -160,6 +166,20 @@ class CodeEvolutionResponse(BaseModel):
     commit_timeline: List[dict]
 
 
+class GitSessionSummaryResponse(BaseModel):
+    """Response with SQL-aggregated commit metrics for a session"""
+
+    session_id: str
+    total_commits: int
+    total_lines_added: int
+    total_lines_deleted: int
+    net_lines_change: int
+    complexity_delta: int
+    first_commit_at: Optional[datetime]
+    last_commit_at: Optional[datetime]
+    daily_activity: List[dict]
+
+
 class CorrelationResponse(BaseModel):
     """Response with Git-Cognitive correlation"""
 
@@ -264,6 +284,26 @@ async def sync_git_commits(
         )
 
 
+# Columnas que renderiza GET /session/{session_id} (sin diff ni parent_commits)
+_SESSION_TRACE_COLUMNS = (
+    GitTraceDB.id,
+    GitTraceDB.commit_hash,
+    GitTraceDB.commit_message,
+    *GIT_TRACE_AUTHOR_COLUMNS,
+    GitTraceDB.timestamp,
+    GitTraceDB.branch_name,
+    GitTraceDB.event_type,
+    GitTraceDB.files_changed,
+    GitTraceDB.total_lines_added,
+    GitTraceDB.total_lines_deleted,
+    GitTraceDB.is_merge,
+    GitTraceDB.is_revert,
+    GitTraceDB.detected_patterns,
+    GitTraceDB.cognitive_state_during_commit,
+    GitTraceDB.time_since_last_interaction_minutes,
+)
+
+
 @router.get(
     "/session/{session_id}",
     response_model=APIResponse[List[dict]],
@@ -280,37 +320,38 @@ async def get_session_git_traces(
     Returns list of commits with metadata and analysis.
     """
     git_trace_repo = GitTraceRepository(db)
-    git_traces = git_trace_repo.get_by_session(session_id)
+    # Proyección sin diff ni columnas JSON no usadas, en streaming
+    rows = git_trace_repo.iter_by_session(session_id, columns=_SESSION_TRACE_COLUMNS)
+
+    traces_data = [
+        {
+            "id": t["id"],
+            "commit_hash": t["commit_hash"],
+            "commit_message": t["commit_message"],
+            "author_name": t["author_name"],
+            "author_email": t["author_email"],
+            "timestamp": t["timestamp"].isoformat(),
+            "branch_name": t["branch_name"],
+            "event_type": t["event_type"],
+            "files_changed": len(t["files_changed"] or []),
+            "total_lines_added": t["total_lines_added"],
+            "total_lines_deleted": t["total_lines_deleted"],
+            "is_merge": t["is_merge"],
+            "is_revert": t["is_revert"],
+            "detected_patterns": t["detected_patterns"],
+            "cognitive_state_during_commit": t["cognitive_state_during_commit"],
+            "time_since_last_interaction_minutes": t["time_since_last_interaction_minutes"],
+        }
+        for t in rows
+    ]
 
-    if not git_traces:
+    if not traces_data:
         return APIResponse(
             success=True,
             data=[],
             message=f"No Git traces found for session '{session_id}'",
         )
 
-    traces_data = [
-        {
-            "id": t.id,
-            "commit_hash": t.commit_hash,
-            "commit_message": t.commit_message,
-            "author_name": t.author_name,
-            "author_email": t.author_email,
-            "timestamp": t.timestamp.isoformat(),
-            "branch_name": t.branch_name,
-            "event_type": t.event_type,
-            "files_changed": len(t.files_changed),
-            "total_lines_added": t.total_lines_added,
-            "total_lines_deleted": t.total_lines_deleted,
-            "is_merge": t.is_merge,
-            "is_revert": t.is_revert,
-            "detected_patterns": t.detected_patterns,
-            "cognitive_state_during_commit": t.cognitive_state_during_commit,
-            "time_since_last_interaction_minutes": t.time_since_last_interaction_minutes,
-        }
-        for t in git_traces
-    ]
-
     logger.info(
         "Git traces retrieved",
         extra={"session_id": session_id, "count": len(traces_data)},
@@ -323,6 +364,48 @@ async def get_session_git_traces(
     )
 
 
+@router.get(
+    "/session/{session_id}/summary",
+    response_model=APIResponse[GitSessionSummaryResponse],
+    summary="Get aggregated commit metrics",
+    description="Commit counts, line totals and per-day activity for a session, aggregated in SQL",
+)
+async def get_session_git_summary(
+    session_id: str,
+    db: Session = Depends(get_db),
+) -> APIResponse[GitSessionSummaryResponse]:
+    """
+    Get aggregated Git metrics for a session
+
+    A diferencia de /evolution no carga las trazas: totales y bins diarios
+    salen de dos queries de agregación.
+    """
+    git_trace_repo = GitTraceRepository(db)
+    summary = git_trace_repo.summary_by_session(session_id)
+
+    if not summary["commits"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No Git traces found for session '{session_id}'",
+        )
+
+    return APIResponse(
+        success=True,
+        data=GitSessionSummaryResponse(
+            session_id=session_id,
+            total_commits=summary["commits"],
+            total_lines_added=summary["lines_added"],
+            total_lines_deleted=summary["lines_deleted"],
+            net_lines_change=summary["lines_added"] - summary["lines_deleted"],
+            complexity_delta=summary["complexity_delta"],
+            first_commit_at=summary["first_commit_at"],
+            last_commit_at=summary["last_commit_at"],
+            daily_activity=git_trace_repo.daily_activity_by_session(session_id),
+        ),
+        message="Git summary retrieved",
+    )
+
+
 @router.get(
     "/session/{session_id}/evolution",
     response_model=APIResponse[CodeEvolutionResponse],
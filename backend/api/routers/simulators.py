@@ -5,6 +5,7 @@ Sprint 3 - HU-EST-009, HU-SYS-006
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from datetime import datetime, timezone
 from typing import List, Optional
 
 from ..deps import get_db, get_session_repository, get_trace_repository, get_llm_provider
@@ -356,6 +357,9 @@ from ...database.repositories import (
     InterviewSessionRepository,
     IncidentSimulationRepository,
 )
+from ...database.transaction import unit_of_work
+from ...database.diagnosis_buffer import WRITE_BEHIND_ENABLED, get_diagnosis_buffer
+from fastapi.concurrency import run_in_threadpool
 import logging
 
 logger_sprint6 = logging.getLogger(__name__)
@@ -397,17 +401,8 @@ async def start_interview(
                 detail=f"Session '{request.session_id}' not found",
             )
 
-        # Create interview session
-        interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.create(
-            session_id=request.session_id,
-            student_id=request.student_id,
-            interview_type=request.interview_type,
-            activity_id=request.activity_id,
-            difficulty_level=request.difficulty_level,
-        )
-
-        # Initialize simulator and generate first question
+        # Initialize simulator and generate first question (antes de abrir
+        # la transacción: no se retienen locks durante la llamada al LLM)
         llm_provider = LLMProviderFactory.create_from_env()
         simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
 
@@ -417,13 +412,22 @@ async def start_interview(
             contexto=f"Estudiante: {request.student_id}, Actividad: {request.activity_id}",
         )
 
-        # Add first question to interview
-        question_data = {
-            "question": first_question,
-            "type": request.interview_type,
-            "timestamp": interview.created_at.isoformat(),
-        }
-        interview = interview_repo.add_question(interview.id, question_data)
+        # Create interview session + first question: un solo COMMIT
+        interview_repo = InterviewSessionRepository(db)
+        with unit_of_work(db):
+            interview = interview_repo.create(
+                session_id=request.session_id,
+                student_id=request.student_id,
+                interview_type=request.interview_type,
+                activity_id=request.activity_id,
+                difficulty_level=request.difficulty_level,
+            )
+            question_data = {
+                "question": first_question,
+                "type": request.interview_type,
+                "timestamp": interview.created_at.isoformat(),
+            }
+            interview = interview_repo.add_question(interview.id, question_data)
 
         logger_sprint6.info(
             "Interview started",
@@ -505,15 +509,8 @@ async def submit_interview_response(
             tipo_entrevista=interview.interview_type,
         )
 
-        # Add response with evaluation
-        response_data = {
-            "response": request.response,
-            "timestamp": interview.updated_at.isoformat(),
-            "evaluation": evaluation,
-        }
-        interview = interview_repo.add_response(interview.id, response_data)
-
         # Generate next question if interview not complete
+        next_question = None
         if len(interview.questions_asked) < 5:  # Max 5 questions per interview
             next_question = simulator.generar_pregunta_entrevista(
                 tipo_entrevista=interview.interview_type,
@@ -521,12 +518,21 @@ async def submit_interview_response(
                 contexto=f"Preguntas previas: {len(interview.questions_asked)}",
             )
 
-            question_data = {
-                "question": next_question,
-                "type": interview.interview_type,
-                "timestamp": interview.updated_at.isoformat(),
-            }
-            interview = interview_repo.add_question(interview.id, question_data)
+        # Add response with evaluation (+ next question): un solo COMMIT
+        response_data = {
+            "response": request.response,
+            "timestamp": interview.updated_at.isoformat(),
+            "evaluation": evaluation,
+        }
+        with unit_of_work(db):
+            interview = interview_repo.add_response(interview.id, response_data)
+            if next_question is not None:
+                question_data = {
+                    "question": next_question,
+                    "type": interview.interview_type,
+                    "timestamp": interview.updated_at.isoformat(),
+                }
+                interview = interview_repo.add_question(interview.id, question_data)
 
         logger_sprint6.info(
             "Interview response processed",
@@ -579,7 +585,7 @@ async def complete_interview(
     """
     try:
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.get_by_id(request.interview_id)
+        interview = interview_repo.get_by_id(request.interview_id, load_history=True)
 
         if not interview:
             raise HTTPException(
@@ -661,7 +667,7 @@ async def get_interview(
     """Obtiene detalles completos de una entrevista técnica (SPRINT 6)"""
     try:
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.get_by_id(interview_id)
+        interview = interview_repo.get_by_id(interview_id, load_history=True)
 
         if not interview:
             raise HTTPException(
@@ -810,7 +816,33 @@ async def add_diagnosis_step(
     """
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(request.incident_id)
+        # updated_at no avanza con cada paso del write-behind, así que el paso
+        # lleva su propio timestamp
+        diagnosis_step = {
+            "action": request.action,
+            "finding": request.finding,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+        def _record_step():
+            if not WRITE_BEHIND_ENABLED:
+                # Persistido antes de responder: visible para cualquier worker
+                incident = incident_repo.add_diagnosis_step(request.incident_id, diagnosis_step)
+                return incident, incident.diagnosis_process if incident else []
+
+            # Write-behind (un solo worker): se persiste en el próximo flush
+            diagnosis_buffer = get_diagnosis_buffer()
+            incident, pending_steps = diagnosis_buffer.read(
+                request.incident_id,
+                lambda: incident_repo.get_by_id(request.incident_id, load_history=True),
+            )
+            if not incident:
+                return None, []
+            diagnosis_buffer.enqueue(incident.id, diagnosis_step)
+            return incident, incident.diagnosis_process + pending_steps + [diagnosis_step]
+
+        # En un thread: read() puede esperar el _flush_lock del flusher
+        incident, diagnosis_process = await run_in_threadpool(_record_step)
 
         if not incident:
             raise HTTPException(
@@ -818,19 +850,11 @@ async def add_diagnosis_step(
                 detail=f"Incident '{request.incident_id}' not found",
             )
 
-        # Add diagnosis step
-        diagnosis_step = {
-            "action": request.action,
-            "finding": request.finding,
-            "timestamp": incident.updated_at.isoformat(),
-        }
-        incident = incident_repo.add_diagnosis_step(incident.id, diagnosis_step)
-
         logger_sprint6.info(
             "Diagnosis step added",
             extra={
                 "incident_id": incident.id,
-                "step_count": len(incident.diagnosis_process),
+                "step_count": len(diagnosis_process),
             },
         )
 
@@ -845,7 +869,7 @@ async def add_diagnosis_step(
                 incident_description=incident.incident_description,
                 simulated_logs=incident.simulated_logs,
                 simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
+                diagnosis_process=diagnosis_process,
                 solution_proposed=incident.solution_proposed,
                 root_cause_identified=incident.root_cause_identified,
                 created_at=incident.created_at,
@@ -885,7 +909,11 @@ async def resolve_incident(
     """
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(request.incident_id)
+        # Persistir los pasos pendientes del write-behind antes de evaluar (en
+        # un thread: flush() toma el _flush_lock y hace I/O sincrónico)
+        if WRITE_BEHIND_ENABLED:
+            await run_in_threadpool(get_diagnosis_buffer().flush, db, request.incident_id)
+        incident = incident_repo.get_by_id(request.incident_id, load_history=True)
 
         if not incident:
             raise HTTPException(
@@ -975,7 +1003,11 @@ async def get_incident(
     """Obtiene detalles completos de un incidente simulado (SPRINT 6)"""
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(incident_id)
+        incident, pending_steps = await run_in_threadpool(
+            get_diagnosis_buffer().read,
+            incident_id,
+            lambda: incident_repo.get_by_id(incident_id, load_history=True),
+        )
 
         if not incident:
             raise HTTPException(
@@ -994,7 +1026,7 @@ async def get_incident(
                 incident_description=incident.incident_description,
                 simulated_logs=incident.simulated_logs,
                 simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
+                diagnosis_process=incident.diagnosis_process + pending_steps,
                 solution_proposed=incident.solution_proposed,
                 root_cause_identified=incident.root_cause_identified,
                 time_to_diagnose_minutes=incident.time_to_diagnose_minutes,
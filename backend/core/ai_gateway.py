@@ -11,13 +11,13 @@ REFACTORIZADO (2025-11-19):
 """
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import uuid
 import logging
 
 from .cognitive_engine import CognitiveReasoningEngine, AgentMode
 from ..models.trace import CognitiveTrace, TraceLevel, InteractionType, TraceSequence
 from ..models.risk import Risk, RiskType, RiskLevel, RiskDimension, RiskReport
 from ..models.evaluation import EvaluationReport
+from ..database.base import new_uuid7_str
 from ..llm import LLMProviderFactory, LLMProvider, LLMMessage, LLMRole
 from .cache import LLMResponseCache
 from ..agents.governance import GobernanzaAgent
@@ -157,7 +157,7 @@ class AIGateway:
             Si no, solo retorna el ID (backward compatibility para CLI).
         """
         if session_id is None:
-            session_id = str(uuid.uuid4())
+            session_id = new_uuid7_str()
 
         # ✅ STATELESS: Persistir en BD via repositorio (si está inyectado)
         if self.session_repo is not None:
@@ -660,7 +660,7 @@ Por favor, reformulá tu pregunta con más detalles.
         **kwargs
     ) -> CognitiveTrace:
         """Crea una traza cognitiva (no la persiste aún)"""
-        trace_id = str(uuid.uuid4())
+        trace_id = new_uuid7_str()
 
         return CognitiveTrace(
             id=trace_id,
@@ -870,7 +870,7 @@ Por favor, reformulá tu pregunta con más detalles.
     ) -> Risk:
         """Crea un objeto Risk (sin persistirlo aún)"""
         return Risk(
-            id=str(uuid.uuid4()),
+            id=new_uuid7_str(),
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
@@ -898,7 +898,7 @@ Por favor, reformulá tu pregunta con más detalles.
     ) -> Optional[Risk]:
         """Registra un riesgo detectado en BD (STATELESS)"""
         risk = Risk(
-            id=str(uuid.uuid4()),
+            id=new_uuid7_str(),
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
@@ -1169,8 +1169,8 @@ Por favor, reformulá tu pregunta con más detalles.
             activity_id=activity_id
         )
 
-        for db_risk in risks:
-            risk = Risk(
+        report.add_risks([
+            Risk(
                 id=db_risk.id,
                 student_id=db_risk.student_id,
                 activity_id=db_risk.activity_id,
@@ -1181,7 +1181,8 @@ Por favor, reformulá tu pregunta con más detalles.
                 evidence=db_risk.evidence or [],
                 trace_ids=db_risk.trace_ids or [],
             )
-            report.add_risk(risk)
+            for db_risk in risks
+        ])
 
         return report
 
@@ -5,10 +5,10 @@ Extraído de AIGateway como parte de la refactorización God Class → component
 """
 from typing import Dict, Any, Optional, List
 import logging
-import uuid
 
 from ..models.trace import CognitiveTrace, TraceSequence
 from ..models.risk import Risk, RiskType, RiskLevel, RiskDimension, RiskReport
+from ..database.base import new_uuid7_str
 from ..database.repositories import RiskRepository
 from ..agents.risk_analyst import AnalistaRiesgoAgent
 
@@ -212,8 +212,8 @@ class RiskAnalyzer:
             activity_id=activity_id
         )
 
-        for db_risk in risks:
-            risk = Risk(
+        report.add_risks([
+            Risk(
                 id=db_risk.id,
                 session_id=db_risk.session_id,
                 student_id=db_risk.student_id,
@@ -228,7 +228,8 @@ class RiskAnalyzer:
                 resolved=db_risk.resolved,
                 resolution_notes=db_risk.resolution_notes
             )
-            report.add_risk(risk)
+            for db_risk in risks
+        ])
 
         logger.debug(
             f"Risk report retrieved for {student_id}/{activity_id}",
@@ -273,7 +274,7 @@ class RiskAnalyzer:
             Risk creado o None si falló
         """
         risk = Risk(
-            id=str(uuid.uuid4()),
+            id=new_uuid7_str(),
             student_id=student_id,
             activity_id=activity_id,
             risk_type=risk_type,
@@ -336,7 +337,7 @@ class RiskAnalyzer:
 
         if is_delegation:
             return Risk(
-                id=str(uuid.uuid4()),
+                id=new_uuid7_str(),
                 session_id=session_id,
                 student_id=input_trace.student_id,
                 activity_id=input_trace.activity_id,
@@ -367,7 +368,7 @@ class RiskAnalyzer:
         # Prompts muy cortos sin contexto ni razonamiento
         if len(prompt) < 20:
             return Risk(
-                id=str(uuid.uuid4()),
+                id=new_uuid7_str(),
                 session_id=session_id,
                 student_id=input_trace.student_id,
                 activity_id=input_trace.activity_id,
@@ -1,11 +1,15 @@
 """
 Logging estructurado con formato JSON y contexto
 """
+import copy
 import logging
 import json
+import queue
 import sys
+import threading
 from datetime import datetime
-from typing import Any, Dict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Tuple
 import traceback
 from contextvars import ContextVar
 
@@ -14,6 +18,18 @@ request_id_var: ContextVar[str] = ContextVar('request_id', default='')
 correlation_id_var: ContextVar[str] = ContextVar('correlation_id', default='')
 user_id_var: ContextVar[str] = ContextVar('user_id', default='')
 
+_CONTEXT_VARS = (
+    ("request_id", request_id_var),
+    ("correlation_id", correlation_id_var),
+    ("user_id", user_id_var),
+)
+
+
+def _context_value(record: logging.LogRecord, name: str, var: ContextVar) -> str:
+    """Contexto capturado en el record (logging en cola) o el del thread actual"""
+    value = getattr(record, name, None)
+    return value if value is not None else var.get()
+
 class StructuredLogger(logging.Logger):
     """Logger personalizado con soporte para logs estructurados"""
     
@@ -95,17 +111,10 @@ class JSONFormatter(logging.Formatter):
         }
         
         # Agregar contexto si existe
-        request_id = request_id_var.get()
-        if request_id:
-            log_data["request_id"] = request_id
-        
-        correlation_id = correlation_id_var.get()
-        if correlation_id:
-            log_data["correlation_id"] = correlation_id
-        
-        user_id = user_id_var.get()
-        if user_id:
-            log_data["user_id"] = user_id
+        for name, var in _CONTEXT_VARS:
+            value = _context_value(record, name, var)
+            if value:
+                log_data[name] = value
         
         # Agregar extra fields
         if hasattr(record, 'extra'):
@@ -153,6 +162,88 @@ def setup_logging(level: str = "INFO", json_format: bool = True):
     
     return root_logger
 
+class ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler que difiere el formateo al thread del QueueListener.
+
+    El thread que loguea (p.ej. un request con la sesión de DB abierta) solo
+    resuelve el mensaje y encola; el formateo (JSON, traceback) y la I/O de
+    los handlers reales corren en el listener. Los ContextVar de request se
+    copian al record porque en el thread del listener no tienen valor.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Resolver %-args ahora: pueden ser objetos mutables
+        record.msg = record.getMessage()
+        record.args = None
+        for name, var in _CONTEXT_VARS:
+            if getattr(record, name, None) is None:
+                setattr(record, name, var.get())
+        return record
+
+
+# Listener de logging en cola (singleton): (listener, logger, queue handler, handlers originales)
+_queue_logging: Optional[Tuple[QueueListener, logging.Logger, QueueHandler, List[logging.Handler]]] = None
+_queue_logging_lock = threading.Lock()
+
+
+def start_queue_logging(target: Optional[logging.Logger] = None) -> Optional[QueueListener]:
+    """
+    Mueve los handlers de `target` (default: root) detrás de una cola en memoria.
+
+    Los handlers lentos (red: ELK, Datadog) dejan de sumar latencia en el
+    thread que loguea. La cola no tiene límite (no bloquea ni descarta logs);
+    stop_queue_logging() la drena al apagar. Idempotente para el mismo
+    `target`; hay un único listener por proceso, así que si ya está activo
+    sobre otro logger no se instala nada y se retorna None.
+
+    Si `target` no tiene handlers no se instala nada: logging usa
+    logging.lastResort (WARNING+ a stderr), que una cola sin handlers
+    descartaría en silencio.
+
+    Returns:
+        El QueueListener en ejecución, o None si `target` no tiene handlers
+        o la cola ya está instalada sobre otro logger
+    """
+    global _queue_logging
+    target = target or logging.getLogger()
+    with _queue_logging_lock:
+        if _queue_logging is not None:
+            listener, active_target, _, _ = _queue_logging
+            return listener if active_target is target else None
+
+        handlers = list(target.handlers)
+        if not handlers:
+            return None
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = ContextQueueHandler(log_queue)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+        for handler in handlers:
+            target.removeHandler(handler)
+        target.addHandler(queue_handler)
+        listener.start()
+
+        _queue_logging = (listener, target, queue_handler, handlers)
+        return listener
+
+
+def stop_queue_logging() -> None:
+    """Procesa los logs pendientes y restaura los handlers originales"""
+    global _queue_logging
+    with _queue_logging_lock:
+        if _queue_logging is None:
+            return
+        listener, target, queue_handler, handlers = _queue_logging
+        _queue_logging = None
+
+        target.removeHandler(queue_handler)
+        listener.stop()
+        for handler in handlers:
+            target.addHandler(handler)
+
+
 def get_logger(name: str) -> StructuredLogger:
     """Obtiene logger estructurado"""
     return logging.getLogger(name)
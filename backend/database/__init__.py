@@ -11,7 +11,7 @@ Provides:
 """
 from .config import DatabaseConfig, get_db_session, init_database, get_db_config
 from .base import Base
-from .transaction import transaction, transactional, TransactionManager
+from .transaction import transaction, transactional, unit_of_work, TransactionManager
 
 # ORM Models
 from .models import (
@@ -25,12 +25,17 @@ from .models import (
     UserDB,
     # Sprint 5 models
     GitTraceDB,
+    GitAuthorDB,
     CourseReportDB,
     RemediationPlanDB,
     RiskAlertDB,
+    OutboxEventDB,
     # Sprint 6 models
     InterviewSessionDB,
+    InterviewQuestionDB,
+    InterviewResponseDB,
     IncidentSimulationDB,
+    IncidentDiagnosisStepDB,
     LTIDeploymentDB,
     LTISessionDB,
 )
@@ -66,6 +71,7 @@ __all__ = [
     # Transaction management
     "transaction",
     "transactional",
+    "unit_of_work",
     "TransactionManager",
     # ORM Models
     "SessionDB",
@@ -77,11 +83,16 @@ __all__ = [
     "ActivityDB",
     "UserDB",
     "GitTraceDB",
+    "GitAuthorDB",
     "CourseReportDB",
     "RemediationPlanDB",
     "RiskAlertDB",
+    "OutboxEventDB",
     "InterviewSessionDB",
+    "InterviewQuestionDB",
+    "InterviewResponseDB",
     "IncidentSimulationDB",
+    "IncidentDiagnosisStepDB",
     "LTIDeploymentDB",
     "LTISessionDB",
     # Repositories
@@ -7,6 +7,9 @@ Provides:
 - UUID primary keys
 - JSON serialization
 """
+import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict
@@ -20,6 +23,51 @@ def _utc_now():
     return datetime.now(timezone.utc)
 
 
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_seq = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Genera un UUIDv7 (RFC 9562): 48 bits de timestamp Unix en ms + bits aleatorios.
+
+    A diferencia de uuid4, los valores crecen con el tiempo (también en su forma
+    de texto), así que los INSERTs caen al final del índice B-tree de la PK en
+    lugar de dispersarse por todas sus páginas. Dentro del mismo milisegundo
+    rand_a funciona como contador para mantener el orden monotónico.
+    """
+    global _uuid7_last_ms, _uuid7_seq
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            # Semilla aleatoria con margen para ~2k ids más en el mismo ms
+            _uuid7_seq = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _uuid7_seq += 1
+            if _uuid7_seq > 0xFFF:
+                # Contador agotado: avanzar el timestamp lógico
+                _uuid7_last_ms += 1
+                _uuid7_seq = 0
+        ms, seq = _uuid7_last_ms, _uuid7_seq
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        (ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | seq << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
+
+
+def new_uuid7_str() -> str:
+    """Helper para SQLAlchemy default - UUIDv7 en formato texto (36 chars)"""
+    return str(uuid7())
+
+
 # Create declarative base
 Base = declarative_base()
 
@@ -35,7 +83,8 @@ class BaseModel:
         """Generate table name from class name"""
         return cls.__name__.lower()
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # UUIDv7: ids ordenados por tiempo (inserts al final del índice de la PK)
+    id = Column(String(36), primary_key=True, default=new_uuid7_str)
     created_at = Column(DateTime, default=_utc_now, nullable=False)
     updated_at = Column(
         DateTime, default=_utc_now, onupdate=_utc_now, nullable=False
@@ -0,0 +1,79 @@
+"""
+Compresión de columnas de texto grandes (diffs de Git)
+
+Los diffs unificados comprimen 5-10x con zstd. Se guardan como bytes y se
+descomprimen on demand (solo la vista de detalle / análisis los lee).
+
+zstandard es opcional: sin la librería se usa zlib (stdlib). El formato se
+detecta por los magic bytes al descomprimir, así que filas escritas con uno u
+otro codec conviven en la misma columna.
+"""
+import threading
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Frame header de zstd (RFC 8878)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# ZstdCompressor/ZstdDecompressor no son seguros para uso concurrente desde
+# varios threads: una instancia por thread (se reutiliza entre llamadas)
+_local = threading.local()
+
+
+def _zstd_compressor():
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor
+
+
+def _zstd_decompressor():
+    decompressor = getattr(_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """
+    Comprime texto UTF-8 (zstd si está disponible, zlib si no).
+
+    Returns:
+        Bytes comprimidos, o None para texto vacío/None
+    """
+    if not text:
+        return None
+    data = text.encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return _zstd_compressor().compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_text(blob: Optional[bytes]) -> str:
+    """
+    Descomprime bytes producidos por compress_text.
+
+    Raises:
+        RuntimeError: Si el blob es zstd y zstandard no está instalado
+    """
+    if not blob:
+        return ""
+    blob = bytes(blob)  # psycopg2 devuelve memoryview para BYTEA
+    if blob.startswith(_ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(
+                "zstandard is required to read zstd-compressed data. "
+                "Install with: pip install zstandard"
+            )
+        return _zstd_decompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
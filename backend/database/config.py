@@ -24,9 +24,21 @@ def _import_all_models():
     from . import models  # noqa: F401
     # This import registers all model classes with Base.metadata
 
+    # Resolver relationships/backrefs ahora y no en la primera query de un
+    # request (configure() es idempotente; los mappers agregados después,
+    # como backend.models.user.User, se configuran en su primer uso)
+    Base.registry.configure()
+
 _import_all_models()
 
 
+def _int_setting(value: Optional[int], env_var: str, default: int) -> int:
+    """Resolve a pool setting: explicit argument > environment variable > default"""
+    if value is not None:
+        return value
+    return int(os.getenv(env_var, str(default)))
+
+
 class DatabaseConfig:
     """
     Database configuration manager with production-ready connection pooling.
@@ -47,6 +59,7 @@ class DatabaseConfig:
         pool_timeout: Optional[int] = None,
         pool_recycle: Optional[int] = None,
         pool_pre_ping: bool = True,
+        query_cache_size: Optional[int] = None,
     ):
         """
         Initialize database configuration
@@ -57,8 +70,16 @@ class DatabaseConfig:
             pool_size: Connection pool size (default: from env or 20)
             max_overflow: Maximum overflow connections (default: from env or 40)
             pool_timeout: Seconds to wait before giving up on getting a connection (default: 30)
-            pool_recycle: Seconds before recycling connections (default: 3600)
+            pool_recycle: Seconds before recycling connections (default: 1800, por debajo
+                de los idle timeouts típicos de PgBouncer/firewalls)
             pool_pre_ping: Test connections before using them (default: True)
+            query_cache_size: Entradas del compiled cache de SQLAlchemy (default:
+                from env DB_QUERY_CACHE_SIZE or 1200). Con echo=True cada
+                statement se loguea con "[cached since ...]" o "[generated in ...]".
+
+        Note:
+            Valores explícitos (incluido 0) tienen prioridad sobre las variables
+            de entorno DB_POOL_*.
         """
         self.database_url = database_url or os.getenv(
             "DATABASE_URL", "sqlite:///ai_native_mvp.db"
@@ -66,11 +87,14 @@ class DatabaseConfig:
         self.echo = echo
 
         # Read pool configuration from environment variables (P1.3 - Production Readiness)
-        self.pool_size = pool_size or int(os.getenv("DB_POOL_SIZE", "20"))
-        self.max_overflow = max_overflow or int(os.getenv("DB_MAX_OVERFLOW", "40"))
-        self.pool_timeout = pool_timeout or int(os.getenv("DB_POOL_TIMEOUT", "30"))
-        self.pool_recycle = pool_recycle or int(os.getenv("DB_POOL_RECYCLE", "3600"))
+        self.pool_size = _int_setting(pool_size, "DB_POOL_SIZE", 20)
+        self.max_overflow = _int_setting(max_overflow, "DB_MAX_OVERFLOW", 40)
+        self.pool_timeout = _int_setting(pool_timeout, "DB_POOL_TIMEOUT", 30)
+        self.pool_recycle = _int_setting(pool_recycle, "DB_POOL_RECYCLE", 1800)
         self.pool_pre_ping = pool_pre_ping
+        # Compiled cache: el default de SQLAlchemy (500) queda chico con los
+        # lambda_stmt + statements por repositorio y provoca recompilaciones
+        self.query_cache_size = _int_setting(query_cache_size, "DB_QUERY_CACHE_SIZE", 1200)
 
         self._engine: Optional[Engine] = None
         self._session_factory: Optional[sessionmaker] = None
@@ -85,6 +109,8 @@ class DatabaseConfig:
                     echo=self.echo,
                     connect_args={"check_same_thread": False},
                     poolclass=StaticPool if ":memory:" in self.database_url else None,
+                    pool_pre_ping=self.pool_pre_ping,
+                    query_cache_size=self.query_cache_size,
                 )
 
                 # Enable foreign keys for SQLite
@@ -104,6 +130,7 @@ class DatabaseConfig:
                     pool_timeout=self.pool_timeout,
                     pool_recycle=self.pool_recycle,
                     pool_pre_ping=self.pool_pre_ping,  # Verify connections before using
+                    query_cache_size=self.query_cache_size,
                     # Additional production settings
                     pool_use_lifo=True,  # Last In First Out for better cache locality
                     connect_args={
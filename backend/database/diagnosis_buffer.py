@@ -0,0 +1,185 @@
+"""
+Write-behind buffer para pasos de diagnóstico de incidentes
+
+Durante una simulación de incidente el estudiante registra pasos en ráfaga
+(cada log inspeccionado, cada hipótesis). En lugar de un UPDATE + INSERT +
+COMMIT por paso, los pasos se acumulan en memoria por incidente y un flusher
+en background los persiste cada `interval` con un único INSERT multi-fila por
+incidente (IncidentSimulationRepository.add_diagnosis_steps), todos en una
+transacción: un lote se ve completo o no se ve.
+
+Lecturas consistentes: read() carga la fila y toma los pasos pendientes sin
+que un flush quede a mitad de camino (ningún paso aparece dos veces ni se
+pierde en la respuesta). Antes de evaluar un incidente, flush(db, incident_id)
+persiste sus pasos pendientes de inmediato.
+
+Opt-in (DIAGNOSIS_WRITE_BEHIND=true): por defecto /incident/diagnose persiste
+cada paso antes de responder. Activarlo solo con un único worker, por estos
+trade-offs:
+- Si el proceso muere entre flushes se pierden como máximo `interval`
+  segundos de pasos ya confirmados al cliente (el lifespan hace un flush
+  final al apagarse, no en un crash).
+- El buffer es por proceso: con varios workers, otro worker no ve ni puede
+  flushear los pasos pendientes (un resolve/get servido por él evalúa o
+  muestra el historial sin ellos).
+
+read() y flush() toman `_flush_lock` y hacen I/O sincrónico de SQLAlchemy:
+llamarlos desde un thread (run_in_threadpool / asyncio.to_thread), nunca
+desde el event loop, porque el flusher retiene ese lock durante su COMMIT.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from .repositories import IncidentSimulationRepository
+from .transaction import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.5
+WRITE_BEHIND_ENABLED = os.getenv("DIAGNOSIS_WRITE_BEHIND", "false").lower() == "true"
+
+T = TypeVar("T")
+
+
+class DiagnosisStepBuffer:
+    """
+    Acumulador thread-safe de pasos de diagnóstico pendientes, por incidente.
+
+    Dos locks: `_lock` protege el dict de pendientes (enqueue es O(1)) y
+    `_flush_lock` serializa los flushes con read(), para que una lectura nunca
+    observe un lote ya sacado del buffer pero todavía no commiteado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, List[dict]] = {}
+
+    def enqueue(self, incident_id: str, step: dict) -> None:
+        """Registra un paso (O(1), sin I/O)"""
+        with self._lock:
+            self._pending.setdefault(incident_id, []).append(step)
+
+    def pending(self, incident_id: str) -> List[dict]:
+        """Pasos del incidente todavía no persistidos, en orden"""
+        with self._lock:
+            return list(self._pending.get(incident_id, ()))
+
+    def pending_count(self) -> int:
+        """Cantidad de incidentes con pasos pendientes de flush"""
+        with self._lock:
+            return len(self._pending)
+
+    def read(self, incident_id: str, load: Callable[[], T]) -> Tuple[T, List[dict]]:
+        """
+        Carga la fila con `load` y devuelve (fila, pasos pendientes).
+
+        `load` debe traer el historial persistido completo (p.ej.
+        get_by_id(..., load_history=True)): un lazy load posterior podría ver
+        un lote flusheado después de tomar los pendientes.
+        """
+        with self._flush_lock:
+            return load(), self.pending(incident_id)
+
+    def _drain(self, incident_id: Optional[str]) -> Dict[str, List[dict]]:
+        with self._lock:
+            if incident_id is None:
+                pending, self._pending = self._pending, {}
+                return pending
+            steps = self._pending.pop(incident_id, None)
+            return {incident_id: steps} if steps else {}
+
+    def _requeue(self, pending: Dict[str, List[dict]]) -> None:
+        with self._lock:
+            for incident_id, steps in pending.items():
+                # Los pasos re-encolados van antes de los que llegaron durante el flush
+                self._pending[incident_id] = steps + self._pending.get(incident_id, [])
+
+    def flush(self, db: Session, incident_id: Optional[str] = None) -> int:
+        """
+        Persiste los pasos pendientes (de todos los incidentes o de uno).
+
+        Un INSERT por incidente y un único COMMIT. Si falla, los pasos se
+        re-encolan para el próximo flush.
+
+        Args:
+            db: Sesión de base de datos (el caller la cierra)
+            incident_id: Solo este incidente (None = todos)
+
+        Returns:
+            Cantidad de pasos persistidos
+        """
+        with self._flush_lock:
+            pending = self._drain(incident_id)
+            if not pending:
+                return 0
+
+            repo = IncidentSimulationRepository(db)
+            try:
+                with unit_of_work(db):
+                    for pending_id, steps in pending.items():
+                        if repo.add_diagnosis_steps(pending_id, steps) is None:
+                            logger.warning(
+                                "Dropping diagnosis steps of missing incident",
+                                extra={"incident_id": pending_id, "steps": len(steps)},
+                            )
+            except Exception:
+                self._requeue(pending)
+                raise
+        return sum(len(steps) for steps in pending.values())
+
+
+async def run_diagnosis_flusher(
+    buffer: "DiagnosisStepBuffer",
+    session_factory: Callable[[], Session],
+    interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+) -> None:
+    """
+    Loop de flush periódico (para lanzar con asyncio.create_task en el lifespan).
+
+    El flush corre en un thread (asyncio.to_thread) para no bloquear el event
+    loop con I/O sincrónico de SQLAlchemy. Al cancelarse hace un flush final.
+    """
+
+    def _flush_once() -> None:
+        db = session_factory()
+        try:
+            buffer.flush(db)
+        finally:
+            db.close()
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if buffer.pending_count():
+                try:
+                    await asyncio.to_thread(_flush_once)
+                except Exception as e:
+                    logger.warning(f"Diagnosis buffer flush failed (will retry): {e}")
+    except asyncio.CancelledError:
+        if buffer.pending_count():
+            try:
+                _flush_once()
+            except Exception as e:
+                logger.error(f"Final diagnosis buffer flush failed: {e}")
+        raise
+
+
+# Global buffer instance (singleton)
+_diagnosis_buffer: Optional[DiagnosisStepBuffer] = None
+_diagnosis_buffer_lock = threading.Lock()
+
+
+def get_diagnosis_buffer() -> DiagnosisStepBuffer:
+    """Get the process-wide diagnosis step buffer (thread-safe singleton)"""
+    global _diagnosis_buffer
+    if _diagnosis_buffer is None:
+        with _diagnosis_buffer_lock:
+            if _diagnosis_buffer is None:
+                _diagnosis_buffer = DiagnosisStepBuffer()
+    return _diagnosis_buffer
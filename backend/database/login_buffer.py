@@ -0,0 +1,156 @@
+"""
+Write-behind buffer para eventos de login (last_login / login_count)
+
+Registrar un login no debería sumar un UPDATE + COMMIT (fsync) a la latencia
+de autenticación: nadie espera ese dato en la respuesta. Los logins se
+acumulan en memoria y un flusher en background los persiste en lote con un
+único UPDATE por intervalo:
+
+    UPDATE users
+    SET last_login  = CASE id WHEN :a THEN :ts_a WHEN :b THEN :ts_b END,
+        login_count = COALESCE(login_count, 0) + CASE id WHEN :a THEN 3 WHEN :b THEN 1 END
+    WHERE id IN (:a, :b)
+
+Trade-off: si el proceso muere entre flushes se pierden como máximo
+`interval` segundos de contadores de login (dato estadístico, no crítico).
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from .base import _utc_now
+from .models import UserDB
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.5
+
+
+class LoginActivityBuffer:
+    """
+    Acumulador thread-safe de logins pendientes de persistir.
+
+    Por usuario guarda (cantidad de logins, timestamp del último login), de
+    modo que N logins del mismo usuario entre flushes cuestan una sola fila
+    en el UPDATE.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[int, datetime]] = {}
+
+    def record(self, user_id: str, when: Optional[datetime] = None) -> None:
+        """Registra un login (O(1), sin I/O)"""
+        when = when or _utc_now()
+        with self._lock:
+            count, last = self._pending.get(user_id, (0, when))
+            self._pending[user_id] = (count + 1, max(last, when))
+
+    def pending_count(self) -> int:
+        """Cantidad de usuarios con logins pendientes de flush"""
+        with self._lock:
+            return len(self._pending)
+
+    def _drain(self) -> Dict[str, Tuple[int, datetime]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _requeue(self, pending: Dict[str, Tuple[int, datetime]]) -> None:
+        with self._lock:
+            for user_id, (count, when) in pending.items():
+                current_count, current_when = self._pending.get(user_id, (0, when))
+                self._pending[user_id] = (current_count + count, max(current_when, when))
+
+    def flush(self, db: Session) -> int:
+        """
+        Persiste los logins pendientes con un único UPDATE.
+
+        Si el UPDATE falla, los eventos se re-encolan para el próximo flush.
+
+        Args:
+            db: Sesión de base de datos (el caller la cierra)
+
+        Returns:
+            Cantidad de usuarios actualizados
+        """
+        pending = self._drain()
+        if not pending:
+            return 0
+
+        last_login_by_id = {user_id: when for user_id, (_, when) in pending.items()}
+        count_by_id = {user_id: count for user_id, (count, _) in pending.items()}
+        stmt = (
+            update(UserDB)
+            .where(UserDB.id.in_(list(pending)))
+            .values(
+                last_login=case(last_login_by_id, value=UserDB.id),
+                login_count=func.coalesce(UserDB.login_count, 0)
+                + case(count_by_id, value=UserDB.id),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            db.execute(stmt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(pending)
+            raise
+        return len(pending)
+
+
+async def run_login_flusher(
+    buffer: "LoginActivityBuffer",
+    session_factory: Callable[[], Session],
+    interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+) -> None:
+    """
+    Loop de flush periódico (para lanzar con asyncio.create_task en el lifespan).
+
+    El flush corre en un thread (asyncio.to_thread) para no bloquear el event
+    loop con I/O sincrónico de SQLAlchemy. Al cancelarse hace un flush final.
+    """
+
+    def _flush_once() -> None:
+        db = session_factory()
+        try:
+            buffer.flush(db)
+        finally:
+            db.close()
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if buffer.pending_count():
+                try:
+                    await asyncio.to_thread(_flush_once)
+                except Exception as e:
+                    logger.warning(f"Login buffer flush failed (will retry): {e}")
+    except asyncio.CancelledError:
+        if buffer.pending_count():
+            try:
+                _flush_once()
+            except Exception as e:
+                logger.error(f"Final login buffer flush failed: {e}")
+        raise
+
+
+# Global buffer instance (singleton)
+_login_buffer: Optional[LoginActivityBuffer] = None
+_login_buffer_lock = threading.Lock()
+
+
+def get_login_buffer() -> LoginActivityBuffer:
+    """Get the process-wide login buffer (thread-safe singleton)"""
+    global _login_buffer
+    if _login_buffer is None:
+        with _login_buffer_lock:
+            if _login_buffer is None:
+                _login_buffer = LoginActivityBuffer()
+    return _login_buffer
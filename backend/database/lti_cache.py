@@ -0,0 +1,48 @@
+"""
+TTL + LRU cache de deployments LTI (hot path de cada launch LTI)
+
+Cada launch OIDC resuelve el deployment por (issuer, deployment_id). Los
+deployments son casi estáticos (create/deactivate son raros), así que este
+cache guarda un snapshot de las columnas de LTIDeploymentDB y
+LTIDeploymentRepository lo re-adjunta a la sesión sin SQL
+(make_transient_to_detached + merge(load=False)), igual que user_cache.
+
+Invalidación: create() y deactivate() invalidan la clave del deployment. El
+cache es por proceso: con varios workers, otro worker puede ver un deployment
+recién desactivado como activo hasta `ttl_seconds` (default 300s).
+"""
+from typing import Any, Dict, List, Tuple
+
+from .models import LTIDeploymentDB
+from .snapshot_cache import SnapshotCache, column_snapshot, lazy_singleton
+
+DEFAULT_LTI_DEPLOYMENT_CACHE_MAX_SIZE = 256
+DEFAULT_LTI_DEPLOYMENT_CACHE_TTL_SECONDS = 300
+
+
+def snapshot_deployment(deployment: LTIDeploymentDB) -> Dict[str, Any]:
+    """Copia los valores de columna de un LTIDeploymentDB (sin estado ORM)"""
+    return column_snapshot(LTIDeploymentDB, deployment)
+
+
+def _deployment_keys(snapshot: Dict[str, Any]) -> List[Tuple[str, str]]:
+    return [(snapshot["issuer"], snapshot["deployment_id"])]
+
+
+class LTIDeploymentCache(SnapshotCache):
+    """
+    Cache LRU con TTL de snapshots de deployment. Thread-safe.
+
+    Las claves son tuplas (issuer, deployment_id): get(issuer, deployment_id).
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_LTI_DEPLOYMENT_CACHE_MAX_SIZE,
+        ttl_seconds: float = DEFAULT_LTI_DEPLOYMENT_CACHE_TTL_SECONDS,
+    ):
+        super().__init__(snapshot_deployment, _deployment_keys, max_size, ttl_seconds)
+
+
+# Global cache instance (thread-safe singleton)
+get_lti_deployment_cache = lazy_singleton(LTIDeploymentCache)
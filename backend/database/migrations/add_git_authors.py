@@ -0,0 +1,95 @@
+"""
+Migración de Base de Datos: Dimensión de autores Git
+
+Crea git_authors, carga los autores distintos de git_traces, completa
+git_traces.author_id y elimina las columnas denormalizadas author_name /
+author_email.
+
+Ejecutar con: python -m backend.database.migrations.add_git_authors
+"""
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+from backend.database.models import GitAuthorDB
+
+
+def migrate_add_git_authors():
+    """
+    Normaliza author_name/author_email de git_traces en git_authors
+    """
+    print("=" * 80)
+    print("Migración: Dimensión de autores Git")
+    print("=" * 80)
+
+    # init_database crea git_authors si no existe (create_all)
+    init_database()
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        db_url = str(db.bind.url)
+        is_sqlite = db_url.startswith('sqlite')
+
+        print(f"\nBase de datos detectada: {'SQLite' if is_sqlite else 'PostgreSQL'}")
+
+        columns = {
+            row[1] if is_sqlite else row[0]
+            for row in db.execute(text(
+                "PRAGMA table_info(git_traces)" if is_sqlite else
+                "SELECT column_name FROM information_schema.columns WHERE table_name = 'git_traces'"
+            ))
+        }
+        if 'author_name' not in columns:
+            print("\n⚠ git_traces ya no tiene author_name/author_email, nada que migrar")
+            return
+
+        print("\n[1/4] Creando tabla git_authors...")
+        GitAuthorDB.__table__.create(bind=db.get_bind(), checkfirst=True)
+        print("✓ Tabla lista")
+
+        print("\n[2/4] Cargando autores distintos...")
+        db.execute(text("""
+            INSERT INTO git_authors (name, email, created_at)
+            SELECT DISTINCT author_name, author_email, CURRENT_TIMESTAMP
+            FROM git_traces
+            WHERE NOT EXISTS (
+                SELECT 1 FROM git_authors a
+                WHERE a.email = git_traces.author_email AND a.name = git_traces.author_name
+            )
+        """))
+        print("✓ Autores cargados")
+
+        print("\n[3/4] Completando git_traces.author_id...")
+        if 'author_id' not in columns:
+            db.execute(text(
+                "ALTER TABLE git_traces ADD COLUMN author_id INTEGER REFERENCES git_authors(id)"
+            ))
+        db.execute(text("""
+            UPDATE git_traces SET author_id = (
+                SELECT a.id FROM git_authors a
+                WHERE a.email = git_traces.author_email AND a.name = git_traces.author_name
+            )
+            WHERE author_id IS NULL
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_git_traces_author_id ON git_traces (author_id)"))
+        if not is_sqlite:
+            db.execute(text("ALTER TABLE git_traces ALTER COLUMN author_id SET NOT NULL"))
+        print("✓ author_id completado")
+
+        print("\n[4/4] Eliminando columnas denormalizadas...")
+        # SQLite >= 3.35 soporta DROP COLUMN
+        db.execute(text("ALTER TABLE git_traces DROP COLUMN author_name"))
+        db.execute(text("ALTER TABLE git_traces DROP COLUMN author_email"))
+        db.commit()
+        print("✓ Columnas eliminadas")
+
+    except Exception as e:
+        print(f"\n✗ Error durante la migración: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_add_git_authors()
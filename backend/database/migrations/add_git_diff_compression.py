@@ -0,0 +1,81 @@
+"""
+Migración de Base de Datos: Compresión de diffs en git_traces
+
+Agrega la columna git_traces.diff_compressed y comprime los diffs existentes
+(columna de texto "diff") en lotes. Las filas migradas quedan con diff = NULL.
+
+Ejecutar con: python -m backend.database.migrations.add_git_diff_compression
+"""
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+from backend.database.compression import compress_text
+
+BATCH_SIZE = 500
+
+
+def migrate_add_git_diff_compression():
+    """
+    Agrega diff_compressed y migra los diffs de texto existentes
+    """
+    print("=" * 80)
+    print("Migración: Compresión de diffs en git_traces")
+    print("=" * 80)
+
+    init_database()
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        db_url = str(db.bind.url)
+        is_sqlite = db_url.startswith('sqlite')
+
+        print(f"\nBase de datos detectada: {'SQLite' if is_sqlite else 'PostgreSQL'}")
+
+        print("\n[1/2] Agregando columna diff_compressed...")
+        if is_sqlite:
+            try:
+                db.execute(text("ALTER TABLE git_traces ADD COLUMN diff_compressed BLOB"))
+            except Exception as e:
+                if 'duplicate column' in str(e).lower():
+                    print("  ⚠ Columna ya existe, saltando...")
+                else:
+                    raise
+        else:
+            db.execute(text("ALTER TABLE git_traces ADD COLUMN IF NOT EXISTS diff_compressed BYTEA"))
+            db.execute(text("ALTER TABLE git_traces ALTER COLUMN diff DROP NOT NULL"))
+        db.commit()
+        print("✓ Columna agregada")
+
+        print("\n[2/2] Comprimiendo diffs existentes...")
+        migrated = 0
+        while True:
+            rows = db.execute(
+                text(
+                    "SELECT id, diff FROM git_traces "
+                    "WHERE diff_compressed IS NULL AND diff IS NOT NULL AND diff <> '' "
+                    "LIMIT :limit"
+                ),
+                {"limit": BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            db.execute(
+                text("UPDATE git_traces SET diff_compressed = :blob, diff = NULL WHERE id = :id"),
+                [{"id": row.id, "blob": compress_text(row.diff)} for row in rows],
+            )
+            db.commit()
+            migrated += len(rows)
+            print(f"  {migrated} diffs comprimidos...")
+        print(f"✓ {migrated} diffs migrados")
+
+    except Exception as e:
+        print(f"\n✗ Error durante la migración: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_add_git_diff_compression()
@@ -0,0 +1,211 @@
+"""
+Migración de Base de Datos: Particionado mensual de git_traces y risk_alerts
+
+Ambas tablas crecen de forma monótona (un registro por commit / por alerta).
+En PostgreSQL se convierten en tablas particionadas por RANGE mensual
+(git_traces.timestamp, risk_alerts.detected_at): las consultas filtradas por
+rango de fechas solo leen las particiones involucradas, y los listados
+"más recientes primero" usan los índices compuestos de cada partición
+(los índices definidos en el modelo se crean sobre la tabla padre y
+PostgreSQL los propaga a cada partición).
+
+Restricciones de PostgreSQL y cómo se resuelven:
+- La PK y los índices UNIQUE deben incluir la clave de partición:
+  PK (id, <columna>) y, para git_traces, UNIQUE (commit_hash, timestamp).
+  El timestamp de un commit es parte de su contenido, así que un mismo hash
+  siempre llega con el mismo timestamp y la deduplicación de bulk_create
+  (ON CONFLICT DO NOTHING) se mantiene. El ORM sigue usando id como
+  identidad (UUIDv7, único en la práctica).
+- Sin pg_partman: las particiones futuras se crean con
+  `--ensure` (idempotente; programarlo mensualmente, p.ej. cron). Si pg_partman
+  está instalado puede tomar el control de las tablas padre igualmente.
+  Una partición DEFAULT recibe filas fuera de rango para no rechazar INSERTs.
+  Si `--ensure` corre tarde y la DEFAULT ya tiene filas del mes a crear,
+  PostgreSQL rechaza el CREATE TABLE ... PARTITION OF: en ese caso el mes se
+  crea como tabla suelta, se le mueven esas filas y se adjunta con ATTACH
+  PARTITION, todo en la misma transacción.
+
+SQLite (dev/tests) no soporta particionado: la migración no hace nada.
+
+Ejecutar con: python -m backend.database.migrations.partition_git_traces_and_alerts
+Particiones futuras: python -m backend.database.migrations.partition_git_traces_and_alerts --ensure
+"""
+import sys
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from backend.database import init_database, get_db_config
+from backend.database.models import GitTraceDB, RiskAlertDB
+
+# tabla -> (modelo, columna de partición)
+PARTITIONED_TABLES = {
+    "git_traces": (GitTraceDB, "timestamp"),
+    "risk_alerts": (RiskAlertDB, "detected_at"),
+}
+
+# Meses a crear por delante del mes actual
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(db, table: str) -> bool:
+    return bool(db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+        ),
+        {"table": table},
+    ).scalar())
+
+
+def _default_has_rows(db, table: str, column: str, lower: date, upper: date) -> bool:
+    default = f"{table}_default"
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is None:
+        return False
+    return bool(db.execute(
+        text(f"SELECT 1 FROM {default} WHERE {column} >= :lower AND {column} < :upper LIMIT 1"),
+        {"lower": lower, "upper": upper},
+    ).scalar())
+
+
+def _ensure_month_partitions(db, table: str, column: str, first: date, last: date) -> int:
+    """Crea las particiones mensuales [first, last] que falten (idempotente)"""
+    created = 0
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        upper = _add_months(month, 1)
+        name = f"{table}_{month:%Y_%m}"
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists is None and _default_has_rows(db, table, column, month, upper):
+            # Filas del mes ya caídas en la DEFAULT: moverlas y adjuntar (los
+            # índices de la tabla padre se crean en la partición al adjuntarla)
+            db.execute(text(
+                f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            db.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {table}_default "
+                    f"WHERE {column} >= :lower AND {column} < :upper RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                {"lower": month, "upper": upper},
+            )
+            db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+            created += 1
+        elif exists is None:
+            db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+            created += 1
+        month = upper
+    return created
+
+
+def _partition_table(db, table: str, model, column: str) -> None:
+    """Convierte `table` en tabla particionada copiando los datos existentes"""
+    legacy = f"{table}_legacy"
+
+    db.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    db.execute(text(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({column})"
+    ))
+    db.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    bounds = db.execute(text(f"SELECT min({column}), max({column}) FROM {legacy}")).one()
+    this_month = date.today().replace(day=1)
+    first = bounds[0].date() if bounds[0] else this_month
+    last = max(bounds[1].date() if bounds[1] else this_month, this_month)
+    created = _ensure_month_partitions(db, table, column, first, _add_months(last, MONTHS_AHEAD))
+    print(f"  {created} particiones mensuales creadas")
+
+    db.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+    db.execute(text(f"DROP TABLE {legacy}"))
+
+    # Después del DROP: la PK/índices de la tabla renombrada conservan sus
+    # nombres (p.ej. {table}_pkey) hasta que se elimina
+    db.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})"))
+
+    # Índices y FKs del modelo sobre la tabla padre (se propagan a las particiones).
+    # Los UNIQUE de una sola columna no son válidos en una tabla particionada.
+    for index in model.__table__.indexes:
+        if index.unique:
+            continue
+        db.execute(CreateIndex(index, if_not_exists=True))
+    for constraint in model.__table__.foreign_key_constraints:
+        db.execute(AddConstraint(constraint))
+    if table == "git_traces":
+        db.execute(text(
+            "CREATE UNIQUE INDEX ux_git_traces_commit_hash_ts ON git_traces (commit_hash, timestamp)"
+        ))
+        db.execute(text("CREATE INDEX ix_git_traces_commit_hash ON git_traces (commit_hash)"))
+
+
+def ensure_future_partitions(db) -> int:
+    """Crea las particiones del mes actual + MONTHS_AHEAD en cada tabla particionada"""
+    this_month = date.today().replace(day=1)
+    created = 0
+    for table, (_, column) in PARTITIONED_TABLES.items():
+        if _is_partitioned(db, table):
+            created += _ensure_month_partitions(
+                db, table, column, this_month, _add_months(this_month, MONTHS_AHEAD)
+            )
+    db.commit()
+    return created
+
+
+def migrate_partition_git_traces_and_alerts():
+    """
+    Particiona git_traces y risk_alerts por mes (solo PostgreSQL)
+    """
+    print("=" * 80)
+    print("Migración: Particionado mensual de git_traces y risk_alerts")
+    print("=" * 80)
+
+    init_database()
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        db_url = str(db.bind.url)
+        is_sqlite = db_url.startswith('sqlite')
+
+        print(f"\nBase de datos detectada: {'SQLite' if is_sqlite else 'PostgreSQL'}")
+        if is_sqlite:
+            print("⚠ SQLite no soporta particionado, saltando...")
+            return
+
+        for step, (table, (model, column)) in enumerate(PARTITIONED_TABLES.items(), start=1):
+            print(f"\n[{step}/{len(PARTITIONED_TABLES)}] Particionando {table} por {column}...")
+            if _is_partitioned(db, table):
+                print("  ⚠ Tabla ya particionada, saltando...")
+                continue
+            _partition_table(db, table, model, column)
+            # Una transacción por tabla: si falla, la tabla original queda intacta
+            db.commit()
+            print(f"✓ {table} particionada")
+
+    except Exception as e:
+        print(f"\n✗ Error durante la migración: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if "--ensure" in sys.argv:
+        init_database()
+        session = get_db_config().get_session_factory()()
+        try:
+            print(f"✓ {ensure_future_partitions(session)} particiones creadas")
+        finally:
+            session.close()
+    else:
+        migrate_partition_git_traces_and_alerts()
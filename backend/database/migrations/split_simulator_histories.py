@@ -0,0 +1,102 @@
+"""
+Migración de Base de Datos: Historiales de simuladores en tablas hijas
+
+interview_sessions.questions_asked / responses e
+incident_simulations.diagnosis_process eran arrays JSON que se reescribían
+enteros en cada append. Esta migración crea interview_questions,
+interview_responses e incident_diagnosis_steps (una fila por elemento, con
+seq = posición 1..n en el array), copia los arrays existentes y elimina las
+columnas JSON.
+
+Ejecutar con: python -m backend.database.migrations.split_simulator_histories
+"""
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+from backend.database.models import (
+    InterviewQuestionDB,
+    InterviewResponseDB,
+    IncidentDiagnosisStepDB,
+)
+
+# (tabla padre, columna JSON, tabla hija, FK en la hija, modelo hijo)
+HISTORY_COLUMNS = (
+    ("interview_sessions", "questions_asked", "interview_questions", "interview_id", InterviewQuestionDB),
+    ("interview_sessions", "responses", "interview_responses", "interview_id", InterviewResponseDB),
+    ("incident_simulations", "diagnosis_process", "incident_diagnosis_steps", "incident_id", IncidentDiagnosisStepDB),
+)
+
+
+def _columns(db, table: str, is_sqlite: bool) -> set:
+    return {
+        row[1] if is_sqlite else row[0]
+        for row in db.execute(text(
+            f"PRAGMA table_info({table})" if is_sqlite else
+            "SELECT column_name FROM information_schema.columns WHERE table_name = :table"
+        ), {} if is_sqlite else {"table": table})
+    }
+
+
+def _copy_history(db, parent: str, column: str, child: str, fk: str, is_sqlite: bool) -> None:
+    """Inserta una fila hija por elemento del array (seq = posición 1..n)"""
+    if is_sqlite:
+        db.execute(text(f"""
+            INSERT INTO {child} ({fk}, seq, payload, created_at)
+            SELECT p.id, CAST(e.key AS INTEGER) + 1, e.value, p.created_at
+            FROM {parent} p, json_each(p.{column}) e
+            WHERE p.{column} IS NOT NULL
+        """))
+    else:
+        # La columna puede ser json o jsonb según si se aplicó create_indexes.sql
+        db.execute(text(f"""
+            INSERT INTO {child} ({fk}, seq, payload, created_at)
+            SELECT p.id, e.seq, e.value, p.created_at
+            FROM {parent} p,
+                 jsonb_array_elements(p.{column}::jsonb) WITH ORDINALITY AS e(value, seq)
+            WHERE p.{column} IS NOT NULL
+        """))
+
+
+def migrate_split_simulator_histories():
+    """
+    Mueve los arrays JSON de entrevistas/incidentes a tablas hijas
+    """
+    print("=" * 80)
+    print("Migración: Historiales de simuladores en tablas hijas")
+    print("=" * 80)
+
+    # init_database crea las tablas hijas si no existen (create_all)
+    init_database()
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        db_url = str(db.bind.url)
+        is_sqlite = db_url.startswith('sqlite')
+
+        print(f"\nBase de datos detectada: {'SQLite' if is_sqlite else 'PostgreSQL'}")
+
+        for step, (parent, column, child, fk, model) in enumerate(HISTORY_COLUMNS, start=1):
+            print(f"\n[{step}/{len(HISTORY_COLUMNS)}] {parent}.{column} -> {child}...")
+            if column not in _columns(db, parent, is_sqlite):
+                print("  ⚠ Columna ya migrada, saltando...")
+                continue
+
+            model.__table__.create(bind=db.get_bind(), checkfirst=True)
+            _copy_history(db, parent, column, child, fk, is_sqlite)
+            # SQLite >= 3.35 soporta DROP COLUMN
+            db.execute(text(f"ALTER TABLE {parent} DROP COLUMN {column}"))
+            # Una transacción por columna: si falla, el array queda intacto
+            db.commit()
+            print(f"✓ {column} migrada")
+
+    except Exception as e:
+        print(f"\n✗ Error durante la migración: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_split_simulator_histories()
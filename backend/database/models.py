@@ -8,9 +8,9 @@ Models:
 - EvaluationDB: Process evaluations
 """
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import Column, String, Text, Float, Integer, Boolean, ForeignKey, JSON, DateTime, Index
+from sqlalchemy import Column, String, Text, Float, Integer, Boolean, ForeignKey, JSON, DateTime, Index, LargeBinary, text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -30,7 +30,8 @@ class JSONBCompatible(TypeDecorator):
             return dialect.type_descriptor(JSONB())
         return dialect.type_descriptor(JSON())
 
-from .base import Base, BaseModel
+from .base import Base, BaseModel, new_uuid7_str
+from .compression import compress_text, decompress_text
 
 
 def _utc_now():
@@ -508,13 +509,28 @@ class ActivityDB(Base, BaseModel):
     published_at = Column(DateTime, nullable=True)
 
     # Composite indexes for common query patterns
+    # (created_at al final: el planner recorre el índice en orden y evita el
+    # sort de ORDER BY created_at DESC; los B-tree se leen también hacia atrás)
     __table_args__ = (
-        # Query: Get activities by teacher
-        Index('idx_activity_teacher_status', 'teacher_id', 'status'),
-        # Query: Get active activities
+        # Query: get_by_teacher(teacher_id, status) ORDER BY created_at DESC
+        Index('idx_activity_teacher_status_created', 'teacher_id', 'status', 'created_at'),
+        # Query: get_by_teacher(teacher_id) sin filtro de estado
+        Index('idx_activity_teacher_created', 'teacher_id', 'created_at'),
+        # Query: get_all(status) / actividades activas
         Index('idx_activity_status_created', 'status', 'created_at'),
+        # Query: get_all(status, subject, difficulty) ORDER BY created_at DESC
+        Index(
+            'idx_activity_status_subject_diff_created',
+            'status', 'subject', 'difficulty', 'created_at',
+        ),
         # Query: Search by subject
         Index('idx_activity_subject_status', 'subject', 'status'),
+        # Query: catálogo de actividades publicadas (el caso dominante)
+        Index(
+            'idx_activity_active_created', 'created_at',
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
     )
 
 class UserDB(Base, BaseModel):
@@ -527,6 +543,11 @@ class UserDB(Base, BaseModel):
 
     __tablename__ = "users"
 
+    # PK time-ordered (UUIDv7): inserts append-mostly en el índice de la PK.
+    # Se mantiene String(36) porque sessions.user_id (String(100), con ids
+    # legacy no-UUID) y backend.models.user.User mapean la misma columna.
+    id = Column(String(36), primary_key=True, default=new_uuid7_str)
+
     # Authentication
     email = Column(String(255), unique=True, nullable=False, index=True)
     username = Column(String(100), unique=True, nullable=False, index=True)
@@ -550,26 +571,78 @@ class UserDB(Base, BaseModel):
 
     # Composite indexes for common query patterns
     __table_args__ = (
-        # Query: Login (email + active status)
-        Index('idx_email_active', 'email', 'is_active'),
-        # Query: Login by username
-        Index('idx_username_active', 'username', 'is_active'),
+        # Query: get_by_email -> WHERE lower(email) = :email (case-insensitive,
+        # también garantiza unicidad sin distinguir mayúsculas)
+        Index('ux_users_email_lower', func.lower(email), unique=True),
+        # Query: get_recently_active -> ORDER BY last_login DESC (usuarios que
+        # nunca iniciaron sesión quedan fuera del índice)
+        Index(
+            'ix_users_last_login', 'last_login',
+            postgresql_where=text("last_login IS NOT NULL"),
+            sqlite_where=text("last_login IS NOT NULL"),
+        ),
         # Query: Get users by role
-        Index('idx_roles', 'roles', postgresql_using='gin'),  # GIN index for JSONB array
+        # jsonb_path_ops: índice más compacto, suficiente para `roles @> '["role"]'`
+        Index('idx_roles', 'roles', postgresql_using='gin', postgresql_ops={'roles': 'jsonb_path_ops'}),
     )
 
+    @property
+    def roles_set(self) -> frozenset:
+        """
+        Roles como frozenset para chequeos de pertenencia O(1).
+
+        Se cachea por instancia y se reconstruye cuando `roles` apunta a otra
+        lista: cargar la fila o reasignar la columna (como hacen add_role y
+        remove_role) reemplaza el objeto. Una mutación in-place de la lista no
+        se detecta (el ORM tampoco la detecta en columnas JSON): reasignar.
+        """
+        roles = self.roles
+        cached = getattr(self, "_roles_set_cache", None)
+        if cached is None or cached[0] is not roles:
+            cached = (roles, frozenset(roles or ()))
+            self._roles_set_cache = cached
+        return cached[1]
+
 
 # =============================================================================
 # SPRINT 5 MODELS: Git N2 Traceability + Analytics
 # =============================================================================
 
 
+class GitAuthorDB(Base):
+    """
+    Dimensión de autores Git (nombre + email)
+
+    Un estudiante con 500 commits repetía 500 veces los mismos dos strings en
+    git_traces: cada traza guarda ahora solo author_id (INTEGER) y las páginas
+    de la tabla y sus índices empaquetan más filas por scan.
+    """
+
+    __tablename__ = "git_authors"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False)
+    created_at = Column(DateTime, default=_utc_now, nullable=False)
+
+    __table_args__ = (
+        # Mismo email puede commitear con distintos nombres (git config local)
+        Index('ux_git_author_email_name', 'email', 'name', unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<GitAuthorDB(id={self.id}, email={self.email})>"
+
+
 class GitTraceDB(Base, BaseModel):
     """
     Database model for Git N2-level traceability
 
     SPRINT 5 - HU-SYS-008: Integración Git
     Captura eventos Git (commits, branches, merges) asociados a sesiones de aprendizaje.
+
+    En PostgreSQL puede estar particionada por mes sobre `timestamp`
+    (migrations/partition_git_traces_and_alerts.py).
     """
 
     __tablename__ = "git_traces"
@@ -583,22 +656,28 @@ class GitTraceDB(Base, BaseModel):
     event_type = Column(String(20), nullable=False)  # GitEventType: commit, branch_create, merge, etc.
     commit_hash = Column(String(40), nullable=False, unique=True, index=True)  # SHA-1 hash (40 chars)
     commit_message = Column(Text, nullable=False)
-    author_name = Column(String(255), nullable=False)
-    author_email = Column(String(255), nullable=False)
+    # Autor normalizado en git_authors (ver properties author_name/author_email)
+    author_id = Column(Integer, ForeignKey("git_authors.id"), nullable=False, index=True)
     timestamp = Column(DateTime, nullable=False)  # Commit timestamp
     branch_name = Column(String(255), nullable=False)
     parent_commits = Column(JSON, default=list)  # List of parent commit hashes
 
     # Code changes
-    files_changed = Column(JSON, default=list)  # List of GitFileChange dicts
+    # JSONB + GIN en PostgreSQL: "commits que tocan el archivo X" / "commits con
+    # patrón Y" se resuelven con @> sobre el índice (ver _json_array_contains)
+    files_changed = Column(JSONBCompatible, default=list, nullable=False, server_default=text("'[]'"))  # List of GitFileChange dicts
     total_lines_added = Column(Integer, default=0)
     total_lines_deleted = Column(Integer, default=0)
-    diff = Column(Text, default="")  # Full diff output
+    # Full diff output: comprimido (zstd/zlib) en diff_compressed; se accede
+    # vía la property `diff`. La columna de texto "diff" queda solo para filas
+    # legacy escritas antes de la compresión.
+    diff_compressed = Column(LargeBinary, nullable=True)
+    diff_text = Column("diff", Text, nullable=True)
 
     # Analysis
     is_merge = Column(Boolean, default=False)
     is_revert = Column(Boolean, default=False)
-    detected_patterns = Column(JSON, default=list)  # List of CodePattern strings
+    detected_patterns = Column(JSONBCompatible, default=list, nullable=False, server_default=text("'[]'"))  # List of CodePattern strings
     complexity_delta = Column(Integer, nullable=True)  # Change in cyclomatic complexity
 
     # Correlation with N3/N4 traces
@@ -610,8 +689,10 @@ class GitTraceDB(Base, BaseModel):
     repo_path = Column(String(500), nullable=True)
     remote_url = Column(String(500), nullable=True)
 
-    # Relationship
+    # Relationships
     session = relationship("SessionDB", foreign_keys=[session_id])
+    # Se lee en cada render de la traza: joined (INNER JOIN, author_id NOT NULL)
+    author = relationship("GitAuthorDB", lazy="joined", innerjoin=True)
 
     # Composite indexes for common query patterns
     __table_args__ = (
@@ -621,10 +702,42 @@ class GitTraceDB(Base, BaseModel):
         Index('idx_git_student_timestamp', 'student_id', 'timestamp'),
         # Query: Filter by event type and student
         Index('idx_git_student_event', 'student_id', 'event_type'),
-        # Query: Get commits for student + activity
-        Index('idx_git_student_activity', 'student_id', 'activity_id'),
+        # Query: Get commits for student + activity ordered by time
+        # (incluye timestamp: el ORDER BY se resuelve con el índice, sin sort)
+        Index('idx_git_student_activity_timestamp', 'student_id', 'activity_id', 'timestamp'),
+        # Containment (@>) sobre arrays JSONB (no-op en SQLite)
+        Index('ix_git_traces_patterns_gin', 'detected_patterns', postgresql_using='gin', postgresql_ops={'detected_patterns': 'jsonb_path_ops'}),
+        Index('ix_git_traces_files_gin', 'files_changed', postgresql_using='gin', postgresql_ops={'files_changed': 'jsonb_path_ops'}),
     )
 
+    @property
+    def diff(self) -> str:
+        """Diff completo, descomprimido on demand"""
+        if self.diff_compressed is not None:
+            return decompress_text(self.diff_compressed)
+        return self.diff_text or ""
+
+    @diff.setter
+    def diff(self, value: Optional[str]) -> None:
+        self.diff_compressed = compress_text(value)
+        self.diff_text = None
+
+    @property
+    def author_name(self) -> str:
+        return self.author.name
+
+    @property
+    def author_email(self) -> str:
+        return self.author.email
+
+    def to_dict(self):
+        """Convert model to dictionary (diff descomprimido, sin los bytes; autor aplanado)"""
+        result = super().to_dict()
+        result.pop("diff_compressed", None)
+        result["author_name"] = self.author_name
+        result["author_email"] = self.author_email
+        return result
+
 
 class CourseReportDB(Base, BaseModel):
     """
@@ -687,7 +800,7 @@ class CourseReportDB(Base, BaseModel):
 
     # Recommendations
     institutional_recommendations = Column(JSON, default=list)
-    at_risk_students = Column(JSON, default=list)  # Students requiring intervention
+    at_risk_students = Column(JSONBCompatible, default=list, nullable=False, server_default=text("'[]'"))  # Students requiring intervention
 
     # Export metadata
     format = Column(String(20), default="json")  # json, pdf, xlsx
@@ -700,8 +813,12 @@ class CourseReportDB(Base, BaseModel):
         Index('idx_report_teacher_period', 'teacher_id', 'period_start'),
         # Query: Get course reports by type
         Index('idx_report_course_type', 'course_id', 'report_type'),
+        # Query: Get reports for a course ordered by period
+        Index('idx_report_course_period', 'course_id', 'period_start'),
         # Query: Get recent reports
         Index('idx_report_created', 'created_at'),
+        # Query: Reports that flag a student (at_risk_students @> [id])
+        Index('ix_report_at_risk_students_gin', 'at_risk_students', postgresql_using='gin', postgresql_ops={'at_risk_students': 'jsonb_path_ops'}),
     )
 
 
@@ -721,7 +838,7 @@ class RemediationPlanDB(Base, BaseModel):
     teacher_id = Column(String(100), nullable=False, index=True)
 
     # Trigger risks (que motivaron el plan)
-    trigger_risks = Column(JSON, default=list)  # List of Risk IDs
+    trigger_risks = Column(JSONBCompatible, default=list, nullable=False, server_default=text("'[]'"))  # List of Risk IDs
 
     # Plan details
     plan_type = Column(String(50), nullable=False)  # "tutoring", "practice_exercises", "conceptual_review", "policy_clarification"
@@ -759,12 +876,16 @@ class RemediationPlanDB(Base, BaseModel):
 
     # Composite indexes
     __table_args__ = (
-        # Query: Get plans for student by status
-        Index('idx_plan_student_status', 'student_id', 'status'),
+        # Query: Get plans for student by status ordered by start date
+        Index('idx_plan_student_status_start', 'student_id', 'status', 'start_date'),
+        # Query: Get all plans for student ordered by start date
+        Index('idx_plan_student_start', 'student_id', 'start_date'),
         # Query: Get plans by teacher ordered by deadline
         Index('idx_plan_teacher_deadline', 'teacher_id', 'target_completion_date'),
         # Query: Get active plans
         Index('idx_plan_status_start', 'status', 'start_date'),
+        # Query: Plans triggered by a risk (trigger_risks @> [id])
+        Index('ix_plan_trigger_risks_gin', 'trigger_risks', postgresql_using='gin', postgresql_ops={'trigger_risks': 'jsonb_path_ops'}),
     )
 
 
@@ -774,6 +895,9 @@ class RiskAlertDB(Base, BaseModel):
 
     SPRINT 5 - HU-DOC-010: Gestión de Riesgos Institucionales
     Alertas automáticas generadas cuando se detectan patrones de riesgo institucionales.
+
+    En PostgreSQL puede estar particionada por mes sobre `detected_at`
+    (migrations/partition_git_traces_and_alerts.py).
     """
 
     __tablename__ = "risk_alerts"
@@ -791,7 +915,7 @@ class RiskAlertDB(Base, BaseModel):
     # Alert details
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
-    evidence = Column(JSON, default=list)  # Links to risks, sessions, traces
+    evidence = Column(JSONBCompatible, default=list, nullable=False, server_default=text("'[]'"))  # Links to risks, sessions, traces
 
     # Detection
     detected_at = Column(DateTime, default=_utc_now, nullable=False)
@@ -816,17 +940,51 @@ class RiskAlertDB(Base, BaseModel):
 
     # Composite indexes
     __table_args__ = (
+        # Todas las consultas de RiskAlertRepository ordenan por detected_at DESC:
+        # detected_at va al final de cada índice para leer las filas en orden
+        # (scan backward) sin sort. Las variantes con status cubren el filtro opcional.
         # Query: Get open alerts by severity
-        Index('idx_alert_status_severity', 'status', 'severity'),
+        Index('idx_alert_severity_status_detected', 'severity', 'status', 'detected_at'),
         # Query: Get alerts for student
-        Index('idx_alert_student_status', 'student_id', 'status'),
+        Index('idx_alert_student_detected', 'student_id', 'detected_at'),
+        Index('idx_alert_student_status_detected', 'student_id', 'status', 'detected_at'),
         # Query: Get alerts by course ordered by detection time
         Index('idx_alert_course_detected', 'course_id', 'detected_at'),
+        Index('idx_alert_course_status_detected', 'course_id', 'status', 'detected_at'),
         # Query: Get assigned alerts for a teacher
-        Index('idx_alert_assigned_status', 'assigned_to', 'status'),
+        Index('idx_alert_assigned_detected', 'assigned_to', 'detected_at'),
+        Index('idx_alert_assigned_status_detected', 'assigned_to', 'status', 'detected_at'),
+        # Query: Alerts citing a risk/session/trace (evidence @> [id])
+        Index('ix_alert_evidence_gin', 'evidence', postgresql_using='gin', postgresql_ops={'evidence': 'jsonb_path_ops'}),
     )
 
 
+class OutboxEventDB(Base, BaseModel):
+    """
+    Transactional outbox: efectos secundarios pendientes (notificaciones)
+
+    Se inserta en la misma transacción que la entidad que lo origina (p.ej.
+    RiskAlertRepository.create): si el COMMIT falla no queda evento huérfano,
+    y si el proceso muere antes de notificar el evento sigue en la tabla.
+    El OutboxDispatcher (database/outbox.py) lo procesa en background y lo
+    borra cuando todos los handlers del topic terminaron bien.
+    """
+
+    __tablename__ = "outbox_events"
+
+    topic = Column(String(100), nullable=False)  # e.g., "risk_alert.created"
+    payload = Column(JSONBCompatible, nullable=False, default=dict)
+
+    # Reintentos (backoff exponencial vía available_at)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=_utc_now)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Query: Próximos eventos a despachar (orden de llegada)
+        Index('idx_outbox_available_created', 'available_at', 'created_at'),
+    )
+
 # ===============================================================================
 # SPRINT 6 MODELS - Professional Simulators & Advanced Features
 # ===============================================================================
@@ -849,9 +1007,15 @@ class InterviewSessionDB(Base, BaseModel):
     interview_type = Column(String(50), nullable=False)  # "CONCEPTUAL", "ALGORITHMIC", "DESIGN", "BEHAVIORAL"
     difficulty_level = Column(String(20), default="MEDIUM")  # "EASY", "MEDIUM", "HARD"
 
-    # Questions and responses
-    questions_asked = Column(JSON, default=list)
-    # List of:
+    # Questions and responses: una fila por elemento en interview_questions /
+    # interview_responses (ver InterviewQuestionDB). Cada append es un INSERT
+    # en lugar de reescribir un array JSON que crece sin límite.
+    questions = relationship(
+        "InterviewQuestionDB",
+        order_by="InterviewQuestionDB.seq",
+        cascade="all, delete-orphan",
+    )
+    # payload de cada pregunta:
     # {
     #   "question": "Explain polymorphism",
     #   "type": "conceptual",
@@ -859,8 +1023,12 @@ class InterviewSessionDB(Base, BaseModel):
     #   "timestamp": "2025-11-21T10:30:00Z"
     # }
 
-    responses = Column(JSON, default=list)
-    # List of:
+    answers = relationship(
+        "InterviewResponseDB",
+        order_by="InterviewResponseDB.seq",
+        cascade="all, delete-orphan",
+    )
+    # payload de cada respuesta:
     # {
     #   "question_id": 0,
     #   "response": "Student's answer",
@@ -893,12 +1061,58 @@ class InterviewSessionDB(Base, BaseModel):
 
     # Composite indexes
     __table_args__ = (
-        # Query: Get interviews for a student ordered by date
-        Index('idx_interview_student_created', 'student_id', 'created_at'),
+        # Query: Get interviews for a student ordered by date (get_by_student /
+        # page_by_student: el id desempata el cursor keyset, así el ORDER BY
+        # created_at DESC, id DESC es un scan del índice hacia atrás sin sort)
+        Index('idx_interview_student_created', 'student_id', 'created_at', 'id'),
         # Query: Get interviews by type and difficulty
         Index('idx_interview_type_difficulty', 'interview_type', 'difficulty_level'),
     )
 
+    @property
+    def questions_asked(self) -> List[dict]:
+        """Preguntas en orden de llegada (payloads de `questions`)"""
+        return [question.payload for question in self.questions]
+
+    @property
+    def responses(self) -> List[dict]:
+        """Respuestas en orden de llegada (payloads de `answers`)"""
+        return [answer.payload for answer in self.answers]
+
+
+class InterviewQuestionDB(Base):
+    """
+    Pregunta de una entrevista (una fila por append)
+
+    questions_asked era un array JSON en interview_sessions: cada append
+    reescribía el valor completo (TOAST incluido), O(n) por pregunta. Con una
+    fila por elemento agregar es un INSERT O(1) y la PK (interview_id, seq)
+    sirve tanto para leer el historial en orden como para calcular el
+    próximo seq.
+    """
+
+    __tablename__ = "interview_questions"
+
+    interview_id = Column(
+        String(36), ForeignKey("interview_sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq = Column(Integer, primary_key=True)  # 1..n en orden de llegada
+    payload = Column(JSONBCompatible, nullable=False)
+    created_at = Column(DateTime, default=_utc_now, nullable=False)
+
+
+class InterviewResponseDB(Base):
+    """Respuesta del estudiante en una entrevista (ver InterviewQuestionDB)"""
+
+    __tablename__ = "interview_responses"
+
+    interview_id = Column(
+        String(36), ForeignKey("interview_sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq = Column(Integer, primary_key=True)
+    payload = Column(JSONBCompatible, nullable=False)
+    created_at = Column(DateTime, default=_utc_now, nullable=False)
+
 
 class IncidentSimulationDB(Base, BaseModel):
     """
@@ -924,9 +1138,14 @@ class IncidentSimulationDB(Base, BaseModel):
     simulated_logs = Column(Text, nullable=True)  # Simulated error logs
     simulated_metrics = Column(JSON, default=dict)  # Simulated monitoring metrics
 
-    # Diagnosis process (captured as trace)
-    diagnosis_process = Column(JSON, default=list)
-    # List of:
+    # Diagnosis process (captured as trace): una fila por paso en
+    # incident_diagnosis_steps (ver IncidentDiagnosisStepDB)
+    diagnosis_steps = relationship(
+        "IncidentDiagnosisStepDB",
+        order_by="IncidentDiagnosisStepDB.seq",
+        cascade="all, delete-orphan",
+    )
+    # payload de cada paso:
     # {
     #   "step": 1,
     #   "action": "Checked application logs",
@@ -965,11 +1184,29 @@ class IncidentSimulationDB(Base, BaseModel):
     # Composite indexes
     __table_args__ = (
         # Query: Get incidents for a student ordered by date
-        Index('idx_incident_student_created', 'student_id', 'created_at'),
+        Index('idx_incident_student_created', 'student_id', 'created_at', 'id'),
         # Query: Get incidents by type and severity
         Index('idx_incident_type_severity', 'incident_type', 'severity'),
     )
 
+    @property
+    def diagnosis_process(self) -> List[dict]:
+        """Pasos de diagnóstico en orden (payloads de `diagnosis_steps`)"""
+        return [step.payload for step in self.diagnosis_steps]
+
+
+class IncidentDiagnosisStepDB(Base):
+    """Paso de diagnóstico de un incidente (ver InterviewQuestionDB)"""
+
+    __tablename__ = "incident_diagnosis_steps"
+
+    incident_id = Column(
+        String(36), ForeignKey("incident_simulations.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq = Column(Integer, primary_key=True)
+    payload = Column(JSONBCompatible, nullable=False)
+    created_at = Column(DateTime, default=_utc_now, nullable=False)
+
 
 class LTIDeploymentDB(Base, BaseModel):
     """
@@ -1004,8 +1241,14 @@ class LTIDeploymentDB(Base, BaseModel):
     __table_args__ = (
         # Unique constraint: One deployment per issuer + deployment_id
         Index('idx_lti_deployment_unique', 'issuer', 'deployment_id', unique=True),
-        # Query: Get active deployments
-        Index('idx_lti_deployment_active', 'is_active'),
+        # Query: deployments activos por plataforma. Índice parcial: solo
+        # indexa las filas activas (pocas, siempre en caché) en vez de un
+        # índice sobre un booleano de baja selectividad
+        Index(
+            'idx_lti_deployment_active', 'platform_name',
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
     )
 
 
@@ -1086,6 +1329,9 @@ class LTISessionDB(Base, BaseModel):
 
     # Launch metadata
     launch_token = Column(Text, nullable=True)  # JWT token from LTI launch (for AGS)
+    # SHA-256 hex del launch_token: clave de idempotencia de los reintentos
+    # del launch (el JWT completo es demasiado largo para un índice B-tree)
+    launch_token_hash = Column(String(64), nullable=True)
     locale = Column(String(10), nullable=True)  # User's locale (e.g., "es_AR")
 
     # Relationships
@@ -1094,10 +1340,14 @@ class LTISessionDB(Base, BaseModel):
 
     # Composite indexes
     __table_args__ = (
-        # Query: Get LTI sessions for a user
-        Index('idx_lti_session_user', 'lti_user_id'),
+        # Query: Get LTI sessions for a user, newest first (get_by_lti_user /
+        # page_by_lti_user)
+        Index('idx_lti_session_user_created', 'lti_user_id', 'created_at', 'id'),
         # Query: Get LTI sessions for a resource
         Index('idx_lti_session_resource', 'resource_link_id'),
         # Query: Get LTI session by AI-Native session
         Index('idx_lti_session_native', 'session_id'),
+        # Un launch reintentado no duplica la sesión (ON CONFLICT en create).
+        # Launches sin token: NULL no colisiona en un índice UNIQUE
+        Index('ux_lti_session_launch', 'deployment_id', 'launch_token_hash', unique=True),
     )
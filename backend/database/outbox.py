@@ -0,0 +1,229 @@
+"""
+Transactional outbox: despacho en background de efectos secundarios
+
+Crear una alerta de riesgo no debería esperar a que se envíe un email, un
+mensaje de Slack o un webhook. Los repositorios escriben un OutboxEventDB en
+la misma transacción que la entidad (sin RPC en el request) y el dispatcher
+los procesa en background:
+
+    dispatcher = get_outbox_dispatcher()
+    dispatcher.register("risk_alert.created", notify_teachers)
+
+- Entrega at-least-once: el evento se borra recién cuando todos los handlers
+  del topic terminaron bien. Los handlers deben ser idempotentes.
+- Un handler que falla reprograma el evento con backoff exponencial
+  (available_at); tras MAX_ATTEMPTS el evento queda en la tabla para
+  inspección manual (last_error).
+- Solo se toman eventos de topics con handlers registrados: los demás quedan
+  en la tabla hasta que algún proceso registre un handler para su topic.
+- El lote se reclama en una transacción corta (FOR UPDATE SKIP LOCKED en
+  PostgreSQL + lease vía available_at) y se commitea antes de correr los
+  handlers: la I/O de red no retiene locks de fila. Un segundo COMMIT borra
+  los entregados y reprograma los fallidos. Si el proceso muere en el medio,
+  el lease vence y otro worker los reintenta.
+"""
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from .base import _utc_now
+from .models import OutboxEventDB
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISPATCH_INTERVAL_SECONDS = 1.0
+DEFAULT_BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+BASE_BACKOFF_SECONDS = 5
+# Tiempo que un lote reclamado queda reservado para el worker que lo tomó
+CLAIM_LEASE_SECONDS = 300
+
+OutboxHandler = Callable[[Dict[str, Any]], None]
+
+
+class OutboxDispatcher:
+    """
+    Registro de handlers por topic + despacho por lotes de outbox_events.
+
+    Thread-safe: register() puede llamarse al configurar la app mientras el
+    loop de despacho corre en otro thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, List[OutboxHandler]] = {}
+
+    def register(self, topic: str, handler: OutboxHandler) -> None:
+        """Agrega un handler (sincrónico, recibe el payload) para un topic"""
+        with self._lock:
+            self._handlers.setdefault(topic, []).append(handler)
+
+    def handlers_for(self, topic: str) -> List[OutboxHandler]:
+        with self._lock:
+            return list(self._handlers.get(topic, ()))
+
+    def topics(self) -> List[str]:
+        """Topics con al menos un handler registrado"""
+        with self._lock:
+            return [topic for topic, handlers in self._handlers.items() if handlers]
+
+    def dispatch_pending(self, db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Procesa un lote de eventos disponibles.
+
+        Args:
+            db: Sesión de base de datos (el caller la cierra)
+            batch_size: Máximo de eventos por llamada
+
+        Returns:
+            Cantidad de eventos despachados (borrados)
+        """
+        topics = self.topics()
+        if not topics:
+            return 0
+
+        now = _utc_now()
+        events = self._claim(db, topics, now, batch_size)
+        if not events:
+            return 0
+
+        # Fuera de toda transacción: los handlers hacen I/O de red
+        delivered = []
+        failed = []
+        for event_id, topic, payload, attempts in events:
+            error = self._run_handlers(event_id, topic, payload, attempts)
+            if error is None:
+                delivered.append(event_id)
+            else:
+                failed.append((event_id, attempts + 1, error))
+
+        try:
+            if delivered:
+                db.execute(
+                    delete(OutboxEventDB)
+                    .where(OutboxEventDB.id.in_(delivered))
+                    .execution_options(synchronize_session=False)
+                )
+            for event_id, attempts, error in failed:
+                db.execute(
+                    update(OutboxEventDB)
+                    .where(OutboxEventDB.id == event_id)
+                    .values(
+                        attempts=attempts,
+                        last_error=error,
+                        available_at=_utc_now() + timedelta(
+                            seconds=BASE_BACKOFF_SECONDS * 2 ** (attempts - 1)
+                        ),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return len(delivered)
+
+    def _claim(
+        self, db: Session, topics: List[str], now, batch_size: int
+    ) -> List[Tuple[str, str, Dict[str, Any], int]]:
+        """
+        Reclama un lote (lease de CLAIM_LEASE_SECONDS) y commitea.
+
+        Returns:
+            (id, topic, payload, attempts) de cada evento reclamado
+        """
+        stmt = (
+            select(
+                OutboxEventDB.id,
+                OutboxEventDB.topic,
+                OutboxEventDB.payload,
+                OutboxEventDB.attempts,
+            )
+            .where(
+                OutboxEventDB.topic.in_(topics),
+                OutboxEventDB.available_at <= now,
+                OutboxEventDB.attempts < MAX_ATTEMPTS,
+            )
+            .order_by(OutboxEventDB.available_at, OutboxEventDB.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            events = [tuple(row) for row in db.execute(stmt).all()]
+            if events:
+                db.execute(
+                    update(OutboxEventDB)
+                    .where(OutboxEventDB.id.in_([event[0] for event in events]))
+                    .values(available_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS))
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return events
+
+    def _run_handlers(
+        self, event_id: str, topic: str, payload: Dict[str, Any], attempts: int
+    ) -> Optional[str]:
+        """Ejecuta los handlers del topic; devuelve el error o None si todos OK"""
+        for handler in self.handlers_for(topic):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.warning(
+                    f"Outbox handler failed for {topic}: {e}",
+                    extra={"event_id": event_id, "attempts": attempts + 1},
+                )
+                return f"{type(e).__name__}: {e}"
+        return None
+
+
+async def run_outbox_dispatcher(
+    dispatcher: "OutboxDispatcher",
+    session_factory: Callable[[], Session],
+    interval: float = DEFAULT_DISPATCH_INTERVAL_SECONDS,
+) -> None:
+    """
+    Loop de despacho periódico (para lanzar con asyncio.create_task en el lifespan).
+
+    Cada lote corre en un thread (asyncio.to_thread): ni la query ni los
+    handlers (I/O de red) bloquean el event loop. Mientras haya lotes llenos
+    sigue despachando sin esperar el intervalo.
+    """
+
+    def _dispatch_once() -> int:
+        db = session_factory()
+        try:
+            return dispatcher.dispatch_pending(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            dispatched = await asyncio.to_thread(_dispatch_once)
+        except Exception as e:
+            logger.warning(f"Outbox dispatch failed (will retry): {e}")
+            dispatched = 0
+        if dispatched < DEFAULT_BATCH_SIZE:
+            await asyncio.sleep(interval)
+
+
+# Global dispatcher instance (singleton)
+_outbox_dispatcher: Optional[OutboxDispatcher] = None
+_outbox_dispatcher_lock = threading.Lock()
+
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """Get the process-wide outbox dispatcher (thread-safe singleton)"""
+    global _outbox_dispatcher
+    if _outbox_dispatcher is None:
+        with _outbox_dispatcher_lock:
+            if _outbox_dispatcher is None:
+                _outbox_dispatcher = OutboxDispatcher()
+    return _outbox_dispatcher
@@ -8,13 +8,20 @@ Provides:
 - EvaluationRepository: Manage evaluations
 - UserRepository: Manage user authentication and authorization
 """
+import hashlib
+import threading
+import weakref
 from datetime import datetime
-from typing import List, Optional, Any, Type, Dict
-from uuid import uuid4
+from types import MappingProxyType
+from typing import List, Optional, Any, Type, Dict, Mapping, Callable, Iterator, Tuple
 from enum import Enum
 
-from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import desc, select
+from sqlalchemy.orm import Session, selectinload, joinedload, raiseload, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import desc, select, insert, update, exists, func, type_coerce, cast, String, lambda_stmt, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 from .models import (
     SessionDB,
@@ -27,11 +34,14 @@ from .models import (
     UserDB,
     # Sprint 5 models
     GitTraceDB,
+    GitAuthorDB,
     CourseReportDB,
     RemediationPlanDB,
     RiskAlertDB,
+    OutboxEventDB,
     # Sprint 6 models
     InterviewSessionDB,
+    InterviewQuestionDB,
     IncidentSimulationDB,
     LTIDeploymentDB,
     LTISessionDB,
@@ -39,6 +49,12 @@ from .models import (
 from ..models.trace import CognitiveTrace, TraceSequence, CognitiveState, TraceLevel, InteractionType
 from ..models.risk import Risk, RiskReport, RiskType, RiskLevel
 from ..models.evaluation import EvaluationReport, CompetencyLevel
+from .base import new_uuid7_str, _utc_now
+from .compression import compress_text
+from .transaction import UOW_DEPTH_KEY
+from .user_cache import UserLookupCache
+from .lti_cache import LTIDeploymentCache
+from ..core.cache import LRUCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -163,6 +179,254 @@ def _safe_enum_to_str(value: Any, enum_class: Type[Enum]) -> Optional[str]:
     )
 
 
+def _json_array_contains(db: Session, column, value: str, key: Optional[str] = None):
+    """
+    Predicado SQL "el array JSON `column` contiene `value`".
+
+    - PostgreSQL: operador JSONB `@>` (usa el índice GIN de la columna)
+    - SQLite: EXISTS sobre json_each(column)
+
+    Args:
+        db: Sesión activa (para detectar el dialecto)
+        column: Columna JSON/JSONB que almacena un array
+        value: Elemento a buscar
+        key: Si el array es de objetos, campo a comparar
+            (p.ej. files_changed -> key="file_path")
+
+    Returns:
+        Expresión booleana SQLAlchemy utilizable en .filter()/.where()
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        element = {key: value} if key else value
+        return type_coerce(column, JSONB).contains([element])
+
+    elements = func.json_each(column).table_valued("value")
+    item = func.json_extract(elements.c.value, f"$.{key}") if key else elements.c.value
+    return exists(select(1).select_from(elements).where(item == value))
+
+
+def _top_per_group(
+    db: Session,
+    entity,
+    group_col,
+    order_by,
+    keys: List[str],
+    limit: Optional[int],
+    *criteria,
+    options: tuple = (raiseload("*"),),
+) -> Dict[str, List[Any]]:
+    """
+    Las `limit` filas más recientes por clave, para muchas claves en una query.
+
+    ROW_NUMBER() OVER (PARTITION BY group_col ORDER BY ...) sobre el IN de
+    claves: un roster de 30 estudiantes es una query en vez de 30. Funciona
+    igual en PostgreSQL y SQLite (>= 3.25).
+
+    Returns:
+        Dict clave -> lista de entidades (las claves sin filas quedan con [])
+    """
+    grouped: Dict[str, List[Any]] = {key: [] for key in keys}
+    if not grouped:
+        return grouped
+
+    filters = (group_col.in_(list(grouped)), *criteria)
+    if limit:
+        row_number = func.row_number().over(partition_by=group_col, order_by=order_by)
+        ranked = select(entity.id, row_number.label("rn")).where(*filters).subquery()
+        stmt = select(entity).join(ranked, entity.id == ranked.c.id).where(ranked.c.rn <= limit)
+    else:
+        stmt = select(entity).where(*filters)
+    stmt = stmt.options(*options).order_by(group_col, order_by)
+
+    for row in db.execute(stmt).scalars():
+        grouped[getattr(row, group_col.key)].append(row)
+    return grouped
+
+
+def _launch_token_hash(launch_token: Optional[str]) -> Optional[str]:
+    """SHA-256 hex del token de launch LTI (clave de ux_lti_session_launch)"""
+    if launch_token is None:
+        return None
+    return hashlib.sha256(launch_token.encode("utf-8")).hexdigest()
+
+
+# Cursor de paginación keyset: (created_at, id) de la última fila de la página
+KeysetCursor = Tuple[datetime, str]
+
+DEFAULT_PAGE_SIZE = 50
+
+# Tamaño de lote de BaseRepository._stream (yield_per)
+DEFAULT_STREAM_BATCH_SIZE = 100
+
+
+# INSERT ... RETURNING por modelo, construido una sola vez: el mismo objeto
+# statement en cada create() da siempre la misma cache key, así que la
+# compilación se resuelve desde el compiled cache del engine (query_cache_size)
+# sin pasar por el unit of work del flush. No se precompila contra un dialecto
+# fijo: el cache del engine ya guarda la forma compilada por dialecto.
+_insert_returning: Dict[type, Any] = {}
+
+
+class BaseRepository:
+    """
+    Base de los repositorios: sesión + camino único de INSERT.
+
+    Los create() validan/normalizan argumentos y delegan en _insert(): así
+    cualquier ajuste del camino de escritura (RETURNING, ids UUIDv7, outbox)
+    se aplica a todos los repositorios por igual.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def _insert(self, model_cls, **fields):
+        """
+        INSERT ... RETURNING de una fila (sin flush ni refresh posterior).
+
+        No hace commit: el llamador decide el límite de la transacción (p.ej.
+        entidad + evento de outbox en un mismo commit). Si no se pasa `id`,
+        se genera un UUIDv7.
+
+        Returns:
+            Instancia ORM creada (queda en el identity map de la sesión)
+        """
+        stmt = _insert_returning.get(model_cls)
+        if stmt is None:
+            stmt = _insert_returning.setdefault(model_cls, insert(model_cls).returning(model_cls))
+        fields.setdefault("id", new_uuid7_str())
+        return self.db.scalars(stmt, [fields]).one()
+
+    def _keyset_page(
+        self, stmt, entity, cursor: Optional[KeysetCursor], limit: int
+    ) -> Tuple[List[Any], Optional[KeysetCursor]]:
+        """
+        Página "más recientes primero" por keyset sobre (created_at, id).
+
+        WHERE (created_at, id) < (:ts, :id) en vez de OFFSET: el costo no
+        crece con la profundidad de la página (el índice arranca en el
+        cursor) y nunca se materializa el historial completo. El id (UUIDv7)
+        desempata filas con el mismo created_at.
+
+        Sin COUNT(*): se piden limit + 1 filas y la fila extra solo indica si
+        hay página siguiente (has_more == next_cursor is not None). Los
+        listados con scroll infinito no necesitan el total.
+
+        Returns:
+            (filas, cursor de la página siguiente o None si no hay más)
+        """
+        if cursor is not None:
+            stmt = stmt.where(tuple_(entity.created_at, entity.id) < tuple_(*cursor))
+        stmt = stmt.order_by(desc(entity.created_at), desc(entity.id)).limit(limit + 1)
+        rows = self.db.execute(stmt).scalars().all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].id)
+
+    def _stream(self, stmt, batch_size: int = DEFAULT_STREAM_BATCH_SIZE) -> Iterator[Any]:
+        """
+        Itera las entidades del resultado en lotes de `batch_size` filas.
+
+        yield_per implica stream_results: en PostgreSQL usa un cursor del
+        servidor y solo un lote (con sus columnas JSON) está hidratado a la
+        vez. El cursor mantiene la conexión ocupada hasta agotar el iterador.
+        """
+        return iter(self.db.execute(stmt.execution_options(yield_per=batch_size)).scalars())
+
+    def _get(self, model_cls, row_id: str, options: tuple = ()):
+        """
+        Lookup por PK vía Session.get: consulta primero el identity map.
+
+        Dentro de un request (una sesión, expire_on_commit=False) los
+        get_by_id repetidos después de create/add_*/complete_* no vuelven a
+        la base: _insert y _update_by_id dejan la instancia cargada y
+        actualizada con RETURNING. `options` (p.ej. selectinload) solo se
+        aplican si la fila no estaba ya en el identity map.
+        """
+        return self.db.get(model_cls, row_id, options=list(options))
+
+    def _update_by_id(self, model_cls, row_id: str, **values):
+        """
+        UPDATE <tabla> SET ... WHERE id = :id RETURNING * (un solo round-trip)
+
+        Reemplaza get_by_id + mutar + commit + refresh. updated_at lo completa
+        el onupdate de la columna en el mismo UPDATE.
+
+        Returns:
+            Instancia actualizada, o None si no existe
+        """
+        stmt = (
+            update(model_cls)
+            .where(model_cls.id == row_id)
+            .values(**values)
+            .returning(model_cls)
+        )
+        row = self.db.execute(stmt).scalar_one_or_none()
+        self._commit()
+        return row
+
+    def _append_children(self, parent_cls, parent_id: str, collection, payloads: List[dict]):
+        """
+        Agrega filas (parent_id, seq, payload) a una colección hija ordenada por seq.
+
+        Dos statements, ninguno proporcional al historial:
+        1. UPDATE <padre> SET updated_at ... RETURNING *: verifica que exista,
+           toca updated_at y bloquea la fila del padre hasta el commit, así
+           dos appends concurrentes no calculan el mismo seq.
+        2. INSERT de una fila por payload, con seq = max(seq) + i resuelto en
+           el servidor sobre la PK (padre, seq).
+
+        Args:
+            parent_cls: Modelo padre (p.ej. InterviewSessionDB)
+            parent_id: ID del padre
+            collection: Relationship ordenada por seq (p.ej. InterviewSessionDB.questions)
+            payloads: Elementos a agregar, en orden
+
+        Returns:
+            Instancia padre, o None si no existe
+        """
+        prop = collection.property
+        child_cls = prop.mapper.class_
+        parent_fk = prop.local_remote_pairs[0][1]
+
+        parent = self.db.execute(
+            update(parent_cls)
+            .where(parent_cls.id == parent_id)
+            .values(updated_at=_utc_now())
+            .returning(parent_cls)
+        ).scalar_one_or_none()
+        if parent is None:
+            return None
+
+        last_seq = (
+            select(func.coalesce(func.max(child_cls.seq), 0))
+            .where(parent_fk == parent_id)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            insert(child_cls).values([
+                {parent_fk.key: parent_id, "seq": last_seq + offset, "payload": payload}
+                for offset, payload in enumerate(payloads, start=1)
+            ])
+        )
+        # La colección cargada (si la había) no incluye las filas nuevas
+        self.db.expire(parent, [collection.key])
+        self._commit()
+        return parent
+
+    def _commit(self) -> None:
+        """
+        Confirma la escritura: commit(), o solo flush() si hay un
+        unit_of_work() abierto (el commit lo hace el bloque).
+
+        Sin refresh(): _insert/_update_by_id ya traen la fila con RETURNING.
+        """
+        if self.db.info.get(UOW_DEPTH_KEY):
+            self.db.flush()
+            return
+        self.db.commit()
+
+
 class SessionRepository:
     """Repository for session operations"""
 
@@ -191,7 +455,7 @@ class SessionRepository:
             Created SessionDB instance
         """
         session = SessionDB(
-            id=str(uuid4()),
+            id=new_uuid7_str(),
             student_id=student_id,
             activity_id=activity_id,
             mode=mode,
@@ -199,7 +463,6 @@ class SessionRepository:
         )
         self.db.add(session)
         self.db.commit()
-        self.db.refresh(session)
         return session
 
     def get_by_id(self, session_id: str, load_relations: bool = False) -> Optional[SessionDB]:
@@ -434,7 +697,7 @@ class TraceRepository:
         """Create a new cognitive trace"""
         # ✅ FIXED (2025-11-22): Conversión defensiva de enums (C5)
         db_trace = CognitiveTraceDB(
-            id=trace.id or str(uuid4()),
+            id=trace.id or new_uuid7_str(),
             session_id=trace.session_id,
             student_id=trace.student_id,
             activity_id=trace.activity_id,
@@ -454,7 +717,6 @@ class TraceRepository:
         )
         self.db.add(db_trace)
         self.db.commit()
-        self.db.refresh(db_trace)
         return db_trace
 
     def get_by_id(self, trace_id: str) -> Optional[CognitiveTraceDB]:
@@ -540,7 +802,7 @@ class RiskRepository:
         """
         # ✅ FIXED (2025-11-22): Conversión defensiva de enums (C5)
         db_risk = RiskDB(
-            id=risk.id or str(uuid4()),
+            id=risk.id or new_uuid7_str(),
             session_id=risk.session_id,  # REQUIRED field (Phase 0 fix)
             student_id=risk.student_id,
             activity_id=risk.activity_id,
@@ -549,11 +811,11 @@ class RiskRepository:
             dimension=risk.dimension.value,  # RiskDimension - mantener .value por ahora (no hay import)
             description=risk.description,
             impact=risk.impact,  # Optional[str], defaults to None
-            evidence=risk.evidence,  # List[str], defaults to []
-            trace_ids=risk.trace_ids,  # List[str], defaults to []
+            evidence=list(risk.evidence),  # Tuple[str, ...] -> JSON array
+            trace_ids=list(risk.trace_ids),  # Tuple[str, ...] -> JSON array
             root_cause=risk.root_cause,  # Optional[str], defaults to None
             impact_assessment=risk.impact_assessment,  # Optional[str], defaults to None
-            recommendations=risk.recommendations,  # List[str], defaults to []
+            recommendations=list(risk.recommendations),  # Tuple[str, ...] -> JSON array
             pedagogical_intervention=risk.pedagogical_intervention,  # Optional[str], defaults to None
             resolved=risk.resolved,  # bool, defaults to False
             resolution_notes=risk.resolution_notes,  # Optional[str], defaults to None
@@ -561,7 +823,6 @@ class RiskRepository:
         )
         self.db.add(db_risk)
         self.db.commit()
-        self.db.refresh(db_risk)
         return db_risk
 
     def get_by_id(self, risk_id: str) -> Optional[RiskDB]:
@@ -625,7 +886,6 @@ class RiskRepository:
         if risk:
             risk.resolved = True
             risk.resolution_notes = resolution_notes
-            risk.updated_at = datetime.utcnow()
             self.db.commit()
             return True
         return False
@@ -700,7 +960,7 @@ class EvaluationRepository:
 
         # ✅ FIXED (2025-11-22): Conversión defensiva de enums (C5)
         db_evaluation = EvaluationDB(
-            id=str(uuid4()),
+            id=new_uuid7_str(),
             session_id=evaluation.session_id,
             student_id=evaluation.student_id,
             activity_id=evaluation.activity_id,
@@ -716,7 +976,6 @@ class EvaluationRepository:
         )
         self.db.add(db_evaluation)
         self.db.commit()
-        self.db.refresh(db_evaluation)
         return db_evaluation
 
     def get_by_id(self, evaluation_id: str) -> Optional[EvaluationDB]:
@@ -764,7 +1023,6 @@ class TraceSequenceRepository:
         )
         self.db.add(db_sequence)
         self.db.commit()
-        self.db.refresh(db_sequence)
         return db_sequence
 
     def get_by_id(self, sequence_id: str) -> Optional[TraceSequenceDB]:
@@ -785,11 +1043,161 @@ class TraceSequenceRepository:
         )
 
 
-class ActivityRepository:
-    """Repository for activity operations"""
+# =============================================================================
+# Validación de ActivityRepository.update
+# =============================================================================
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
+# Tamaño de lote para los listados en streaming (yield_per)
+ACTIVITY_STREAM_BATCH_SIZE = 200
+
+# Getters de fila única en lambda_stmt: el statement se cachea por la
+# identidad del código de la lambda, sin reconstruir el Select ni calcular su
+# cache key en cada llamada. El valor viaja como bindparam en execute().
+_ACTIVITY_BY_ID = lambda_stmt(
+    lambda: select(ActivityDB).where(ActivityDB.id == bindparam("id"))
+)
+_ACTIVITY_BY_ACTIVITY_ID = lambda_stmt(
+    lambda: select(ActivityDB).where(ActivityDB.activity_id == bindparam("activity_id"))
+)
+
+# Columnas que renderiza ActivityResponse: list_rows las proyecta como filas
+# (RowMapping) sin construir instancias ORM (identity map, estado, eventos)
+_ACTIVITY_LIST_COLUMNS = (
+    ActivityDB.id,
+    ActivityDB.activity_id,
+    ActivityDB.title,
+    ActivityDB.description,
+    ActivityDB.instructions,
+    ActivityDB.evaluation_criteria,
+    ActivityDB.teacher_id,
+    ActivityDB.policies,
+    ActivityDB.subject,
+    ActivityDB.difficulty,
+    ActivityDB.estimated_duration_minutes,
+    ActivityDB.tags,
+    ActivityDB.status,
+    ActivityDB.published_at,
+    ActivityDB.created_at,
+    ActivityDB.updated_at,
+)
+
+# Whitelist de campos actualizables (seguridad): campo -> tipo esperado
+_ACTIVITY_UPDATEABLE_FIELDS: Mapping[str, type] = MappingProxyType({
+    "title": str,
+    "description": str,
+    "instructions": str,
+    "difficulty": str,
+    "tags": list,
+    "learning_objectives": list,
+    "evaluation_criteria": dict,
+    "estimated_duration_minutes": int,
+    "max_ai_assistance": float,
+})
+_ACTIVITY_UPDATEABLE_FIELDS_STR = ", ".join(_ACTIVITY_UPDATEABLE_FIELDS)
+
+_VALID_DIFFICULTIES_ORDERED = ("INICIAL", "INTERMEDIO", "AVANZADO")
+_VALID_DIFFICULTIES = frozenset(_VALID_DIFFICULTIES_ORDERED)
+
+
+def _check_max_ai_assistance(value: float) -> None:
+    if not (0.0 <= value <= 1.0):
+        raise ValueError(
+            f"max_ai_assistance must be in range [0.0, 1.0], got {value}"
+        )
+
+
+def _check_estimated_duration_minutes(value: int) -> None:
+    if value <= 0:
+        raise ValueError(
+            f"estimated_duration_minutes must be positive, got {value}"
+        )
+
+
+def _check_difficulty(value: str) -> None:
+    if value not in _VALID_DIFFICULTIES:
+        raise ValueError(
+            f"difficulty must be one of {list(_VALID_DIFFICULTIES_ORDERED)}, got '{value}'"
+        )
+
+
+def _check_title(value: str) -> None:
+    if not (3 <= len(value) <= 200):
+        raise ValueError(
+            f"title length must be between 3 and 200 characters, got {len(value)}"
+        )
+
+
+def _check_description(value: str) -> None:
+    if len(value) > 2000:
+        raise ValueError(
+            f"description length must be <= 2000 characters, got {len(value)}"
+        )
+
+
+def _check_tags(value: list) -> None:
+    if len(value) == 0:
+        raise ValueError("tags list cannot be empty")
+    if not all(isinstance(tag, str) for tag in value):
+        raise TypeError("tags must be a list of strings")
+    if not all(len(tag) >= 2 for tag in value):
+        raise ValueError("each tag must have at least 2 characters")
+
+
+# ✅ FIXED (2025-11-22): Validación de rangos para prevenir corrupción de datos
+# Tabla de dispatch campo -> validador de rango/valores permitidos
+_ACTIVITY_FIELD_VALIDATORS: Mapping[str, Callable[[Any], None]] = MappingProxyType({
+    "max_ai_assistance": _check_max_ai_assistance,
+    "estimated_duration_minutes": _check_estimated_duration_minutes,
+    "difficulty": _check_difficulty,
+    "title": _check_title,
+    "description": _check_description,
+    "tags": _check_tags,
+})
+
+
+def _validate_activity_update(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valida un update parcial de actividad contra la whitelist.
+
+    Args:
+        fields: Campos a actualizar (kwargs de ActivityRepository.update)
+
+    Returns:
+        Dict con los campos a aplicar (los valores None se ignoran)
+
+    Raises:
+        ValueError: Campo no permitido o valor fuera de rango
+        TypeError: Tipo incorrecto
+    """
+    changes = {}
+    for key, value in fields.items():
+        # Seguridad: Verificar que el campo esté en whitelist
+        expected_type = _ACTIVITY_UPDATEABLE_FIELDS.get(key)
+        if expected_type is None:
+            raise ValueError(
+                f"Cannot update field '{key}'. "
+                f"Allowed fields: {_ACTIVITY_UPDATEABLE_FIELDS_STR}"
+            )
+
+        if value is None:
+            continue
+
+        if not isinstance(value, expected_type):
+            raise TypeError(
+                f"Invalid type for field '{key}': "
+                f"expected {expected_type.__name__}, got {type(value).__name__}"
+            )
+
+        validator = _ACTIVITY_FIELD_VALIDATORS.get(key)
+        if validator is not None:
+            validator(value)
+
+        changes[key] = value
+    return changes
+
+
+class ActivityRepository(BaseRepository):
+    """Repository for activity operations"""
 
     def create(
         self,
@@ -805,14 +1213,17 @@ class ActivityRepository:
         estimated_duration_minutes: Optional[int] = None,
         tags: Optional[List[str]] = None,
     ) -> ActivityDB:
-        """Create a new activity"""
-        # Verificar que activity_id no exista
-        existing = self.get_by_activity_id(activity_id)
-        if existing:
-            raise ValueError(f"Activity with ID '{activity_id}' already exists")
+        """
+        Create a new activity.
 
+        La unicidad de activity_id la garantiza el UNIQUE constraint de la tabla:
+        no se hace un SELECT previo (un round-trip menos y sin race TOCTOU).
+
+        Raises:
+            ValueError: Si ya existe una actividad con ese activity_id
+        """
         activity = ActivityDB(
-            id=str(uuid4()),
+            id=new_uuid7_str(),
             activity_id=activity_id,
             title=title,
             description=description,
@@ -827,26 +1238,37 @@ class ActivityRepository:
             status="draft",
         )
         self.db.add(activity)
-        self.db.commit()
-        self.db.refresh(activity)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError(f"Activity with ID '{activity_id}' already exists")
         return activity
 
     def get_by_id(self, id: str) -> Optional[ActivityDB]:
         """Get activity by ID"""
-        return self.db.query(ActivityDB).filter(ActivityDB.id == id).first()
+        return self.db.execute(_ACTIVITY_BY_ID, {"id": id}).scalar_one_or_none()
 
     def get_by_activity_id(self, activity_id: str) -> Optional[ActivityDB]:
         """Get activity by activity_id (unique identifier)"""
-        return self.db.query(ActivityDB).filter(ActivityDB.activity_id == activity_id).first()
+        return self.db.execute(
+            _ACTIVITY_BY_ACTIVITY_ID, {"activity_id": activity_id}
+        ).scalar_one_or_none()
 
     def get_by_teacher(
         self, teacher_id: str, status: Optional[str] = None
-    ) -> List[ActivityDB]:
-        """Get all activities created by a teacher"""
-        query = self.db.query(ActivityDB).filter(ActivityDB.teacher_id == teacher_id)
+    ) -> Iterator[ActivityDB]:
+        """
+        Get all activities created by a teacher.
+
+        Devuelve un iterador (ver _stream): consumir con un for o list().
+        """
+        stmt = select(ActivityDB).where(ActivityDB.teacher_id == teacher_id)
         if status:
-            query = query.filter(ActivityDB.status == status)
-        return query.order_by(desc(ActivityDB.created_at)).all()
+            stmt = stmt.where(ActivityDB.status == status)
+        return self._stream(
+            stmt.order_by(desc(ActivityDB.created_at)), ACTIVITY_STREAM_BATCH_SIZE
+        )
 
     def get_all(
         self,
@@ -854,18 +1276,75 @@ class ActivityRepository:
         subject: Optional[str] = None,
         difficulty: Optional[str] = None,
         limit: int = 100,
-    ) -> List[ActivityDB]:
-        """Get all activities with optional filters"""
-        query = self.db.query(ActivityDB)
+    ) -> Iterator[ActivityDB]:
+        """
+        Get all activities with optional filters.
+
+        Devuelve un iterador (ver _stream): consumir con un for o list().
+        """
+        stmt = self._apply_filters(
+            select(ActivityDB), status=status, subject=subject, difficulty=difficulty
+        )
+        return self._stream(
+            stmt.order_by(desc(ActivityDB.created_at)).limit(limit), ACTIVITY_STREAM_BATCH_SIZE
+        )
 
+    @staticmethod
+    def _apply_filters(
+        stmt,
+        teacher_id: Optional[str] = None,
+        status: Optional[str] = None,
+        subject: Optional[str] = None,
+        difficulty: Optional[str] = None,
+    ):
+        """Agrega al statement los filtros opcionales de los listados"""
+        if teacher_id:
+            stmt = stmt.where(ActivityDB.teacher_id == teacher_id)
         if status:
-            query = query.filter(ActivityDB.status == status)
+            stmt = stmt.where(ActivityDB.status == status)
         if subject:
-            query = query.filter(ActivityDB.subject == subject)
+            stmt = stmt.where(ActivityDB.subject == subject)
         if difficulty:
-            query = query.filter(ActivityDB.difficulty == difficulty)
+            stmt = stmt.where(ActivityDB.difficulty == difficulty)
+        return stmt
+
+    def count(
+        self,
+        teacher_id: Optional[str] = None,
+        status: Optional[str] = None,
+        subject: Optional[str] = None,
+        difficulty: Optional[str] = None,
+    ) -> int:
+        """Count activities matching the optional filters (SELECT count(*))"""
+        stmt = self._apply_filters(
+            select(func.count()).select_from(ActivityDB),
+            teacher_id, status, subject, difficulty,
+        )
+        return self.db.execute(stmt).scalar_one()
 
-        return query.order_by(desc(ActivityDB.created_at)).limit(limit).all()
+    def list_rows(
+        self,
+        teacher_id: Optional[str] = None,
+        status: Optional[str] = None,
+        subject: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> List[Mapping[str, Any]]:
+        """
+        Página de actividades como filas de solo lectura, para endpoints de listado.
+
+        Proyecta _ACTIVITY_LIST_COLUMNS y devuelve RowMapping (acceso por
+        nombre de columna, validable directamente con
+        ActivityResponse.model_validate): no se hidratan instancias ActivityDB.
+        Para mutar, usar get_by_activity_id.
+        """
+        stmt = self._apply_filters(
+            select(*_ACTIVITY_LIST_COLUMNS),
+            teacher_id, status, subject, difficulty,
+        )
+        stmt = stmt.order_by(desc(ActivityDB.created_at)).offset(offset).limit(limit)
+        return self.db.execute(stmt).mappings().all()
 
     def update(
         self,
@@ -877,135 +1356,137 @@ class ActivityRepository:
 
         Only allows updating safe, user-modifiable fields via whitelist.
 
+        Los campos se validan antes de tocar la DB (ver _validate_activity_update).
+        La fila se lee una sola vez con SELECT ... FOR UPDATE (sin race entre
+        editores concurrentes) y el mismo objeto se muta y devuelve: el flush
+        emite un único UPDATE con las columnas modificadas y no se hace
+        refresh posterior.
+
         Raises:
             ValueError: If attempting to update a protected field
             TypeError: If field value has incorrect type
         """
-        # Whitelist de campos actualizables (seguridad)
-        UPDATEABLE_FIELDS = {
-            "title": str,
-            "description": str,
-            "instructions": str,
-            "difficulty": str,
-            "tags": list,
-            "learning_objectives": list,
-            "evaluation_criteria": dict,
-            "estimated_duration_minutes": int,
-            "max_ai_assistance": float,
-        }
+        # Validar todos los campos antes de tocar la DB (sin escrituras parciales)
+        changes = _validate_activity_update(kwargs)
 
-        activity = self.get_by_activity_id(activity_id)
+        stmt = (
+            select(ActivityDB)
+            .where(ActivityDB.activity_id == activity_id)
+            .with_for_update()
+        )
+        activity = self.db.execute(stmt).scalar_one_or_none()
         if not activity:
             return None
 
-        # Validar y actualizar solo campos permitidos
-        for key, value in kwargs.items():
-            # Seguridad: Verificar que el campo esté en whitelist
-            if key not in UPDATEABLE_FIELDS:
-                raise ValueError(
-                    f"Cannot update field '{key}'. "
-                    f"Allowed fields: {', '.join(UPDATEABLE_FIELDS.keys())}"
-                )
+        for key, value in changes.items():
+            setattr(activity, key, value)
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return activity
+
+    def _update_returning(self, activity_id: str, **values) -> Optional[ActivityDB]:
+        """
+        UPDATE ... WHERE activity_id = :id RETURNING * en un solo round-trip.
+
+        Reemplaza el patrón SELECT + mutar + COMMIT + refresh (3 sentencias).
 
-            # Validar tipo si no es None
-            if value is not None:
-                expected_type = UPDATEABLE_FIELDS[key]
-                if not isinstance(value, expected_type):
-                    raise TypeError(
-                        f"Invalid type for field '{key}': "
-                        f"expected {expected_type.__name__}, got {type(value).__name__}"
-                    )
-
-                # ✅ FIXED (2025-11-22): Validación de rangos para prevenir corrupción de datos
-                # Validar rangos/valores permitidos según el campo
-                if key == "max_ai_assistance":
-                    if not (0.0 <= value <= 1.0):
-                        raise ValueError(
-                            f"max_ai_assistance must be in range [0.0, 1.0], got {value}"
-                        )
-
-                elif key == "estimated_duration_minutes":
-                    if value <= 0:
-                        raise ValueError(
-                            f"estimated_duration_minutes must be positive, got {value}"
-                        )
-
-                elif key == "difficulty":
-                    VALID_DIFFICULTIES = ["INICIAL", "INTERMEDIO", "AVANZADO"]
-                    if value not in VALID_DIFFICULTIES:
-                        raise ValueError(
-                            f"difficulty must be one of {VALID_DIFFICULTIES}, got '{value}'"
-                        )
-
-                elif key == "title":
-                    if not (3 <= len(value) <= 200):
-                        raise ValueError(
-                            f"title length must be between 3 and 200 characters, got {len(value)}"
-                        )
-
-                elif key == "description":
-                    if len(value) > 2000:
-                        raise ValueError(
-                            f"description length must be <= 2000 characters, got {len(value)}"
-                        )
-
-                elif key == "tags":
-                    if len(value) == 0:
-                        raise ValueError("tags list cannot be empty")
-                    if not all(isinstance(tag, str) for tag in value):
-                        raise TypeError("tags must be a list of strings")
-                    if not all(len(tag) >= 2 for tag in value):
-                        raise ValueError("each tag must have at least 2 characters")
-
-                setattr(activity, key, value)
-
-        activity.updated_at = datetime.utcnow()
+        Returns:
+            ActivityDB actualizado, o None si no existe
+        """
+        stmt = (
+            update(ActivityDB)
+            .where(ActivityDB.activity_id == activity_id)
+            .values(**values)
+            .returning(ActivityDB)
+        )
+        activity = self.db.execute(stmt).scalar_one_or_none()
         self.db.commit()
-        self.db.refresh(activity)
         return activity
 
     def publish(self, activity_id: str) -> Optional[ActivityDB]:
         """Publish an activity (change status from draft to active)"""
-        activity = self.get_by_activity_id(activity_id)
-        if not activity:
-            return None
-
-        activity.status = "active"
-        activity.published_at = datetime.utcnow()
-        activity.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(activity)
-        return activity
+        return self._update_returning(
+            activity_id, status="active", published_at=_utc_now()
+        )
 
     def archive(self, activity_id: str) -> Optional[ActivityDB]:
         """Archive an activity"""
-        activity = self.get_by_activity_id(activity_id)
-        if not activity:
-            return None
-
-        activity.status = "archived"
-        activity.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(activity)
-        return activity
+        return self._update_returning(activity_id, status="archived")
 
     def delete(self, activity_id: str) -> bool:
         """Delete an activity (soft delete by archiving)"""
-        activity = self.get_by_activity_id(activity_id)
-        if not activity:
-            return False
-
         # Soft delete: archive instead of physical deletion
-        activity.status = "archived"
-        activity.updated_at = datetime.utcnow()
-        self.db.commit()
-        return True
+        return self.archive(activity_id) is not None
+
+
+# Hot path de autenticación: getters de fila única en lambda_stmt (ver
+# _ACTIVITY_BY_ID)
+_USER_BY_ID = lambda_stmt(
+    lambda: select(UserDB).where(UserDB.id == bindparam("user_id"))
+)
+_USER_BY_EMAIL = lambda_stmt(
+    lambda: select(UserDB)
+    .options(raiseload("*"))
+    .where(func.lower(UserDB.email) == bindparam("email"))
+)
+_USER_BY_USERNAME = lambda_stmt(
+    lambda: select(UserDB)
+    .options(raiseload("*"))
+    .where(UserDB.username == bindparam("username"))
+)
+_USER_BY_STUDENT_ID = lambda_stmt(
+    lambda: select(UserDB).where(UserDB.student_id == bindparam("student_id"))
+)
+
 
 class UserRepository:
     """Repository for user authentication and authorization operations"""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, cache: Optional[UserLookupCache] = None):
+        """
+        Args:
+            db_session: SQLAlchemy session
+            cache: Cache TTL de lookups (get_by_id/email/username). Si es None
+                no se cachea; la API inyecta el cache de proceso
+                (user_cache.get_user_cache()).
+        """
         self.db = db_session
+        self.cache = cache
+
+    def _cached_lookup(self, field: str, value: Any, loader) -> Optional[UserDB]:
+        """
+        Lookup con cache: en un hit el snapshot se adjunta a la sesión sin SQL.
+
+        Args:
+            field: Campo de lookup ("id", "email" o "username")
+            value: Valor buscado
+            loader: Callable sin argumentos que ejecuta la query en un miss
+        """
+        if self.cache is None:
+            return loader()
+
+        snapshot = self.cache.get(field, value)
+        if snapshot is None:
+            user = loader()
+            if user is not None:
+                self.cache.put(user)
+            return user
+
+        # Si la sesión ya tiene la instancia, no pisarla con el snapshot
+        existing = self.db.identity_map.get(identity_key(UserDB, snapshot["id"]))
+        if existing is not None:
+            return existing
+        user = UserDB(**snapshot)
+        make_transient_to_detached(user)
+        return self.db.merge(user, load=False)
+
+    def _invalidate(self, user: Optional[UserDB]) -> None:
+        """Invalida el cache de lookups tras una mutación"""
+        if self.cache is not None and user is not None:
+            self.cache.invalidate(user)
 
     def create(
         self,
@@ -1034,7 +1515,7 @@ class UserRepository:
             roles = ["student"]
 
         user = UserDB(
-            id=str(uuid4()),
+            id=new_uuid7_str(),  # time-ordered: inserts append-mostly en la PK
             email=email.lower(),  # Normalize email to lowercase
             username=username,
             hashed_password=hashed_password,
@@ -1047,32 +1528,73 @@ class UserRepository:
         )
         self.db.add(user)
         self.db.commit()
-        self.db.refresh(user)
 
-        logger.info(
-            "User created successfully",
-            extra={"user_id": user.id, "email": user.email, "roles": user.roles},
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "User created successfully",
+                extra={"user_id": user.id, "email": user.email, "roles": user.roles},
+            )
         return user
 
     def get_by_id(self, user_id: str) -> Optional[UserDB]:
-        """Get user by ID"""
-        return self.db.query(UserDB).filter(UserDB.id == user_id).first()
+        """Get user by ID (cacheado si el repositorio tiene cache)"""
+        return self._cached_lookup("id", user_id, lambda: self._fetch_by_id(user_id))
+
+    def _fetch_by_id(self, user_id: str, for_update: bool = False) -> Optional[UserDB]:
+        """Get user by ID bypassing the cache (para read-modify-write)"""
+        if for_update:
+            stmt = select(UserDB).where(UserDB.id == user_id).with_for_update()
+            return self.db.execute(stmt).scalar_one_or_none()
+        return self.db.execute(_USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
+
+    def _update_returning(self, user_id: str, *criteria, **values) -> Optional[UserDB]:
+        """
+        UPDATE users ... WHERE id = :id RETURNING * en un solo round-trip.
+
+        Reemplaza el patrón get_by_id + mutar + COMMIT + refresh (3 sentencias).
+        Los valores pueden ser expresiones SQL (p.ej. UserDB.login_count + 1),
+        que se evalúan atómicamente en el servidor.
+
+        Args:
+            user_id: User ID
+            *criteria: Condiciones extra del WHERE (p.ej. "no tiene el rol")
+            **values: Columnas a actualizar
+
+        Returns:
+            UserDB actualizado, o None si no existe (o no cumple `criteria`)
+        """
+        stmt = (
+            update(UserDB)
+            .where(UserDB.id == user_id, *criteria)
+            .values(**values)
+            .returning(UserDB)
+        )
+        user = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
+        self._invalidate(user)
+        return user
 
     def get_by_email(self, email: str) -> Optional[UserDB]:
         """
         Get user by email (case-insensitive)
 
+        Compara lower(email) en la base de datos (índice funcional
+        ux_users_email_lower), así que encuentra también filas insertadas sin
+        normalizar por fuera de create().
+
         Args:
             email: User email
 
         Returns:
             UserDB if found, None otherwise
         """
-        return (
-            self.db.query(UserDB)
-            .filter(UserDB.email == email.lower())
-            .first()
+        email = email.lower()
+        return self._cached_lookup(
+            "email",
+            email,
+            lambda: self.db.execute(
+                _USER_BY_EMAIL, {"email": email}
+            ).scalar_one_or_none(),
         )
 
     def get_by_username(self, username: str) -> Optional[UserDB]:
@@ -1085,10 +1607,12 @@ class UserRepository:
         Returns:
             UserDB if found, None otherwise
         """
-        return (
-            self.db.query(UserDB)
-            .filter(UserDB.username == username)
-            .first()
+        return self._cached_lookup(
+            "username",
+            username,
+            lambda: self.db.execute(
+                _USER_BY_USERNAME, {"username": username}
+            ).scalar_one_or_none(),
         )
 
     def get_by_student_id(self, student_id: str) -> Optional[UserDB]:
@@ -1101,55 +1625,89 @@ class UserRepository:
         Returns:
             UserDB if found, None otherwise
         """
-        return (
-            self.db.query(UserDB)
-            .filter(UserDB.student_id == student_id)
-            .first()
-        )
+        return self.db.execute(
+            _USER_BY_STUDENT_ID, {"student_id": student_id}
+        ).scalar_one_or_none()
+
+    def _list_options(self, load_relations: bool):
+        """
+        Loader options para listados de usuarios.
 
-    def get_all(self, include_inactive: bool = False) -> List[UserDB]:
+        Con load_relations=True las sesiones se cargan con selectinload; en caso
+        contrario cualquier lazy load lanza una excepción (raiseload) en lugar de
+        disparar silenciosamente una query por usuario (N+1).
+        """
+        if load_relations:
+            return (selectinload(UserDB.sessions), raiseload("*"))
+        return (raiseload("*"),)
+
+    def get_all(self, include_inactive: bool = False, load_relations: bool = False) -> List[UserDB]:
         """
         Get all users
 
         Args:
             include_inactive: If True, include inactive users
+            load_relations: If True, eager-loads user.sessions (selectinload)
 
         Returns:
             List of UserDB instances
         """
-        query = self.db.query(UserDB).order_by(desc(UserDB.created_at))
+        stmt = (
+            select(UserDB)
+            .options(*self._list_options(load_relations))
+            .order_by(desc(UserDB.created_at))
+        )
         if not include_inactive:
-            query = query.filter(UserDB.is_active == True)
-        return query.all()
+            stmt = stmt.where(UserDB.is_active == True)
+        return self.db.execute(stmt).scalars().all()
 
-    def get_by_role(self, role: str) -> List[UserDB]:
+    def get_by_role(self, role: str, load_relations: bool = False) -> List[UserDB]:
         """
         Get all users with a specific role
 
         Args:
             role: Role name (e.g., "student", "instructor", "admin")
+            load_relations: If True, eager-loads user.sessions (selectinload)
 
         Returns:
             List of UserDB instances with the role
 
         Performance Note:
-            Current implementation (SQLite): O(n) - loads ALL users to memory then filters in Python.
-            This is acceptable for development/testing with <100 users.
-
-            TODO PRODUCTION: Migrate to PostgreSQL for O(log n) performance.
-            With PostgreSQL, use:
-                .filter(text("roles @> ARRAY[:role]::varchar[]")).params(role=role)
-            This leverages GIN index on roles[] column for efficient queries.
+            El filtro por rol se resuelve en SQL: solo viajan las filas que
+            tienen el rol (PostgreSQL usa `roles @> '["role"]'` sobre el índice
+            GIN idx_roles; SQLite usa json_each).
+        """
+        stmt = (
+            select(UserDB)
+            .options(*self._list_options(load_relations))
+            .where(UserDB.is_active == True)
+            .where(_json_array_contains(self.db, UserDB.roles, role))
+        )
+        return self.db.execute(stmt).scalars().all()
 
-            Impact at scale:
-            - 100 users:    Loads 100, returns ~20  (80% waste)
-            - 1,000 users:  Loads 1,000, returns ~50 (95% waste)
-            - 10,000 users: Loads 10,000, returns ~100 (99% waste)
+    def get_recently_active(self, limit: int = 50) -> List[UserDB]:
         """
-        # PostgreSQL: Use JSON contains operator with GIN index
-        # SQLite: Query all users and filter in Python (less efficient but acceptable for dev)
-        all_users = self.db.query(UserDB).filter(UserDB.is_active == True).all()
-        return [user for user in all_users if role in user.roles]
+        Get the users with the most recent logins
+
+        Args:
+            limit: Maximum number of users
+
+        Returns:
+            List of UserDB instances, most recent login first
+
+        Performance Note:
+            Usuarios sin login se excluyen con `last_login IS NOT NULL`, el
+            mismo predicado del índice parcial ix_users_last_login: la query
+            lee el índice en orden inverso y corta en `limit`, sin sort.
+        """
+        stmt = (
+            select(UserDB)
+            .options(*self._list_options(False))
+            .where(UserDB.last_login.is_not(None))
+            .order_by(desc(UserDB.last_login))
+            .limit(limit)
+        )
+        return self.db.execute(stmt).scalars().all()
 
     def update_password(self, user_id: str, new_hashed_password: str) -> Optional[UserDB]:
         """
@@ -1162,16 +1720,17 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._fetch_by_id(user_id)
         if not user:
             return None
 
         user.hashed_password = new_hashed_password
-        user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        self._invalidate(user)
 
-        logger.info("User password updated", extra={"user_id": user.id})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("User password updated", extra={"user_id": user.id})
         return user
 
     def update_profile(
@@ -1191,7 +1750,7 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._fetch_by_id(user_id)
         if not user:
             return None
 
@@ -1200,17 +1759,23 @@ class UserRepository:
         if student_id is not None:
             user.student_id = student_id
 
-        user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        self._invalidate(user)
 
-        logger.info("User profile updated", extra={"user_id": user.id})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("User profile updated", extra={"user_id": user.id})
         return user
 
     def add_role(self, user_id: str, role: str) -> Optional[UserDB]:
         """
         Add role to user
 
+        En PostgreSQL es un único UPDATE atómico:
+        roles = roles || jsonb_build_array(:role) WHERE NOT roles @> [:role].
+        Dos altas concurrentes de roles distintos ya no se pisan (el
+        read-modify-write en Python perdía una de las dos).
+
         Args:
             user_id: User ID
             role: Role to add
@@ -1218,19 +1783,34 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        if self.db.get_bind().dialect.name == "postgresql":
+            roles = type_coerce(UserDB.roles, JSONB)
+            user = self._update_returning(
+                user_id,
+                ~roles.contains([role]),
+                roles=roles.op("||", return_type=JSONB)(func.jsonb_build_array(role)),
+            )
+            if user is None:
+                # Ya tenía el rol (no-op) o no existe
+                return self._fetch_by_id(user_id)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Role added to user", extra={"user_id": user.id, "role": role})
+            return user
+
+        # SQLite: sin operadores JSONB, read-modify-write con la fila bloqueada
+        user = self._fetch_by_id(user_id, for_update=True)
         if not user:
             return None
 
-        if role not in user.roles:
+        if role not in user.roles_set:
             user.roles = user.roles + [role]  # Create new list for SQLAlchemy to detect change
-            user.updated_at = datetime.utcnow()
             self.db.commit()
-            self.db.refresh(user)
+            self._invalidate(user)
 
-            logger.info(
-                "Role added to user", extra={"user_id": user.id, "role": role}
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Role added to user", extra={"user_id": user.id, "role": role}
+                )
 
         return user
 
@@ -1238,6 +1818,9 @@ class UserRepository:
         """
         Remove role from user
 
+        En PostgreSQL es un único UPDATE atómico: roles = roles - :role
+        (el operador jsonb - text elimina todas las ocurrencias del string).
+
         Args:
             user_id: User ID
             role: Role to remove
@@ -1245,19 +1828,34 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        if self.db.get_bind().dialect.name == "postgresql":
+            roles = type_coerce(UserDB.roles, JSONB)
+            user = self._update_returning(
+                user_id,
+                roles.contains([role]),
+                roles=roles.op("-", return_type=JSONB)(cast(role, String)),
+            )
+            if user is None:
+                # No tenía el rol (no-op) o no existe
+                return self._fetch_by_id(user_id)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Role removed from user", extra={"user_id": user.id, "role": role})
+            return user
+
+        # SQLite: sin operadores JSONB, read-modify-write con la fila bloqueada
+        user = self._fetch_by_id(user_id, for_update=True)
         if not user:
             return None
 
-        if role in user.roles:
+        if role in user.roles_set:
             user.roles = [r for r in user.roles if r != role]
-            user.updated_at = datetime.utcnow()
             self.db.commit()
-            self.db.refresh(user)
+            self._invalidate(user)
 
-            logger.info(
-                "Role removed from user", extra={"user_id": user.id, "role": role}
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Role removed from user", extra={"user_id": user.id, "role": role}
+                )
 
         return user
 
@@ -1265,25 +1863,28 @@ class UserRepository:
         """
         Update last login timestamp and increment login count
 
+        Escritura sincrónica. En el path de login HTTP se usa el write-behind
+        de login_buffer.get_login_buffer(), que persiste en lote.
+
         Args:
             user_id: User ID
 
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._update_returning(
+            user_id,
+            last_login=_utc_now(),
+            login_count=func.coalesce(UserDB.login_count, 0) + 1,  # Incremento atómico en el servidor
+        )
         if not user:
             return None
 
-        user.last_login = datetime.utcnow()
-        user.login_count += 1
-        self.db.commit()
-        self.db.refresh(user)
-
-        logger.info(
-            "User login recorded",
-            extra={"user_id": user.id, "login_count": user.login_count},
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "User login recorded",
+                extra={"user_id": user.id, "login_count": user.login_count},
+            )
         return user
 
     def verify_user(self, user_id: str) -> Optional[UserDB]:
@@ -1296,16 +1897,12 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._update_returning(user_id, is_verified=True)
         if not user:
             return None
 
-        user.is_verified = True
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(user)
-
-        logger.info("User verified", extra={"user_id": user.id})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("User verified", extra={"user_id": user.id})
         return user
 
     def deactivate_user(self, user_id: str) -> Optional[UserDB]:
@@ -1318,16 +1915,12 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._update_returning(user_id, is_active=False)
         if not user:
             return None
 
-        user.is_active = False
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(user)
-
-        logger.info("User deactivated", extra={"user_id": user.id})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("User deactivated", extra={"user_id": user.id})
         return user
 
     def reactivate_user(self, user_id: str) -> Optional[UserDB]:
@@ -1340,16 +1933,12 @@ class UserRepository:
         Returns:
             Updated UserDB if found, None otherwise
         """
-        user = self.get_by_id(user_id)
+        user = self._update_returning(user_id, is_active=True)
         if not user:
             return None
 
-        user.is_active = True
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(user)
-
-        logger.info("User reactivated", extra={"user_id": user.id})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("User reactivated", extra={"user_id": user.id})
         return user
 
     def delete(self, user_id: str) -> bool:
@@ -1365,12 +1954,13 @@ class UserRepository:
         Returns:
             True if deleted, False if not found
         """
-        user = self.get_by_id(user_id)
+        user = self._fetch_by_id(user_id)
         if not user:
             return False
 
         self.db.delete(user)
         self.db.commit()
+        self._invalidate(user)
 
         logger.warning("User deleted (hard delete)", extra={"user_id": user.id})
         return True
@@ -1381,15 +1971,99 @@ class UserRepository:
 # =============================================================================
 
 
-class GitTraceRepository:
+# commit_hash -> id de GitTraceDB. Los commits son content-addressed e
+# inmutables (y commit_hash es único), así que el mapeo nunca cambia: se
+# comparte entre requests y el lookup pasa a ser por PK vía identity map.
+COMMIT_HASH_CACHE_MAX_SIZE = 4096
+_commit_hash_ids = LRUCache(max_size=COMMIT_HASH_CACHE_MAX_SIZE)
+
+# Tamaño de lote para los timelines en streaming (yield_per)
+GIT_TRACE_STREAM_BATCH_SIZE = 500
+
+# Columnas de timeline por defecto: sin diff (puede pesar MB) ni columnas JSON
+GIT_TRACE_TIMELINE_COLUMNS = (
+    GitTraceDB.id,
+    GitTraceDB.event_type,
+    GitTraceDB.commit_hash,
+    GitTraceDB.timestamp,
+    GitTraceDB.commit_message,
+)
+
+# Columnas del autor para proyecciones (iter_by_*): agregan el JOIN a git_authors
+GIT_TRACE_AUTHOR_COLUMNS = (
+    GitAuthorDB.name.label("author_name"),
+    GitAuthorDB.email.label("author_email"),
+)
+
+# Listados: el autor viene en el mismo SELECT (JOIN), el resto de las
+# relaciones lanza en vez de disparar una query por fila
+_GIT_TRACE_LIST_OPTIONS = (joinedload(GitTraceDB.author), raiseload("*"))
+
+# (email, name) -> git_authors.id. Los ids son propios de cada base de datos,
+# así que hay un cache por engine (se libera junto con el engine).
+GIT_AUTHOR_CACHE_MAX_SIZE = 1024
+_git_author_ids: "weakref.WeakKeyDictionary[Any, LRUCache]" = weakref.WeakKeyDictionary()
+_git_author_ids_lock = threading.Lock()
+
+
+def _author_cache_for(db: Session) -> LRUCache:
+    """Cache (email, name) -> author_id del engine de la sesión"""
+    engine = db.get_bind().engine
+    with _git_author_ids_lock:
+        cache = _git_author_ids.get(engine)
+        if cache is None:
+            cache = _git_author_ids[engine] = LRUCache(max_size=GIT_AUTHOR_CACHE_MAX_SIZE)
+    return cache
+
+
+class GitTraceRepository(BaseRepository):
     """
     Repository for Git N2-level traceability operations
 
     SPRINT 5 - HU-SYS-008: Integración Git
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
+    def __init__(self, db_session: Session, commit_cache: Optional[LRUCache] = None):
+        """
+        Args:
+            db_session: Sesión de base de datos
+            commit_cache: Cache commit_hash -> id (default: el del proceso)
+        """
+        super().__init__(db_session)
+        self.commit_cache = commit_cache if commit_cache is not None else _commit_hash_ids
+
+    def _author_id(self, name: str, email: str) -> int:
+        """
+        Get-or-create del autor en git_authors (dentro de la transacción actual)
+
+        El cache (email, name) -> id evita el SELECT en el caso común (mismo
+        autor en todos los commits). El llamador cachea el id recién después
+        del commit: si la transacción se revierte, un autor nuevo no queda
+        cacheado con un id inexistente.
+        """
+        author_id = _author_cache_for(self.db).get((email, name))
+        if author_id is not None:
+            return author_id
+
+        lookup = select(GitAuthorDB.id).where(
+            GitAuthorDB.email == email, GitAuthorDB.name == name
+        )
+        author_id = self.db.execute(lookup).scalar()
+        if author_id is not None:
+            return author_id
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = pg_insert(GitAuthorDB).on_conflict_do_nothing(index_elements=["email", "name"])
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(GitAuthorDB).on_conflict_do_nothing(index_elements=["email", "name"])
+        else:
+            stmt = insert(GitAuthorDB)
+        author_id = self.db.execute(
+            stmt.values(name=name, email=email, created_at=_utc_now()).returning(GitAuthorDB.id)
+        ).scalar()
+        # None: otro request insertó el mismo autor en paralelo
+        return author_id if author_id is not None else self.db.execute(lookup).scalar_one()
 
     def create(
         self,
@@ -1450,23 +2124,26 @@ class GitTraceRepository:
         Returns:
             Created GitTraceDB instance
         """
-        git_trace = GitTraceDB(
-            id=str(uuid4()),
+        trace_id = new_uuid7_str()
+        author_id = self._author_id(author_name, author_email)
+        git_trace = self._insert(
+            GitTraceDB,
+            id=trace_id,
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
             event_type=event_type,
             commit_hash=commit_hash,
             commit_message=commit_message,
-            author_name=author_name,
-            author_email=author_email,
+            author_id=author_id,
             timestamp=timestamp,
             branch_name=branch_name,
-            parent_commits=parent_commits,
-            files_changed=files_changed,
+            parent_commits=parent_commits or [],
+            files_changed=files_changed or [],
             total_lines_added=total_lines_added,
             total_lines_deleted=total_lines_deleted,
-            diff=diff,
+            # `diff` es una property del modelo: el INSERT usa la columna comprimida
+            diff_compressed=compress_text(diff),
             is_merge=is_merge,
             is_revert=is_revert,
             detected_patterns=detected_patterns or [],
@@ -1477,14 +2154,14 @@ class GitTraceRepository:
             repo_path=repo_path,
             remote_url=remote_url,
         )
-        self.db.add(git_trace)
         self.db.commit()
-        self.db.refresh(git_trace)
+        self.commit_cache.set(commit_hash, trace_id)
+        _author_cache_for(self.db).set((author_email, author_name), author_id)
 
         logger.info(
             "Git trace created",
             extra={
-                "trace_id": git_trace.id,
+                "trace_id": trace_id,
                 "session_id": session_id,
                 "commit_hash": commit_hash,
                 "event_type": event_type,
@@ -1492,69 +2169,335 @@ class GitTraceRepository:
         )
         return git_trace
 
+    def bulk_create(self, rows: List[dict]) -> int:
+        """
+        Create many Git traces in a single transaction (ingesta de historial)
+
+        Un INSERT multi-fila en lugar de add + commit + refresh por commit:
+        importar N commits cuesta una transacción en vez de N. Los commits ya
+        registrados (commit_hash único) se ignoran con ON CONFLICT DO NOTHING,
+        así que re-importar un historial es idempotente.
+
+        Args:
+            rows: Dicts con los mismos campos que acepta create()
+
+        Returns:
+            Cantidad de trazas efectivamente insertadas
+        """
+        if not rows:
+            return 0
+
+        values = []
+        authors: Dict[tuple, int] = {}
+        for row in rows:
+            row = dict(row)
+            author = (row.pop("author_email"), row.pop("author_name"))
+            if author not in authors:
+                authors[author] = self._author_id(name=author[1], email=author[0])
+            row["author_id"] = authors[author]
+            # `diff` es una property del modelo: el INSERT usa la columna comprimida
+            row["diff_compressed"] = compress_text(row.pop("diff", None))
+            row["files_changed"] = row.get("files_changed") or []
+            row["detected_patterns"] = row.get("detected_patterns") or []
+            row["related_cognitive_traces"] = row.get("related_cognitive_traces") or []
+            values.append({"id": new_uuid7_str(), **row})
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            # Sin conflict target: vale tanto para UNIQUE (commit_hash) como para
+            # UNIQUE (commit_hash, timestamp) de la tabla particionada
+            # (migrations/partition_git_traces_and_alerts.py)
+            stmt = pg_insert(GitTraceDB).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(GitTraceDB).on_conflict_do_nothing(index_elements=["commit_hash"])
+        else:
+            stmt = insert(GitTraceDB)
+
+        try:
+            inserted_rows = self.db.execute(
+                stmt.returning(GitTraceDB.id, GitTraceDB.commit_hash), values
+            ).all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for trace_id, commit_hash in inserted_rows:
+            self.commit_cache.set(commit_hash, trace_id)
+        author_cache = _author_cache_for(self.db)
+        for author, author_id in authors.items():
+            author_cache.set(author, author_id)
+        inserted = len(inserted_rows)
+
+        logger.info(
+            "Git traces bulk created",
+            extra={"submitted": len(values), "inserted": inserted},
+        )
+        return inserted
+
     def get_by_session(self, session_id: str) -> List[GitTraceDB]:
-        """Get all Git traces for a session ordered by timestamp"""
-        return (
-            self.db.query(GitTraceDB)
-            .filter(GitTraceDB.session_id == session_id)
+        """
+        Get all Git traces for a session ordered by timestamp
+
+        Carga filas completas (incluido diff). Para timelines/listados usar
+        iter_by_session, que proyecta columnas y hace streaming.
+        """
+        stmt = (
+            select(GitTraceDB)
+            .options(*_GIT_TRACE_LIST_OPTIONS)
+            .where(GitTraceDB.session_id == session_id)
             .order_by(GitTraceDB.timestamp)
-            .all()
         )
+        return self.db.execute(stmt).scalars().all()
 
     def get_by_student(
         self, student_id: str, limit: Optional[int] = None
     ) -> List[GitTraceDB]:
         """Get Git traces by student ordered by timestamp"""
-        query = (
-            self.db.query(GitTraceDB)
-            .filter(GitTraceDB.student_id == student_id)
+        stmt = (
+            select(GitTraceDB)
+            .options(*_GIT_TRACE_LIST_OPTIONS)
+            .where(GitTraceDB.student_id == student_id)
             .order_by(desc(GitTraceDB.timestamp))
         )
         if limit:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return self.db.execute(stmt).scalars().all()
 
-    def get_by_commit_hash(self, commit_hash: str) -> Optional[GitTraceDB]:
-        """Get Git trace by commit hash"""
-        return (
-            self.db.query(GitTraceDB)
-            .filter(GitTraceDB.commit_hash == commit_hash)
-            .first()
+    def get_by_students(
+        self, student_ids: List[str], limit_per_student: Optional[int] = None
+    ) -> Dict[str, List[GitTraceDB]]:
+        """
+        Get Git traces for many students in one query (dashboards de cohorte)
+
+        Args:
+            student_ids: IDs de estudiantes
+            limit_per_student: Últimos K commits por estudiante (None = todos)
+
+        Returns:
+            Dict student_id -> traces ordenadas por timestamp descendente
+        """
+        return _top_per_group(
+            self.db,
+            GitTraceDB,
+            GitTraceDB.student_id,
+            desc(GitTraceDB.timestamp),
+            student_ids,
+            limit_per_student,
+            options=_GIT_TRACE_LIST_OPTIONS,
         )
 
+    def iter_by_session(
+        self, session_id: str, columns: Optional[tuple] = None
+    ) -> Iterator[Mapping[str, Any]]:
+        """
+        Timeline de una sesión (orden cronológico) como filas proyectadas.
+
+        Args:
+            session_id: Session ID
+            columns: Columnas de GitTraceDB a traer (default: GIT_TRACE_TIMELINE_COLUMNS;
+                sumar GIT_TRACE_AUTHOR_COLUMNS para el autor)
+
+        Returns:
+            Iterador de RowMapping (acceso por nombre de columna)
+        """
+        stmt = (
+            self._timeline_select(columns)
+            .where(GitTraceDB.session_id == session_id)
+            .order_by(GitTraceDB.timestamp)
+        )
+        return self._stream_rows(stmt)
+
+    def iter_by_student(
+        self,
+        student_id: str,
+        limit: Optional[int] = None,
+        columns: Optional[tuple] = None,
+    ) -> Iterator[Mapping[str, Any]]:
+        """Timeline de un estudiante (más reciente primero) como filas proyectadas"""
+        stmt = (
+            self._timeline_select(columns)
+            .where(GitTraceDB.student_id == student_id)
+            .order_by(desc(GitTraceDB.timestamp))
+        )
+        if limit:
+            stmt = stmt.limit(limit)
+        return self._stream_rows(stmt)
+
+    @staticmethod
+    def _timeline_select(columns: Optional[tuple]):
+        """SELECT de las columnas pedidas; JOIN a git_authors solo si proyecta el autor"""
+        stmt = select(*(columns or GIT_TRACE_TIMELINE_COLUMNS))
+        if GitAuthorDB.__table__ in stmt.get_final_froms():
+            stmt = stmt.select_from(GitTraceDB).join(GitTraceDB.author)
+        return stmt
+
+    def _stream_rows(self, stmt) -> Iterator[Mapping[str, Any]]:
+        """
+        Itera el resultado en lotes de GIT_TRACE_STREAM_BATCH_SIZE filas.
+
+        En PostgreSQL yield_per usa un cursor del servidor: la memoria queda
+        acotada al lote aunque la sesión tenga miles de commits.
+        """
+        stmt = stmt.execution_options(yield_per=GIT_TRACE_STREAM_BATCH_SIZE)
+        return iter(self.db.execute(stmt).mappings())
+
+    def get_by_commit_hash(self, commit_hash: str) -> Optional[GitTraceDB]:
+        """
+        Get Git trace by commit hash
+
+        Con el id cacheado, Session.get() resuelve desde el identity map sin
+        SQL (o con un lookup por PK). Si el id cacheado ya no existe (p.ej.
+        otra base de datos), cae a la query por commit_hash.
+        """
+        trace_id = self.commit_cache.get(commit_hash)
+        if trace_id is not None:
+            git_trace = self.db.get(GitTraceDB, trace_id)
+            if git_trace is not None and git_trace.commit_hash == commit_hash:
+                return git_trace
+
+        git_trace = self.db.execute(
+            select(GitTraceDB).where(GitTraceDB.commit_hash == commit_hash)
+        ).scalar_one_or_none()
+        if git_trace is not None:
+            self.commit_cache.set(commit_hash, git_trace.id)
+        return git_trace
+
     def get_by_student_activity(
         self, student_id: str, activity_id: str
     ) -> List[GitTraceDB]:
         """Get Git traces for student + activity ordered by timestamp"""
-        return (
-            self.db.query(GitTraceDB)
-            .filter(
+        stmt = (
+            select(GitTraceDB)
+            .options(*_GIT_TRACE_LIST_OPTIONS)
+            .where(
                 GitTraceDB.student_id == student_id,
                 GitTraceDB.activity_id == activity_id,
             )
             .order_by(GitTraceDB.timestamp)
-            .all()
         )
+        return self.db.execute(stmt).scalars().all()
+
+    def get_by_pattern(self, pattern: str, student_id: str) -> List[GitTraceDB]:
+        """
+        Get student's commits where a code pattern was detected
+
+        PostgreSQL: detected_patterns @> '["pattern"]' sobre ix_git_traces_patterns_gin.
+        """
+        stmt = (
+            select(GitTraceDB)
+            .options(*_GIT_TRACE_LIST_OPTIONS)
+            .where(
+                GitTraceDB.student_id == student_id,
+                _json_array_contains(self.db, GitTraceDB.detected_patterns, pattern),
+            )
+            .order_by(GitTraceDB.timestamp)
+        )
+        return self.db.execute(stmt).scalars().all()
+
+    def get_by_file(self, file_path: str, student_id: str) -> List[GitTraceDB]:
+        """
+        Get student's commits that touched a file
+
+        PostgreSQL: files_changed @> '[{"file_path": ...}]' sobre ix_git_traces_files_gin.
+        """
+        stmt = (
+            select(GitTraceDB)
+            .options(*_GIT_TRACE_LIST_OPTIONS)
+            .where(
+                GitTraceDB.student_id == student_id,
+                _json_array_contains(
+                    self.db, GitTraceDB.files_changed, file_path, key="file_path"
+                ),
+            )
+            .order_by(GitTraceDB.timestamp)
+        )
+        return self.db.execute(stmt).scalars().all()
+
+    def summary_by_session(self, session_id: str) -> Dict[str, Any]:
+        """
+        Aggregate commit metrics for a session in SQL (una fila, sin cargar trazas)
+
+        Returns:
+            Dict con commits, lines_added, lines_deleted, complexity_delta,
+            first_commit_at y last_commit_at (sumas en 0 si no hay commits)
+        """
+        stmt = select(
+            func.count().label("commits"),
+            func.coalesce(func.sum(GitTraceDB.total_lines_added), 0).label("lines_added"),
+            func.coalesce(func.sum(GitTraceDB.total_lines_deleted), 0).label("lines_deleted"),
+            func.coalesce(func.sum(GitTraceDB.complexity_delta), 0).label("complexity_delta"),
+            func.min(GitTraceDB.timestamp).label("first_commit_at"),
+            func.max(GitTraceDB.timestamp).label("last_commit_at"),
+        ).where(GitTraceDB.session_id == session_id)
+        return dict(self.db.execute(stmt).mappings().one())
+
+    def daily_activity_by_session(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Per-day commit bins for a session (GROUP BY día, orden cronológico)
+
+        Returns:
+            Lista de dicts {day, commits, lines_added, lines_deleted}; `day` es
+            string ISO "YYYY-MM-DD"
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            day = func.to_char(func.date_trunc("day", GitTraceDB.timestamp), "YYYY-MM-DD")
+        else:
+            day = func.date(GitTraceDB.timestamp)
+        day = day.label("day")
+
+        stmt = (
+            select(
+                day,
+                func.count().label("commits"),
+                func.coalesce(func.sum(GitTraceDB.total_lines_added), 0).label("lines_added"),
+                func.coalesce(func.sum(GitTraceDB.total_lines_deleted), 0).label("lines_deleted"),
+            )
+            .where(GitTraceDB.session_id == session_id)
+            .group_by(day)
+            .order_by(day)
+        )
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
 
     def count_by_student(self, student_id: str) -> int:
-        """Count total commits by student"""
-        return (
-            self.db.query(GitTraceDB)
-            .filter(GitTraceDB.student_id == student_id)
-            .count()
+        """Count total commits by student (SELECT count(*) directo, sin subquery)"""
+        stmt = (
+            select(func.count())
+            .select_from(GitTraceDB)
+            .where(GitTraceDB.student_id == student_id)
         )
+        return self.db.execute(stmt).scalar_one()
 
+    def count_by_students(self, student_ids: List[str]) -> Dict[str, int]:
+        """
+        Count commits for many students with a single GROUP BY query
 
-class CourseReportRepository:
+        Para dashboards de cohorte: una query en vez de una por estudiante.
+        Los estudiantes sin commits aparecen con 0.
+
+        Returns:
+            Dict student_id -> cantidad de commits
+        """
+        counts = dict.fromkeys(student_ids, 0)
+        if not counts:
+            return counts
+
+        stmt = (
+            select(GitTraceDB.student_id, func.count())
+            .where(GitTraceDB.student_id.in_(list(counts)))
+            .group_by(GitTraceDB.student_id)
+        )
+        counts.update(self.db.execute(stmt).tuples().all())
+        return counts
+
+
+class CourseReportRepository(BaseRepository):
     """
     Repository for course-level aggregate reports
 
     SPRINT 5 - HU-DOC-009: Reportes Institucionales
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         course_id: str,
@@ -1594,8 +2537,10 @@ class CourseReportRepository:
         Returns:
             Created CourseReportDB instance
         """
-        report = CourseReportDB(
-            id=str(uuid4()),
+        report_id = new_uuid7_str()
+        report = self._insert(
+            CourseReportDB,
+            id=report_id,
             course_id=course_id,
             teacher_id=teacher_id,
             report_type=report_type,
@@ -1611,14 +2556,12 @@ class CourseReportRepository:
             format=format,
             file_path=file_path,
         )
-        self.db.add(report)
         self.db.commit()
-        self.db.refresh(report)
 
         logger.info(
             "Course report created",
             extra={
-                "report_id": report.id,
+                "report_id": report_id,
                 "course_id": course_id,
                 "report_type": report_type,
                 "teacher_id": teacher_id,
@@ -1627,47 +2570,59 @@ class CourseReportRepository:
         return report
 
     def get_by_id(self, report_id: str) -> Optional[CourseReportDB]:
-        """Get report by ID"""
-        return self.db.query(CourseReportDB).filter(CourseReportDB.id == report_id).first()
+        """Get report by ID (identity map de la sesión: sin SQL si ya está cargado)"""
+        return self.db.get(CourseReportDB, report_id)
 
     def get_by_course(
         self, course_id: str, limit: Optional[int] = None
     ) -> List[CourseReportDB]:
         """Get reports for a course ordered by period"""
-        query = (
-            self.db.query(CourseReportDB)
-            .filter(CourseReportDB.course_id == course_id)
+        stmt = (
+            select(CourseReportDB)
+            .options(raiseload("*"))
+            .where(CourseReportDB.course_id == course_id)
             .order_by(desc(CourseReportDB.period_start))
         )
         if limit:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return self.db.execute(stmt).scalars().all()
 
     def get_by_teacher(
         self, teacher_id: str, limit: Optional[int] = None
     ) -> List[CourseReportDB]:
         """Get reports by teacher ordered by period"""
-        query = (
-            self.db.query(CourseReportDB)
-            .filter(CourseReportDB.teacher_id == teacher_id)
+        stmt = (
+            select(CourseReportDB)
+            .options(raiseload("*"))
+            .where(CourseReportDB.teacher_id == teacher_id)
             .order_by(desc(CourseReportDB.period_start))
         )
         if limit:
-            query = query.limit(limit)
-        return query.all()
+            stmt = stmt.limit(limit)
+        return self.db.execute(stmt).scalars().all()
+
+    def get_by_at_risk_student(self, student_id: str) -> List[CourseReportDB]:
+        """
+        Get reports that flag a student as at-risk, most recent period first
+
+        PostgreSQL: at_risk_students @> '["id"]' sobre ix_report_at_risk_students_gin.
+        """
+        stmt = (
+            select(CourseReportDB)
+            .options(raiseload("*"))
+            .where(_json_array_contains(self.db, CourseReportDB.at_risk_students, student_id))
+            .order_by(desc(CourseReportDB.period_start))
+        )
+        return self.db.execute(stmt).scalars().all()
 
     def mark_exported(self, report_id: str, file_path: str) -> Optional[CourseReportDB]:
         """Mark report as exported with file path"""
-        report = self.get_by_id(report_id)
+        report = self._update_by_id(
+            CourseReportDB, report_id, file_path=file_path, exported_at=_utc_now()
+        )
         if not report:
             return None
 
-        report.file_path = file_path
-        report.exported_at = datetime.utcnow()
-        report.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(report)
-
         logger.info(
             "Course report exported",
             extra={"report_id": report.id, "file_path": file_path},
@@ -1675,16 +2630,13 @@ class CourseReportRepository:
         return report
 
 
-class RemediationPlanRepository:
+class RemediationPlanRepository(BaseRepository):
     """
     Repository for remediation plan operations
 
     SPRINT 5 - HU-DOC-010: Gestión de Riesgos Institucionales
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         student_id: str,
@@ -1716,8 +2668,10 @@ class RemediationPlanRepository:
         Returns:
             Created RemediationPlanDB instance
         """
-        plan = RemediationPlanDB(
-            id=str(uuid4()),
+        plan_id = new_uuid7_str()
+        plan = self._insert(
+            RemediationPlanDB,
+            id=plan_id,
             student_id=student_id,
             teacher_id=teacher_id,
             plan_type=plan_type,
@@ -1730,14 +2684,12 @@ class RemediationPlanRepository:
             recommended_actions=recommended_actions or [],
             status="pending",
         )
-        self.db.add(plan)
         self.db.commit()
-        self.db.refresh(plan)
 
         logger.info(
             "Remediation plan created",
             extra={
-                "plan_id": plan.id,
+                "plan_id": plan_id,
                 "student_id": student_id,
                 "teacher_id": teacher_id,
                 "plan_type": plan_type,
@@ -1746,34 +2698,50 @@ class RemediationPlanRepository:
         return plan
 
     def get_by_id(self, plan_id: str) -> Optional[RemediationPlanDB]:
-        """Get plan by ID"""
-        return (
-            self.db.query(RemediationPlanDB)
-            .filter(RemediationPlanDB.id == plan_id)
-            .first()
-        )
+        """Get plan by ID (identity map de la sesión: sin SQL si ya está cargado)"""
+        return self.db.get(RemediationPlanDB, plan_id)
 
     def get_by_student(
         self, student_id: str, status: Optional[str] = None
     ) -> List[RemediationPlanDB]:
         """Get plans for student, optionally filtered by status"""
-        query = self.db.query(RemediationPlanDB).filter(
-            RemediationPlanDB.student_id == student_id
+        stmt = (
+            select(RemediationPlanDB)
+            .options(raiseload("*"))
+            .where(RemediationPlanDB.student_id == student_id)
         )
         if status:
-            query = query.filter(RemediationPlanDB.status == status)
-        return query.order_by(desc(RemediationPlanDB.start_date)).all()
+            stmt = stmt.where(RemediationPlanDB.status == status)
+        stmt = stmt.order_by(desc(RemediationPlanDB.start_date))
+        return self.db.execute(stmt).scalars().all()
 
     def get_by_teacher(
         self, teacher_id: str, status: Optional[str] = None
     ) -> List[RemediationPlanDB]:
         """Get plans by teacher, optionally filtered by status"""
-        query = self.db.query(RemediationPlanDB).filter(
-            RemediationPlanDB.teacher_id == teacher_id
+        stmt = (
+            select(RemediationPlanDB)
+            .options(raiseload("*"))
+            .where(RemediationPlanDB.teacher_id == teacher_id)
         )
         if status:
-            query = query.filter(RemediationPlanDB.status == status)
-        return query.order_by(desc(RemediationPlanDB.target_completion_date)).all()
+            stmt = stmt.where(RemediationPlanDB.status == status)
+        stmt = stmt.order_by(desc(RemediationPlanDB.target_completion_date))
+        return self.db.execute(stmt).scalars().all()
+
+    def get_by_trigger_risk(self, risk_id: str) -> List[RemediationPlanDB]:
+        """
+        Get plans triggered by a risk
+
+        PostgreSQL: trigger_risks @> '["id"]' sobre ix_plan_trigger_risks_gin.
+        """
+        stmt = (
+            select(RemediationPlanDB)
+            .options(raiseload("*"))
+            .where(_json_array_contains(self.db, RemediationPlanDB.trigger_risks, risk_id))
+            .order_by(desc(RemediationPlanDB.start_date))
+        )
+        return self.db.execute(stmt).scalars().all()
 
     def update_status(
         self,
@@ -1783,22 +2751,18 @@ class RemediationPlanRepository:
         completion_evidence: Optional[List[str]] = None,
     ) -> Optional[RemediationPlanDB]:
         """Update plan status"""
-        plan = self.get_by_id(plan_id)
-        if not plan:
-            return None
-
-        plan.status = status
+        now = _utc_now()
+        values = {"status": status}
         if progress_notes:
-            plan.progress_notes = progress_notes
+            values["progress_notes"] = progress_notes
         if completion_evidence:
-            plan.completion_evidence = completion_evidence
-
+            values["completion_evidence"] = completion_evidence
         if status == "completed":
-            plan.actual_completion_date = datetime.utcnow()
+            values["actual_completion_date"] = now
 
-        plan.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(plan)
+        plan = self._update_by_id(RemediationPlanDB, plan_id, **values)
+        if not plan:
+            return None
 
         logger.info(
             "Remediation plan status updated",
@@ -1813,19 +2777,17 @@ class RemediationPlanRepository:
         success_metrics: Optional[dict] = None,
     ) -> Optional[RemediationPlanDB]:
         """Complete a remediation plan with evaluation"""
-        plan = self.get_by_id(plan_id)
-        if not plan:
-            return None
-
-        plan.status = "completed"
-        plan.actual_completion_date = datetime.utcnow()
-        plan.outcome_evaluation = outcome_evaluation
+        values = {
+            "status": "completed",
+            "actual_completion_date": _utc_now(),
+            "outcome_evaluation": outcome_evaluation,
+        }
         if success_metrics:
-            plan.success_metrics = success_metrics
+            values["success_metrics"] = success_metrics
 
-        plan.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(plan)
+        plan = self._update_by_id(RemediationPlanDB, plan_id, **values)
+        if not plan:
+            return None
 
         logger.info(
             "Remediation plan completed",
@@ -1834,16 +2796,17 @@ class RemediationPlanRepository:
         return plan
 
 
-class RiskAlertRepository:
+# Topic del outbox para alertas nuevas (ver database/outbox.py)
+RISK_ALERT_CREATED_TOPIC = "risk_alert.created"
+
+
+class RiskAlertRepository(BaseRepository):
     """
     Repository for institutional risk alert operations
 
     SPRINT 5 - HU-DOC-010: Gestión de Riesgos Institucionales
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         alert_type: str,
@@ -1879,8 +2842,12 @@ class RiskAlertRepository:
         Returns:
             Created RiskAlertDB instance
         """
-        alert = RiskAlertDB(
-            id=str(uuid4()),
+        alert_id = new_uuid7_str()
+        detected_at = _utc_now()
+        alert = self._insert(
+            RiskAlertDB,
+            id=alert_id,
+            detected_at=detected_at,
             alert_type=alert_type,
             severity=severity,
             scope=scope,
@@ -1895,14 +2862,29 @@ class RiskAlertRepository:
             actual_value=actual_value,
             status="open",
         )
-        self.db.add(alert)
+        # Transactional outbox: las notificaciones (email/Slack/webhooks) se
+        # despachan en background (database/outbox.py), no en este request
+        self._insert(
+            OutboxEventDB,
+            topic=RISK_ALERT_CREATED_TOPIC,
+            payload={
+                "alert_id": alert_id,
+                "alert_type": alert_type,
+                "severity": severity,
+                "scope": scope,
+                "title": title,
+                "student_id": student_id,
+                "activity_id": activity_id,
+                "course_id": course_id,
+                "detected_at": detected_at.isoformat(),
+            },
+        )
         self.db.commit()
-        self.db.refresh(alert)
 
         logger.warning(
             f"Risk alert created: {alert_type}",
             extra={
-                "alert_id": alert.id,
+                "alert_id": alert_id,
                 "severity": severity,
                 "scope": scope,
                 "student_id": student_id,
@@ -1911,61 +2893,97 @@ class RiskAlertRepository:
         return alert
 
     def get_by_id(self, alert_id: str) -> Optional[RiskAlertDB]:
-        """Get alert by ID"""
-        return self.db.query(RiskAlertDB).filter(RiskAlertDB.id == alert_id).first()
+        """
+        Get alert by ID
+
+        Session.get() consulta primero el identity map: en flujos
+        get_by_id -> acknowledge -> get_by_id dentro de un request solo el
+        primer lookup va a la base (los UPDATE ... RETURNING refrescan la
+        instancia cargada, así que no queda desactualizada).
+        """
+        return self.db.get(RiskAlertDB, alert_id)
+
+    def _list(self, criterion, status: Optional[str]) -> List[RiskAlertDB]:
+        """
+        Listado de alertas (más recientes primero) con filtro opcional por status.
+
+        raiseload("*"): acceder a alert.remediation_plan sobre un listado lanza
+        una excepción en vez de disparar una query por fila (N+1); si hace
+        falta la relación, cargarla explícitamente con selectinload.
+        """
+        stmt = select(RiskAlertDB).options(raiseload("*")).where(criterion)
+        if status:
+            stmt = stmt.where(RiskAlertDB.status == status)
+        stmt = stmt.order_by(desc(RiskAlertDB.detected_at))
+        return self.db.execute(stmt).scalars().all()
 
     def get_by_student(
         self, student_id: str, status: Optional[str] = None
     ) -> List[RiskAlertDB]:
         """Get alerts for student, optionally filtered by status"""
-        query = self.db.query(RiskAlertDB).filter(
-            RiskAlertDB.student_id == student_id
+        return self._list(RiskAlertDB.student_id == student_id, status)
+
+    def get_by_students(
+        self,
+        student_ids: List[str],
+        status: Optional[str] = None,
+        limit_per_student: Optional[int] = None,
+    ) -> Dict[str, List[RiskAlertDB]]:
+        """
+        Get alerts for many students in one query, most recent first
+
+        Returns:
+            Dict student_id -> alertas (estudiantes sin alertas quedan con [])
+        """
+        criteria = (RiskAlertDB.status == status,) if status else ()
+        return _top_per_group(
+            self.db,
+            RiskAlertDB,
+            RiskAlertDB.student_id,
+            desc(RiskAlertDB.detected_at),
+            student_ids,
+            limit_per_student,
+            *criteria,
         )
-        if status:
-            query = query.filter(RiskAlertDB.status == status)
-        return query.order_by(desc(RiskAlertDB.detected_at)).all()
 
     def get_by_course(
         self, course_id: str, status: Optional[str] = None
     ) -> List[RiskAlertDB]:
         """Get alerts for course, optionally filtered by status"""
-        query = self.db.query(RiskAlertDB).filter(RiskAlertDB.course_id == course_id)
-        if status:
-            query = query.filter(RiskAlertDB.status == status)
-        return query.order_by(desc(RiskAlertDB.detected_at)).all()
+        return self._list(RiskAlertDB.course_id == course_id, status)
 
     def get_by_severity(
         self, severity: str, status: Optional[str] = "open"
     ) -> List[RiskAlertDB]:
         """Get alerts by severity level"""
-        query = self.db.query(RiskAlertDB).filter(RiskAlertDB.severity == severity)
-        if status:
-            query = query.filter(RiskAlertDB.status == status)
-        return query.order_by(desc(RiskAlertDB.detected_at)).all()
+        return self._list(RiskAlertDB.severity == severity, status)
 
     def get_assigned_to(
         self, teacher_id: str, status: Optional[str] = None
     ) -> List[RiskAlertDB]:
         """Get alerts assigned to a teacher"""
-        query = self.db.query(RiskAlertDB).filter(
-            RiskAlertDB.assigned_to == teacher_id
+        return self._list(RiskAlertDB.assigned_to == teacher_id, status)
+
+    def get_by_evidence(
+        self, evidence_id: str, status: Optional[str] = None
+    ) -> List[RiskAlertDB]:
+        """
+        Get alerts citing a risk/session/trace ID as evidence
+
+        PostgreSQL: evidence @> '["id"]' sobre ix_alert_evidence_gin.
+        """
+        return self._list(
+            _json_array_contains(self.db, RiskAlertDB.evidence, evidence_id), status
         )
-        if status:
-            query = query.filter(RiskAlertDB.status == status)
-        return query.order_by(desc(RiskAlertDB.detected_at)).all()
 
     def assign_to(self, alert_id: str, teacher_id: str) -> Optional[RiskAlertDB]:
         """Assign alert to a teacher"""
-        alert = self.get_by_id(alert_id)
+        alert = self._update_by_id(
+            RiskAlertDB, alert_id, assigned_to=teacher_id, assigned_at=_utc_now()
+        )
         if not alert:
             return None
 
-        alert.assigned_to = teacher_id
-        alert.assigned_at = datetime.utcnow()
-        alert.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(alert)
-
         logger.info(
             "Risk alert assigned",
             extra={"alert_id": alert.id, "assigned_to": teacher_id},
@@ -1976,17 +2994,16 @@ class RiskAlertRepository:
         self, alert_id: str, acknowledged_by: str
     ) -> Optional[RiskAlertDB]:
         """Acknowledge an alert"""
-        alert = self.get_by_id(alert_id)
+        alert = self._update_by_id(
+            RiskAlertDB,
+            alert_id,
+            status="acknowledged",
+            acknowledged_at=_utc_now(),
+            acknowledged_by=acknowledged_by,
+        )
         if not alert:
             return None
 
-        alert.status = "acknowledged"
-        alert.acknowledged_at = datetime.utcnow()
-        alert.acknowledged_by = acknowledged_by
-        alert.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(alert)
-
         logger.info(
             "Risk alert acknowledged",
             extra={"alert_id": alert.id, "acknowledged_by": acknowledged_by},
@@ -2000,19 +3017,18 @@ class RiskAlertRepository:
         remediation_plan_id: Optional[str] = None,
     ) -> Optional[RiskAlertDB]:
         """Resolve an alert"""
-        alert = self.get_by_id(alert_id)
+        values = {
+            "status": "resolved",
+            "resolution_notes": resolution_notes,
+            "resolved_at": _utc_now(),
+        }
+        if remediation_plan_id:
+            values["remediation_plan_id"] = remediation_plan_id
+
+        alert = self._update_by_id(RiskAlertDB, alert_id, **values)
         if not alert:
             return None
 
-        alert.status = "resolved"
-        alert.resolution_notes = resolution_notes
-        alert.resolved_at = datetime.utcnow()
-        if remediation_plan_id:
-            alert.remediation_plan_id = remediation_plan_id
-        alert.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(alert)
-
         logger.info(
             "Risk alert resolved",
             extra={
@@ -2024,15 +3040,10 @@ class RiskAlertRepository:
 
     def mark_false_positive(self, alert_id: str) -> Optional[RiskAlertDB]:
         """Mark alert as false positive"""
-        alert = self.get_by_id(alert_id)
+        alert = self._update_by_id(RiskAlertDB, alert_id, status="false_positive")
         if not alert:
             return None
 
-        alert.status = "false_positive"
-        alert.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(alert)
-
         logger.info(
             "Risk alert marked as false positive", extra={"alert_id": alert.id}
         )
@@ -2044,16 +3055,40 @@ class RiskAlertRepository:
 # =============================================================================
 
 
-class InterviewSessionRepository:
+# Getters de fila única de los simuladores y LTI en lambda_stmt (ver
+# _ACTIVITY_BY_ID). get_by_issuer_and_deployment corre en cada launch LTI y
+# resuelve sobre el índice único idx_lti_deployment_unique (issuer, deployment_id).
+# Los get_by_id usan Session.get (ver BaseRepository._get).
+# Eager loading de los historiales (tablas hijas, ver _append_children):
+# selectinload agrega una query por colección para todo el lote, sin N+1
+# al listar entrevistas/incidentes con sus preguntas, respuestas o pasos.
+_INTERVIEW_HISTORY = (
+    selectinload(InterviewSessionDB.questions),
+    selectinload(InterviewSessionDB.answers),
+)
+_INCIDENT_HISTORY = (selectinload(IncidentSimulationDB.diagnosis_steps),)
+
+_LTI_DEPLOYMENT_BY_ISSUER = lambda_stmt(
+    lambda: select(LTIDeploymentDB).where(
+        LTIDeploymentDB.issuer == bindparam("issuer"),
+        LTIDeploymentDB.deployment_id == bindparam("deployment_id"),
+    )
+)
+
+_LTI_SESSION_BY_SESSION_ID = lambda_stmt(
+    lambda: select(LTISessionDB)
+    .where(LTISessionDB.session_id == bindparam("session_id"))
+    .limit(1)
+)
+
+
+class InterviewSessionRepository(BaseRepository):
     """
     Repository for interview session operations
 
     SPRINT 6 - HU-EST-011: Enfrentar Entrevista Técnica Simulada (IT-IA)
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         session_id: str,
@@ -2077,24 +3112,27 @@ class InterviewSessionRepository:
         Returns:
             Created InterviewSessionDB instance
         """
-        interview = InterviewSessionDB(
-            id=str(uuid4()),
+        interview_id = new_uuid7_str()
+        interview = self._insert(
+            InterviewSessionDB,
+            id=interview_id,
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
             interview_type=interview_type,
             difficulty_level=difficulty_level,
-            questions_asked=questions_asked or [],
-            responses=[],
         )
-        self.db.add(interview)
-        self.db.commit()
-        self.db.refresh(interview)
+        if questions_asked:
+            self.db.execute(insert(InterviewQuestionDB), [
+                {"interview_id": interview_id, "seq": seq, "payload": question}
+                for seq, question in enumerate(questions_asked, start=1)
+            ])
+        self._commit()
 
         logger.info(
             "Interview session created",
             extra={
-                "interview_id": interview.id,
+                "interview_id": interview_id,
                 "session_id": session_id,
                 "interview_type": interview_type,
             },
@@ -2104,30 +3142,32 @@ class InterviewSessionRepository:
     def add_question(
         self, interview_id: str, question: dict
     ) -> Optional[InterviewSessionDB]:
-        """Add a question to an interview"""
-        interview = self.get_by_id(interview_id)
-        if not interview:
-            return None
+        """Add a question to an interview (un INSERT, ver _append_children)"""
+        return self._append_children(
+            InterviewSessionDB, interview_id, InterviewSessionDB.questions, [question]
+        )
 
-        interview.questions_asked = interview.questions_asked + [question]
-        interview.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(interview)
-        return interview
+    def add_questions_bulk(
+        self, interview_id: str, questions: List[dict]
+    ) -> Optional[InterviewSessionDB]:
+        """
+        Add several questions to an interview in one INSERT (y un commit)
+
+        Reemplaza N llamadas a add_question (N statements + N commits).
+        """
+        if not questions:
+            return self.get_by_id(interview_id)
+        return self._append_children(
+            InterviewSessionDB, interview_id, InterviewSessionDB.questions, questions
+        )
 
     def add_response(
         self, interview_id: str, response: dict
     ) -> Optional[InterviewSessionDB]:
-        """Add a student response to an interview"""
-        interview = self.get_by_id(interview_id)
-        if not interview:
-            return None
-
-        interview.responses = interview.responses + [response]
-        interview.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(interview)
-        return interview
+        """Add a student response to an interview (un INSERT, ver _append_children)"""
+        return self._append_children(
+            InterviewSessionDB, interview_id, InterviewSessionDB.answers, [response]
+        )
 
     def complete_interview(
         self,
@@ -2138,43 +3178,64 @@ class InterviewSessionRepository:
         duration_minutes: int,
     ) -> Optional[InterviewSessionDB]:
         """Complete an interview with final evaluation"""
-        interview = self.get_by_id(interview_id)
+        interview = self._update_by_id(
+            InterviewSessionDB,
+            interview_id,
+            evaluation_score=evaluation_score,
+            evaluation_breakdown=evaluation_breakdown,
+            feedback=feedback,
+            duration_minutes=duration_minutes,
+        )
         if not interview:
             return None
 
-        interview.evaluation_score = evaluation_score
-        interview.evaluation_breakdown = evaluation_breakdown
-        interview.feedback = feedback
-        interview.duration_minutes = duration_minutes
-        interview.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(interview)
-
         logger.info(
             "Interview completed",
             extra={
-                "interview_id": interview.id,
+                "interview_id": interview_id,
                 "evaluation_score": evaluation_score,
             },
         )
         return interview
 
-    def get_by_id(self, interview_id: str) -> Optional[InterviewSessionDB]:
-        """Get interview by ID"""
-        return (
-            self.db.query(InterviewSessionDB)
-            .filter(InterviewSessionDB.id == interview_id)
-            .first()
+    def get_by_id(
+        self, interview_id: str, load_history: bool = False
+    ) -> Optional[InterviewSessionDB]:
+        """
+        Get interview by ID (identity map de la sesión, ver _get)
+
+        Args:
+            interview_id: Interview ID
+            load_history: If True, loads questions and responses up front
+                (selectinload: 3 queries en total en lugar de lazy loads sueltos)
+        """
+        return self._get(
+            InterviewSessionDB, interview_id, _INTERVIEW_HISTORY if load_history else ()
         )
 
-    def get_by_session(self, session_id: str) -> List[InterviewSessionDB]:
+    def get_by_session(
+        self, session_id: str, load_history: bool = False
+    ) -> List[InterviewSessionDB]:
         """Get all interviews for a session"""
-        return (
-            self.db.query(InterviewSessionDB)
-            .filter(InterviewSessionDB.session_id == session_id)
+        return list(self.iter_by_session(session_id, load_history))
+
+    def iter_by_session(
+        self, session_id: str, load_history: bool = False
+    ) -> Iterator[InterviewSessionDB]:
+        """
+        Interviews of a session in chronological order, streamed (ver _stream)
+
+        Con load_history=True cada lote de yield_per trae sus preguntas y
+        respuestas con un selectinload por colección (sin N+1).
+        """
+        stmt = (
+            select(InterviewSessionDB)
+            .where(InterviewSessionDB.session_id == session_id)
             .order_by(InterviewSessionDB.created_at)
-            .all()
         )
+        if load_history:
+            stmt = stmt.options(*_INTERVIEW_HISTORY)
+        return self._stream(stmt)
 
     def get_by_student(
         self, student_id: str, limit: Optional[int] = None
@@ -2189,17 +3250,38 @@ class InterviewSessionRepository:
             query = query.limit(limit)
         return query.all()
 
+    def page_by_student(
+        self,
+        student_id: str,
+        cursor: Optional[KeysetCursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[InterviewSessionDB], Optional[KeysetCursor]]:
+        """
+        Get interviews by student, newest first, one keyset page at a time
 
-class IncidentSimulationRepository:
+        Args:
+            student_id: Student ID
+            cursor: next_cursor de la página anterior (None = primera página)
+            limit: Tamaño de página
+
+        Returns:
+            (page, next_cursor); next_cursor es None en la última página
+        """
+        stmt = (
+            select(InterviewSessionDB)
+            .options(raiseload("*"))
+            .where(InterviewSessionDB.student_id == student_id)
+        )
+        return self._keyset_page(stmt, InterviewSessionDB, cursor, limit)
+
+
+class IncidentSimulationRepository(BaseRepository):
     """
     Repository for incident simulation operations
 
     SPRINT 6 - HU-EST-012: Responder Incidente en Producción (IR-IA)
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         session_id: str,
@@ -2227,8 +3309,10 @@ class IncidentSimulationRepository:
         Returns:
             Created IncidentSimulationDB instance
         """
-        incident = IncidentSimulationDB(
-            id=str(uuid4()),
+        incident_id = new_uuid7_str()
+        incident = self._insert(
+            IncidentSimulationDB,
+            id=incident_id,
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
@@ -2237,16 +3321,13 @@ class IncidentSimulationRepository:
             incident_description=incident_description,
             simulated_logs=simulated_logs,
             simulated_metrics=simulated_metrics or {},
-            diagnosis_process=[],
         )
-        self.db.add(incident)
-        self.db.commit()
-        self.db.refresh(incident)
+        self._commit()
 
         logger.info(
             "Incident simulation created",
             extra={
-                "incident_id": incident.id,
+                "incident_id": incident_id,
                 "session_id": session_id,
                 "incident_type": incident_type,
                 "severity": severity,
@@ -2257,16 +3338,29 @@ class IncidentSimulationRepository:
     def add_diagnosis_step(
         self, incident_id: str, diagnosis_step: dict
     ) -> Optional[IncidentSimulationDB]:
-        """Add a diagnosis step to the incident"""
-        incident = self.get_by_id(incident_id)
-        if not incident:
-            return None
+        """
+        Add a diagnosis step to the incident
 
-        incident.diagnosis_process = incident.diagnosis_process + [diagnosis_step]
-        incident.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(incident)
-        return incident
+        Un INSERT en incident_diagnosis_steps (ver _append_children): no se
+        lee ni se reescribe el proceso completo.
+        """
+        return self._append_children(
+            IncidentSimulationDB, incident_id, IncidentSimulationDB.diagnosis_steps, [diagnosis_step]
+        )
+
+    def add_diagnosis_steps(
+        self, incident_id: str, diagnosis_steps: List[dict]
+    ) -> Optional[IncidentSimulationDB]:
+        """
+        Add several diagnosis steps in one INSERT (y un commit)
+
+        Usado por el write-behind de pasos (database/diagnosis_buffer.py).
+        """
+        if not diagnosis_steps:
+            return self.get_by_id(incident_id)
+        return self._append_children(
+            IncidentSimulationDB, incident_id, IncidentSimulationDB.diagnosis_steps, diagnosis_steps
+        )
 
     def complete_incident(
         self,
@@ -2279,45 +3373,60 @@ class IncidentSimulationRepository:
         evaluation: dict,
     ) -> Optional[IncidentSimulationDB]:
         """Complete an incident with solution and evaluation"""
-        incident = self.get_by_id(incident_id)
+        incident = self._update_by_id(
+            IncidentSimulationDB,
+            incident_id,
+            solution_proposed=solution_proposed,
+            root_cause_identified=root_cause_identified,
+            time_to_diagnose_minutes=time_to_diagnose_minutes,
+            time_to_resolve_minutes=time_to_resolve_minutes,
+            post_mortem=post_mortem,
+            evaluation=evaluation,
+        )
         if not incident:
             return None
 
-        incident.solution_proposed = solution_proposed
-        incident.root_cause_identified = root_cause_identified
-        incident.time_to_diagnose_minutes = time_to_diagnose_minutes
-        incident.time_to_resolve_minutes = time_to_resolve_minutes
-        incident.post_mortem = post_mortem
-        incident.evaluation = evaluation
-        incident.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(incident)
-
         logger.info(
             "Incident simulation completed",
             extra={
-                "incident_id": incident.id,
+                "incident_id": incident_id,
                 "time_to_resolve": time_to_resolve_minutes,
             },
         )
         return incident
 
-    def get_by_id(self, incident_id: str) -> Optional[IncidentSimulationDB]:
-        """Get incident by ID"""
-        return (
-            self.db.query(IncidentSimulationDB)
-            .filter(IncidentSimulationDB.id == incident_id)
-            .first()
+    def get_by_id(
+        self, incident_id: str, load_history: bool = False
+    ) -> Optional[IncidentSimulationDB]:
+        """
+        Get incident by ID (identity map de la sesión, ver _get)
+
+        Args:
+            incident_id: Incident ID
+            load_history: If True, loads the diagnosis steps up front (selectinload)
+        """
+        return self._get(
+            IncidentSimulationDB, incident_id, _INCIDENT_HISTORY if load_history else ()
         )
 
-    def get_by_session(self, session_id: str) -> List[IncidentSimulationDB]:
+    def get_by_session(
+        self, session_id: str, load_history: bool = False
+    ) -> List[IncidentSimulationDB]:
         """Get all incidents for a session"""
-        return (
-            self.db.query(IncidentSimulationDB)
-            .filter(IncidentSimulationDB.session_id == session_id)
+        return list(self.iter_by_session(session_id, load_history))
+
+    def iter_by_session(
+        self, session_id: str, load_history: bool = False
+    ) -> Iterator[IncidentSimulationDB]:
+        """Incidents of a session in chronological order, streamed (ver _stream)"""
+        stmt = (
+            select(IncidentSimulationDB)
+            .where(IncidentSimulationDB.session_id == session_id)
             .order_by(IncidentSimulationDB.created_at)
-            .all()
         )
+        if load_history:
+            stmt = stmt.options(*_INCIDENT_HISTORY)
+        return self._stream(stmt)
 
     def get_by_student(
         self, student_id: str, limit: Optional[int] = None
@@ -2332,16 +3441,48 @@ class IncidentSimulationRepository:
             query = query.limit(limit)
         return query.all()
 
+    def page_by_student(
+        self,
+        student_id: str,
+        cursor: Optional[KeysetCursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[IncidentSimulationDB], Optional[KeysetCursor]]:
+        """
+        Get incidents by student, newest first, one keyset page at a time
+
+        Args:
+            student_id: Student ID
+            cursor: next_cursor de la página anterior (None = primera página)
+            limit: Tamaño de página
 
-class LTIDeploymentRepository:
+        Returns:
+            (page, next_cursor); next_cursor es None en la última página
+        """
+        stmt = (
+            select(IncidentSimulationDB)
+            .options(raiseload("*"))
+            .where(IncidentSimulationDB.student_id == student_id)
+        )
+        return self._keyset_page(stmt, IncidentSimulationDB, cursor, limit)
+
+
+class LTIDeploymentRepository(BaseRepository):
     """
     Repository for LTI deployment operations
 
     SPRINT 6 - HU-SYS-010: Integración LTI con Moodle
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
+    def __init__(self, db_session: Session, cache: Optional[LTIDeploymentCache] = None):
+        """
+        Args:
+            db_session: SQLAlchemy session
+            cache: Cache TTL de get_by_issuer_and_deployment. Si es None no se
+                cachea; la API inyecta el cache de proceso
+                (lti_cache.get_lti_deployment_cache()).
+        """
+        super().__init__(db_session)
+        self.cache = cache
 
     def create(
         self,
@@ -2370,8 +3511,10 @@ class LTIDeploymentRepository:
         Returns:
             Created LTIDeploymentDB instance
         """
-        deployment = LTIDeploymentDB(
-            id=str(uuid4()),
+        deployment_db_id = new_uuid7_str()
+        deployment = self._insert(
+            LTIDeploymentDB,
+            id=deployment_db_id,
             platform_name=platform_name,
             issuer=issuer,
             client_id=client_id,
@@ -2382,14 +3525,14 @@ class LTIDeploymentRepository:
             access_token_url=access_token_url,
             is_active=True,
         )
-        self.db.add(deployment)
-        self.db.commit()
-        self.db.refresh(deployment)
+        self._commit()
+        if self.cache is not None:
+            self.cache.invalidate(deployment)
 
         logger.info(
             "LTI deployment created",
             extra={
-                "deployment_db_id": deployment.id,
+                "deployment_db_id": deployment_db_id,
                 "platform_name": platform_name,
                 "issuer": issuer,
                 "deployment_id": deployment_id,
@@ -2398,63 +3541,71 @@ class LTIDeploymentRepository:
         return deployment
 
     def get_by_id(self, deployment_db_id: str) -> Optional[LTIDeploymentDB]:
-        """Get deployment by database ID"""
-        return (
-            self.db.query(LTIDeploymentDB)
-            .filter(LTIDeploymentDB.id == deployment_db_id)
-            .first()
-        )
+        """Get deployment by database ID (identity map de la sesión, ver _get)"""
+        return self._get(LTIDeploymentDB, deployment_db_id)
 
     def get_by_issuer_and_deployment(
         self, issuer: str, deployment_id: str
     ) -> Optional[LTIDeploymentDB]:
-        """Get deployment by issuer + deployment_id (unique constraint)"""
-        return (
-            self.db.query(LTIDeploymentDB)
-            .filter(
-                LTIDeploymentDB.issuer == issuer,
-                LTIDeploymentDB.deployment_id == deployment_id,
-            )
-            .first()
-        )
+        """
+        Get deployment by issuer + deployment_id (unique constraint)
+
+        Con cache, un hit re-adjunta el snapshot a la sesión sin SQL (ver
+        UserRepository._cached_lookup): la mayoría de los launches LTI no
+        consultan la base para resolver el deployment.
+        """
+        if self.cache is not None:
+            snapshot = self.cache.get(issuer, deployment_id)
+            if snapshot is not None:
+                existing = self.db.identity_map.get(identity_key(LTIDeploymentDB, snapshot["id"]))
+                if existing is not None:
+                    return existing
+                deployment = LTIDeploymentDB(**snapshot)
+                make_transient_to_detached(deployment)
+                return self.db.merge(deployment, load=False)
+
+        deployment = self.db.execute(
+            _LTI_DEPLOYMENT_BY_ISSUER, {"issuer": issuer, "deployment_id": deployment_id}
+        ).scalar_one_or_none()
+        if deployment is not None and self.cache is not None:
+            self.cache.put(deployment)
+        return deployment
 
     def get_active_deployments(self) -> List[LTIDeploymentDB]:
         """Get all active LTI deployments"""
-        return (
-            self.db.query(LTIDeploymentDB)
-            .filter(LTIDeploymentDB.is_active == True)
+        return list(self.iter_active_deployments())
+
+    def iter_active_deployments(self) -> Iterator[LTIDeploymentDB]:
+        """Active LTI deployments by platform name, streamed (ver _stream)"""
+        stmt = (
+            select(LTIDeploymentDB)
+            .where(LTIDeploymentDB.is_active == True)
             .order_by(LTIDeploymentDB.platform_name)
-            .all()
         )
+        return self._stream(stmt)
 
     def deactivate(self, deployment_db_id: str) -> Optional[LTIDeploymentDB]:
         """Deactivate an LTI deployment"""
-        deployment = self.get_by_id(deployment_db_id)
+        deployment = self._update_by_id(LTIDeploymentDB, deployment_db_id, is_active=False)
         if not deployment:
             return None
-
-        deployment.is_active = False
-        deployment.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(deployment)
+        if self.cache is not None:
+            self.cache.invalidate(deployment)
 
         logger.info(
             "LTI deployment deactivated",
-            extra={"deployment_db_id": deployment.id},
+            extra={"deployment_db_id": deployment_db_id},
         )
         return deployment
 
 
-class LTISessionRepository:
+class LTISessionRepository(BaseRepository):
     """
     Repository for LTI session operations
 
     SPRINT 6 - HU-SYS-010: Integración LTI con Moodle
     """
 
-    def __init__(self, db_session: Session):
-        self.db = db_session
-
     def create(
         self,
         deployment_id: str,
@@ -2482,14 +3633,15 @@ class LTISessionRepository:
             lti_context_label: Optional course code
             lti_context_title: Optional course name
             session_id: Mapped AI-Native session ID
-            launch_token: JWT token from LTI launch
+            launch_token: JWT token from LTI launch (clave de idempotencia por deployment)
             locale: User's locale
 
         Returns:
-            Created LTISessionDB instance
+            Created LTISessionDB instance, o la ya existente si el launch
+            (deployment_id, launch_token) se está reintentando
         """
-        lti_session = LTISessionDB(
-            id=str(uuid4()),
+        values = dict(
+            id=new_uuid7_str(),
             deployment_id=deployment_id,
             lti_user_id=lti_user_id,
             lti_user_name=lti_user_name,
@@ -2500,37 +3652,63 @@ class LTISessionRepository:
             resource_link_id=resource_link_id,
             session_id=session_id,
             launch_token=launch_token,
+            launch_token_hash=_launch_token_hash(launch_token),
             locale=locale,
         )
-        self.db.add(lti_session)
-        self.db.commit()
-        self.db.refresh(lti_session)
+        if launch_token is None:
+            lti_session = self._insert(LTISessionDB, **values)
+            lti_session_id = values["id"]
+        else:
+            lti_session = self._upsert_launch(values)
+            # Reintento del launch: id de la fila existente
+            lti_session_id = lti_session.id
+        self._commit()
 
         logger.info(
             "LTI session created",
             extra={
-                "lti_session_id": lti_session.id,
+                "lti_session_id": lti_session_id,
                 "lti_user_id": lti_user_id,
                 "session_id": session_id,
             },
         )
         return lti_session
 
-    def get_by_id(self, lti_session_id: str) -> Optional[LTISessionDB]:
-        """Get LTI session by ID"""
-        return (
-            self.db.query(LTISessionDB)
-            .filter(LTISessionDB.id == lti_session_id)
-            .first()
+    def _upsert_launch(self, values: Dict[str, Any]) -> LTISessionDB:
+        """
+        INSERT ... ON CONFLICT (deployment_id, launch_token_hash) DO UPDATE ... RETURNING *
+
+        Un launch reintentado (timeout de red, doble submit) devuelve la
+        sesión ya creada en el mismo round-trip, sin SELECT previo y sin
+        carrera entre dos requests con el mismo token. El DO UPDATE solo toca
+        updated_at: con DO NOTHING el RETURNING vendría vacío en el conflicto.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = pg_insert(LTISessionDB)
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(LTISessionDB)
+        else:
+            return self._insert(LTISessionDB, **values)
+        stmt = (
+            stmt.values(**values)
+            .on_conflict_do_update(
+                index_elements=["deployment_id", "launch_token_hash"],
+                set_={"updated_at": _utc_now()},
+            )
+            .returning(LTISessionDB)
         )
+        return self.db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+    def get_by_id(self, lti_session_id: str) -> Optional[LTISessionDB]:
+        """Get LTI session by ID (identity map de la sesión, ver _get)"""
+        return self._get(LTISessionDB, lti_session_id)
 
     def get_by_session_id(self, session_id: str) -> Optional[LTISessionDB]:
         """Get LTI session by AI-Native session ID"""
-        return (
-            self.db.query(LTISessionDB)
-            .filter(LTISessionDB.session_id == session_id)
-            .first()
-        )
+        return self.db.execute(
+            _LTI_SESSION_BY_SESSION_ID, {"session_id": session_id}
+        ).scalar_one_or_none()
 
     def get_by_lti_user(self, lti_user_id: str) -> List[LTISessionDB]:
         """Get all LTI sessions for a user"""
@@ -2541,21 +3719,83 @@ class LTISessionRepository:
             .all()
         )
 
+    def page_by_lti_user(
+        self,
+        lti_user_id: str,
+        cursor: Optional[KeysetCursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[LTISessionDB], Optional[KeysetCursor]]:
+        """
+        Get LTI sessions by LTI user, newest first, one keyset page at a time
+
+        Args:
+            lti_user_id: User ID from Moodle
+            cursor: next_cursor de la página anterior (None = primera página)
+            limit: Tamaño de página
+
+        Returns:
+            (page, next_cursor); next_cursor es None en la última página
+        """
+        stmt = (
+            select(LTISessionDB)
+            .options(raiseload("*"))
+            .where(LTISessionDB.lti_user_id == lti_user_id)
+        )
+        return self._keyset_page(stmt, LTISessionDB, cursor, limit)
+
     def link_to_session(
         self, lti_session_id: str, session_id: str
     ) -> Optional[LTISessionDB]:
         """Link LTI session to AI-Native session"""
-        lti_session = self.get_by_id(lti_session_id)
+        lti_session = self._update_by_id(LTISessionDB, lti_session_id, session_id=session_id)
         if not lti_session:
             return None
 
-        lti_session.session_id = session_id
-        lti_session.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(lti_session)
-
         logger.info(
             "LTI session linked to AI-Native session",
-            extra={"lti_session_id": lti_session.id, "session_id": session_id},
+            extra={"lti_session_id": lti_session_id, "session_id": session_id},
         )
         return lti_session
+
+
+# =============================================================================
+# Warm-up del cache de statements compilados
+# =============================================================================
+
+# Statements del hot path con parámetros dummy (no matchean ninguna fila)
+_WARMUP_STATEMENTS = (
+    (_USER_BY_ID, {"user_id": ""}),
+    (_USER_BY_EMAIL, {"email": ""}),
+    (_USER_BY_USERNAME, {"username": ""}),
+    (_USER_BY_STUDENT_ID, {"student_id": ""}),
+    (_ACTIVITY_BY_ID, {"id": ""}),
+    (_ACTIVITY_BY_ACTIVITY_ID, {"activity_id": ""}),
+    (_LTI_DEPLOYMENT_BY_ISSUER, {"issuer": "", "deployment_id": ""}),
+)
+
+
+def warm_statement_cache(db: Session) -> int:
+    """
+    Compila los statements del hot path antes del primer request.
+
+    El cache de SQL compilado es por Engine (y por dialecto), así que no
+    alcanza con stmt.compile(): se ejecuta cada statement una vez contra la
+    base real, dentro de una transacción que se descarta con rollback.
+    Llamar en el startup de la aplicación.
+
+    Args:
+        db: Sesión de base de datos (el caller la cierra)
+
+    Returns:
+        Cantidad de statements ejecutados
+    """
+    activity_repo = ActivityRepository(db)
+    try:
+        for stmt, params in _WARMUP_STATEMENTS:
+            db.execute(stmt, params).all()
+        # Variantes sin filtros de los listados de actividades
+        activity_repo.count()
+        activity_repo.list_rows(limit=1)
+    finally:
+        db.rollback()
+    return len(_WARMUP_STATEMENTS) + 2
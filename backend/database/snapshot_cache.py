@@ -0,0 +1,129 @@
+"""
+TTL + LRU cache genérico de snapshots de filas ORM
+
+Base de user_cache y lti_cache: guarda un dict con los valores de columna de
+una fila (sin estado ORM) bajo una o más claves, y el repositorio lo
+re-adjunta a la sesión sin SQL (make_transient_to_detached +
+merge(load=False)).
+
+Cada cache concreto define dos funciones:
+- snapshot_fn(row) -> dict: copia los valores de columna
+- keys_fn(snapshot) -> lista de tuplas: claves bajo las que se indexa el
+  snapshot. La primera debe ser estable (no cambiar con las mutaciones):
+  invalidate() la usa para encontrar el snapshot cacheado.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+Snapshot = Dict[str, Any]
+
+T = TypeVar("T")
+
+
+def column_snapshot(model_cls, row) -> Snapshot:
+    """Copia los valores de columna de una instancia de `model_cls`"""
+    return {attr.key: getattr(row, attr.key) for attr in model_cls.__mapper__.column_attrs}
+
+
+class SnapshotCache:
+    """
+    Cache LRU con TTL de snapshots de filas. Thread-safe.
+
+    get() recibe las partes de la clave, p.ej. get("email", "ana@uni.edu")
+    busca la clave ("email", "ana@uni.edu").
+    """
+
+    def __init__(
+        self,
+        snapshot_fn: Callable[[Any], Snapshot],
+        keys_fn: Callable[[Snapshot], List[Tuple]],
+        max_size: int,
+        ttl_seconds: float,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._snapshot_fn = snapshot_fn
+        self._keys_fn = keys_fn
+        self._entries: "OrderedDict[Tuple, Tuple[float, Snapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, *key: Any) -> Optional[Snapshot]:
+        """Devuelve el snapshot vigente para la clave, o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, row: Any) -> None:
+        """Cachea la fila bajo todas sus claves"""
+        snapshot = self._snapshot_fn(row)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key in self._keys_fn(snapshot):
+                self._entries[key] = (expires_at, snapshot)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, row: Any) -> None:
+        """
+        Elimina todas las claves de una fila (llamar tras cada mutación).
+
+        Incluye las claves del snapshot cacheado: si la mutación cambió un
+        campo de lookup (p.ej. el email), la clave vieja también se borra.
+        """
+        keys = self._keys_fn(self._snapshot_fn(row))
+        with self._lock:
+            cached = self._entries.get(keys[0])
+            if cached is not None:
+                keys = keys + self._keys_fn(cached[1])
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Limpia todo el cache"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de hit/miss"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate_percent": round(self._hits / total * 100, 2) if total else 0,
+                "current_size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Getter de una instancia por proceso, creada en el primer uso
+    (double-checked locking, thread-safe).
+    """
+    instance: Optional[T] = None
+    lock = threading.Lock()
+
+    def get_instance() -> T:
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return get_instance
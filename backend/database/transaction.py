@@ -66,6 +66,47 @@ def transaction(session: Session, description: str = ""):
         logger.debug(f"Transaction {tx_id} completed")
 
 
+# Session.info key: depth of the open unit_of_work() blocks on that session
+UOW_DEPTH_KEY = "uow_depth"
+
+
+@contextmanager
+def unit_of_work(session: Session):
+    """
+    Context manager that batches several repository writes into one COMMIT.
+
+    Unlike transaction(), it also tells the repositories built on
+    BaseRepository to flush() instead of commit() + refresh() on each
+    mutator, so N operations (e.g. add_response + add_question) cost one
+    transaction and one fsync. Nestable: only the outermost block commits;
+    an exception rolls back the whole block.
+
+    Args:
+        session: SQLAlchemy session shared by the repositories
+
+    Yields:
+        Session: The same session
+
+    Example:
+        with unit_of_work(session):
+            interview_repo.add_response(interview_id, response)
+            interview_repo.add_question(interview_id, question)
+            # Single commit here
+    """
+    depth = session.info.get(UOW_DEPTH_KEY, 0)
+    session.info[UOW_DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[UOW_DEPTH_KEY] = depth
+
+
 def transactional(description: str = ""):
     """
     Decorator for methods that should run within a single transaction.
@@ -0,0 +1,55 @@
+"""
+TTL + LRU cache de lookups de usuario (hot path de autenticación)
+
+Cada request autenticado decodifica el JWT y busca el usuario por id: un
+SELECT por request para datos que cambian cada varios minutos. Este cache
+guarda un snapshot de las columnas de UserDB indexado por id, email y
+username; UserRepository lo re-adjunta a la sesión sin SQL
+(make_transient_to_detached + merge(load=False)). La mecánica TTL/LRU vive
+en snapshot_cache.SnapshotCache.
+
+Invalidación: los métodos de mutación de UserRepository invalidan las tres
+claves del usuario. El cache es por proceso: con varios workers, otro worker
+puede ver datos viejos hasta `ttl_seconds` (default 60s).
+"""
+from typing import Any, Dict, List, Tuple
+
+from .models import UserDB
+from .snapshot_cache import SnapshotCache, column_snapshot, lazy_singleton
+
+DEFAULT_USER_CACHE_MAX_SIZE = 10_000
+DEFAULT_USER_CACHE_TTL_SECONDS = 60
+
+# Claves por las que se indexa un snapshot ("id" primero: no cambia)
+_LOOKUP_FIELDS = ("id", "email", "username")
+
+
+def snapshot_user(user: UserDB) -> Dict[str, Any]:
+    """Copia los valores de columna de un UserDB (sin estado ORM)"""
+    snapshot = column_snapshot(UserDB, user)
+    # roles es mutable (lista JSON): no compartir la referencia
+    snapshot["roles"] = list(snapshot["roles"] or [])
+    return snapshot
+
+
+def _user_keys(snapshot: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    return [(field, snapshot[field]) for field in _LOOKUP_FIELDS]
+
+
+class UserLookupCache(SnapshotCache):
+    """
+    Cache LRU con TTL de snapshots de usuario. Thread-safe.
+
+    Las claves son tuplas (campo, valor): get("email", "ana@uni.edu").
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_USER_CACHE_MAX_SIZE,
+        ttl_seconds: float = DEFAULT_USER_CACHE_TTL_SECONDS,
+    ):
+        super().__init__(snapshot_user, _user_keys, max_size, ttl_seconds)
+
+
+# Global cache instance (thread-safe singleton)
+get_user_cache = lazy_singleton(UserLookupCache)
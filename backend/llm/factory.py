@@ -134,6 +134,9 @@ class LLMProviderFactory:
             timeout = os.getenv("OLLAMA_TIMEOUT")
             if timeout:
                 config["timeout"] = float(timeout)
+            tokenizer = os.getenv("OLLAMA_TOKENIZER")
+            if tokenizer:
+                config["tokenizer"] = tokenizer
 
         elif provider_type == "mock":
             # Mock provider doesn't need configuration
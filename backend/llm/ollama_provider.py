@@ -14,8 +14,12 @@ Note: Ollama must be running locally or accessible via network.
     Start server: ollama serve
     Pull models: ollama pull llama2
 """
-from typing import Optional, Dict, Any, List, AsyncIterator
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Set, Tuple
+import functools
 import logging
+import os
+import threading
+import time
 import httpx
 import json
 import asyncio
@@ -23,6 +27,48 @@ from contextlib import asynccontextmanager
 
 from .base import LLMProvider, LLMMessage, LLMResponse, LLMRole
 
+# HTTP/2 requiere el paquete 'h2' (httpx[http2]); sin él se usa HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjson parsea/serializa 2-5x más rápido que json (hot path: un objeto JSON
+# por token en streaming); sin él se usa la stdlib
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+    JSON_DECODE_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Conteo exacto de tokens con un tokenizer de HuggingFace (opcional: sin
+# 'tokenizers' o sin config "tokenizer" se usa la heurística de 4 chars/token)
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    Tokenizer = None
+    TOKENIZERS_AVAILABLE = False
+
+# Pool de conexiones compartido por todas las llamadas concurrentes del provider
+CLIENT_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=64,
+    keepalive_expiry=300.0,
+)
+CONNECT_TIMEOUT_SECONDS = 5.0
+
 # Prometheus metrics instrumentation (HIGH-01)
 # Lazy import to avoid circular dependency with api.monitoring
 _metrics_module = None
@@ -41,6 +87,128 @@ def _get_metrics():
 logger = logging.getLogger(__name__)
 
 
+# (base_url, model) cuyo "provider initialized" ya se logueó
+_INIT_LOGGED: Set[Tuple[str, str]] = set()
+
+# Clientes HTTP compartidos, uno por (base_url, timeout, event loop): todos los
+# OllamaProvider (distintos modelos, instancias por request) reutilizan el
+# mismo pool de conexiones en lugar de pagar un handshake TCP/TLS cada uno.
+# Las conexiones de un pool pertenecen al loop que las abrió, así que cada
+# loop (el de uvicorn, o los asyncio.run() de los agentes en threads) tiene
+# su propio cliente; los de loops ya cerrados se descartan.
+_CLIENTS: Dict[Tuple[str, float, Optional[asyncio.AbstractEventLoop]], httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _shared_client(base_url: str, timeout: float) -> httpx.AsyncClient:
+    """
+    Devuelve el cliente compartido para (base_url, timeout) en el loop actual,
+    creándolo si hace falta.
+
+    HTTP/2 se negocia por ALPN, así que solo aplica cuando Ollama está detrás
+    de TLS (https://); contra http:// el cliente usa HTTP/1.1 keep-alive con
+    el mismo pool.
+    """
+    key = (base_url, timeout, _running_loop())
+    client = _CLIENTS.get(key)
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _CLIENTS.get(key)
+            if client is None or client.is_closed:
+                # Sin aclose(): sus conexiones quedaron atadas a un loop cerrado
+                for stale in [k for k in _CLIENTS if k[2] is not None and k[2].is_closed()]:
+                    del _CLIENTS[stale]
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT_SECONDS),
+                    limits=CLIENT_LIMITS,
+                    event_hooks={"response": [_http_version_logger(base_url)]},
+                )
+                _CLIENTS[key] = client
+    return client
+
+
+def _http_version_logger(base_url: str):
+    """Hook de respuesta que loguea (una vez) el protocolo negociado."""
+    logged = False
+
+    async def _log_http_version(response: httpx.Response) -> None:
+        nonlocal logged
+        if not logged:
+            logged = True
+            logger.debug(
+                "Ollama connection established",
+                extra={"http_version": response.http_version, "base_url": base_url}
+            )
+
+    return _log_http_version
+
+
+# Tokenizers cargados por proceso (None = no disponible, no se reintenta)
+_TOKENIZERS: Dict[str, Optional["Tokenizer"]] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def _is_local_tokenizer(source: str) -> bool:
+    return os.path.isfile(source)
+
+
+def _load_tokenizer(source: str) -> Optional["Tokenizer"]:
+    """
+    Carga (una vez por proceso) el tokenizer de `source`; None si no se puede.
+
+    `source` es un tokenizer.json local (Tokenizer.from_file, sin red) o un
+    repo de HuggingFace (Tokenizer.from_pretrained: descarga sincrónica, así
+    que solo se llama desde un thread, ver OllamaProvider.warmup).
+    """
+    if source in _TOKENIZERS:
+        return _TOKENIZERS[source]
+    with _tokenizers_lock:
+        if source not in _TOKENIZERS:
+            tokenizer = None
+            if TOKENIZERS_AVAILABLE:
+                try:
+                    if _is_local_tokenizer(source):
+                        tokenizer = Tokenizer.from_file(source)
+                    else:
+                        tokenizer = Tokenizer.from_pretrained(source)
+                except Exception as e:
+                    logger.warning("Tokenizer %s unavailable, using estimate: %s", source, e)
+            _TOKENIZERS[source] = tokenizer
+    return _TOKENIZERS[source]
+
+
+@functools.lru_cache(maxsize=1024)
+def _count_tokens_cached(source: str, text: str) -> int:
+    # El mismo system prompt se mide muchas veces por sesión
+    return len(_TOKENIZERS[source].encode(text).ids)
+
+
+async def close_shared_clients() -> None:
+    """
+    Cierra los clientes HTTP compartidos del loop actual (llamar en el
+    shutdown de la app). Los de loops ya cerrados se descartan sin aclose();
+    los de otros loops vivos quedan para que los use (y cierre) su loop.
+    """
+    loop = _running_loop()
+    clients = []
+    with _clients_lock:
+        for key in list(_CLIENTS):
+            if key[2] is loop:
+                clients.append(_CLIENTS.pop(key))
+            elif key[2] is not None and key[2].is_closed():
+                del _CLIENTS[key]
+    for client in clients:
+        await client.aclose()
+
+
 class OllamaProvider(LLMProvider):
     """
     Ollama LLM provider (local models)
@@ -57,6 +225,11 @@ class OllamaProvider(LLMProvider):
         model: Model name (default: llama2)
         temperature: Sampling temperature (default: 0.7)
         timeout: Request timeout in seconds (default: 60)
+        max_concurrency: Max in-flight requests in generate_many/embed (default: 16)
+        embed_batch_size: Inputs per /api/embed request (default: 64)
+        tags_cache_ttl: Seconds to cache /api/tags (default: 30)
+        tokenizer: tokenizer.json path or HuggingFace repo for count_tokens (default: none, estimate)
+        keep_alive: How long Ollama keeps the model loaded after a request (default: "10m")
 
     Example:
         >>> provider = OllamaProvider({
@@ -88,40 +261,64 @@ class OllamaProvider(LLMProvider):
         self.retry_delay = self.config.get("retry_delay", 1.0)  # seconds
         self.retry_backoff = self.config.get("retry_backoff", 2.0)  # exponential multiplier
 
+        # Concurrency cap for generate_many (see its docstring for server tuning)
+        self.max_concurrency = self.config.get("max_concurrency", 16)
+        self.embed_batch_size = self.config.get("embed_batch_size", 64)
+
+        # Tokenizer para count_tokens, solo si se configura explícitamente: un
+        # archivo local se carga en el primer conteo, un repo de HuggingFace
+        # en warmup() (descarga en un thread, nunca en el event loop)
+        self._tokenizer_source: Optional[str] = self.config.get("tokenizer")
+
+        # Cache de /api/tags: los modelos instalados cambian en minutos, no por request
+        self._tags_ttl = self.config.get("tags_cache_ttl", 30.0)
+        self._tags_cache: Optional[Tuple[float, List[str]]] = None
+        self._tags_lock = asyncio.Lock()
+
         # Remove trailing slash from base_url
         self.base_url = self.base_url.rstrip("/")
 
         # API endpoint
         self.chat_endpoint = f"{self.base_url}/api/chat"
+        self.embed_endpoint = f"{self.base_url}/api/embed"
 
-        # HTTP client (will be initialized lazily)
-        self._client: Optional[httpx.AsyncClient] = None
+        # Template del payload de /api/chat (constante por provider)
+        # keep_alive va en cada request: Ollama descarga el modelo tras 5 min
+        # sin uso y el siguiente generate paga la carga (load_duration)
+        self.keep_alive = self.config.get("keep_alive", "10m")
+        self._base_payload: Dict[str, Any] = {
+            "model": self.model,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": self.temperature},
+        }
 
-        logger.info(
-            "Ollama provider initialized",
-            extra={
-                "base_url": self.base_url,
-                "model": self.model,
-                "temperature": self.temperature,
-                "timeout": self.timeout,
-                "max_retries": self.max_retries
-            }
-        )
+        # Un log por (base_url, model): con DI por request se construyen
+        # providers en cada llamada
+        init_key = (self.base_url, self.model)
+        if init_key not in _INIT_LOGGED and logger.isEnabledFor(logging.INFO):
+            _INIT_LOGGED.add(init_key)
+            logger.info(
+                "Ollama provider initialized",
+                extra={
+                    "base_url": self.base_url,
+                    "model": self.model,
+                    "temperature": self.temperature,
+                    "timeout": self.timeout,
+                    "max_retries": self.max_retries
+                }
+            )
 
     def _get_client(self) -> httpx.AsyncClient:
-        """Lazy initialization of HTTP client. Creates persistent connection."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=httpx.Timeout(self.timeout),
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            )
-        return self._client
+        """
+        HTTP client compartido del loop actual (ver _shared_client).
 
-    async def _close_client(self):
-        """Close HTTP client and cleanup resources."""
-        if self._client is not None:
-            await self._client.aclose()
-            self._client = None
+        El provider no es dueño del cliente: no hay cierre por instancia ni
+        __del__ (un finalizador solo retrasaría la recolección de providers
+        en ciclos). Los pools se cierran una vez, en el shutdown de la app,
+        con close_shared_clients().
+        """
+        return _shared_client(self.base_url, self.timeout)
 
     def _convert_messages_to_ollama_format(self, messages: List[LLMMessage]) -> List[Dict[str, str]]:
         """
@@ -140,20 +337,48 @@ class OllamaProvider(LLMProvider):
         Returns:
             List of message dicts in Ollama format
         """
-        ollama_messages = []
-        for msg in messages:
-            # Soportar tanto objetos LLMMessage como dicts simples
-            if isinstance(msg, dict):
-                ollama_messages.append({
-                    "role": msg.get("role"),
-                    "content": msg.get("content")
-                })
-            else:
-                ollama_messages.append({
-                    "role": msg.role.value,  # "system", "user", or "assistant"
-                    "content": msg.content
-                })
-        return ollama_messages
+        if not messages:
+            return []
+        # Fast path: listas homogéneas (el caso normal) sin isinstance por mensaje
+        try:
+            if isinstance(messages[0], dict):
+                return [{"role": m["role"], "content": m["content"]} for m in messages]
+            return [{"role": m.role.value, "content": m.content} for m in messages]
+        except (AttributeError, KeyError, TypeError):
+            # Lista mixta LLMMessage/dict (o dicts incompletos)
+            return [self._convert_message(msg) for msg in messages]
+
+    @staticmethod
+    def _convert_message(msg) -> Dict[str, str]:
+        # Soportar tanto objetos LLMMessage como dicts simples
+        if isinstance(msg, dict):
+            return {"role": msg.get("role"), "content": msg.get("content")}
+        return {"role": msg.role.value, "content": msg.content}
+
+    def _build_payload(
+        self,
+        messages: List[LLMMessage],
+        temperature: float,
+        max_tokens: Optional[int],
+        stream: bool,
+        options: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Arma el payload de /api/chat a partir del template precalculado.
+
+        `options` solo se copia si la llamada cambia algo respecto del template
+        (temperature, num_predict u opciones extra de Ollama).
+        """
+        payload = {**self._base_payload, "messages": self._convert_messages_to_ollama_format(messages)}
+        if stream:
+            payload["stream"] = True
+        if temperature != self.temperature or max_tokens is not None or options:
+            call_options = {**self._base_payload["options"], "temperature": temperature}
+            if max_tokens is not None:
+                call_options["num_predict"] = max_tokens
+            call_options.update(options)
+            payload["options"] = call_options
+        return payload
 
     async def generate(
         self,
@@ -190,6 +415,122 @@ class OllamaProvider(LLMProvider):
         else:
             return await self._execute_ollama_call(messages, temp, max_tokens, **kwargs)
 
+    async def generate_many(
+        self,
+        batches: List[List[LLMMessage]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate one completion per conversation, concurrently
+
+        Fans out generate() calls with asyncio.gather, bounded by a semaphore,
+        so round-trips overlap instead of running back to back. Ollama only
+        decodes requests in parallel up to OLLAMA_NUM_PARALLEL per loaded model
+        (server env var); extra requests queue server-side, so keep
+        max_concurrency close to that value.
+
+        Args:
+            batches: List of conversations (each a list of messages)
+            temperature: Sampling temperature (overrides config default)
+            max_tokens: Maximum tokens per response
+            max_concurrency: In-flight request cap (default: self.max_concurrency)
+            **kwargs: Additional Ollama-specific parameters
+
+        Returns:
+            LLMResponse list in the same order as `batches`
+
+        Raises:
+            The first exception raised by any generate() call
+        """
+        sem = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def _single_request(messages: List[LLMMessage]) -> LLMResponse:
+            async with sem:
+                return await self.generate(messages, temperature, max_tokens, **kwargs)
+
+        return list(await asyncio.gather(*[_single_request(batch) for batch in batches]))
+
+    async def generate_chain(
+        self,
+        steps: List[Callable[[List[LLMResponse]], List[LLMMessage]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Run dependent generations where each step's prompt derives from prior outputs
+
+        Each step is a callable that receives the responses produced so far
+        and returns the messages for its own call. Steps run back to back on
+        the shared keep-alive connection (no reconnect between steps); Ollama
+        has no server-side chaining, so each step still costs one round-trip.
+
+        Example:
+            >>> responses = await provider.generate_chain([
+            ...     lambda prev: [LLMMessage(LLMRole.USER, code_review_prompt)],
+            ...     lambda prev: [LLMMessage(LLMRole.USER, f"Summarize: {prev[0].content}")],
+            ... ])
+
+        Returns:
+            One LLMResponse per step, in order
+        """
+        responses: List[LLMResponse] = []
+        for step in steps:
+            responses.append(
+                await self.generate(step(responses), temperature, max_tokens, **kwargs)
+            )
+        return responses
+
+    async def embed(self, inputs: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Compute embeddings with Ollama's batched /api/embed endpoint
+
+        Inputs are sent in slices of `embed_batch_size` (one request per
+        slice instead of one per text); slices run concurrently up to
+        `max_concurrency`.
+
+        Args:
+            inputs: Texts to embed
+            model: Embedding model (default: self.model)
+
+        Returns:
+            One embedding vector per input, in input order
+
+        Raises:
+            httpx.HTTPStatusError: If Ollama returns an error status
+            ValueError: If the response has a different number of embeddings
+        """
+        if not inputs:
+            return []
+
+        client = self._get_client()
+        model = model or self.model
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        async def _embed_slice(texts: List[str]) -> List[List[float]]:
+            async with sem:
+                response = await client.post(
+                    self.embed_endpoint,
+                    content=_json_dumps({"model": model, "input": texts}),
+                    headers=_JSON_HEADERS,
+                )
+            response.raise_for_status()
+            embeddings = _json_loads(response.content).get("embeddings", [])
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Ollama returned {len(embeddings)} embeddings for {len(texts)} inputs"
+                )
+            return embeddings
+
+        size = self.embed_batch_size
+        slices = await asyncio.gather(*[
+            _embed_slice(inputs[start:start + size]) for start in range(0, len(inputs), size)
+        ])
+        return [embedding for chunk in slices for embedding in chunk]
+
     async def _execute_ollama_call(
         self,
         messages: List[LLMMessage],
@@ -217,26 +558,10 @@ class OllamaProvider(LLMProvider):
         """
         client = self._get_client()
 
-        # Convert messages to Ollama format
-        ollama_messages = self._convert_messages_to_ollama_format(messages)
-
-        # Build request payload
-        payload = {
-            "model": self.model,
-            "messages": ollama_messages,
-            "stream": False,  # Non-streaming mode
-            "options": {
-                "temperature": temperature,
-            }
-        }
-
-        # Add num_predict if max_tokens is specified
-        if max_tokens is not None:
-            payload["options"]["num_predict"] = max_tokens
-
-        # Add any additional Ollama-specific options
-        if kwargs:
-            payload["options"].update(kwargs)
+        # Build request payload (non-streaming mode). No se reutiliza el path de
+        # streaming: con "stream": true Ollama manda un objeto JSON por token,
+        # más bytes y más parseos que un único body que orjson lee sin decode.
+        payload = self._build_payload(messages, temperature, max_tokens, False, kwargs)
 
         # Retry loop with exponential backoff
         last_exception = None
@@ -245,15 +570,20 @@ class OllamaProvider(LLMProvider):
                 # Make API request
                 response = await client.post(
                     self.chat_endpoint,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
+                    content=_json_dumps(payload),
+                    headers=_JSON_HEADERS
                 )
 
                 # Check for HTTP errors
                 response.raise_for_status()
 
                 # Parse response
-                data = response.json()
+                try:
+                    data = _json_loads(response.content)
+                except JSON_DECODE_ERRORS as e:
+                    raise ValueError(
+                        f"Invalid response format from Ollama: {response.text[:200]}"
+                    ) from e
 
                 # Extract generated content
                 content = data.get("message", {}).get("content", "")
@@ -307,17 +637,18 @@ class OllamaProvider(LLMProvider):
                 if should_retry and not is_last_attempt:
                     # Calculate backoff delay (exponential)
                     delay = self.retry_delay * (self.retry_backoff ** attempt)
-                    logger.warning(
-                        f"Ollama {error_type} error (attempt {attempt + 1}/{self.max_retries}). "
-                        f"Retrying in {delay:.1f}s...",
-                        extra={
-                            "model": self.model,
-                            "attempt": attempt + 1,
-                            "max_retries": self.max_retries,
-                            "delay": delay,
-                            "error": str(e)
-                        }
-                    )
+                    if logger.isEnabledFor(logging.WARNING):
+                        logger.warning(
+                            "Ollama %s error (attempt %d/%d). Retrying in %.1fs...",
+                            error_type, attempt + 1, self.max_retries, delay,
+                            extra={
+                                "model": self.model,
+                                "attempt": attempt + 1,
+                                "max_retries": self.max_retries,
+                                "delay": delay,
+                                "error": str(e)
+                            }
+                        )
                     await asyncio.sleep(delay)
                     continue  # Retry
                 else:
@@ -389,44 +720,31 @@ class OllamaProvider(LLMProvider):
 
         client = self._get_client()
 
-        # Convert messages to Ollama format
-        ollama_messages = self._convert_messages_to_ollama_format(messages)
-
-        # Build request payload
-        payload = {
-            "model": self.model,
-            "messages": ollama_messages,
-            "stream": True,  # Enable streaming mode
-            "options": {
-                "temperature": temp,
-            }
-        }
-
-        # Add num_predict if max_tokens is specified
-        if max_tokens is not None:
-            payload["options"]["num_predict"] = max_tokens
-
-        # Add any additional Ollama-specific options
-        if kwargs:
-            payload["options"].update(kwargs)
+        # Build request payload (streaming mode)
+        payload = self._build_payload(messages, temp, max_tokens, True, kwargs)
 
         try:
             # Make streaming API request
             async with client.stream(
                 "POST",
                 self.chat_endpoint,
-                json=payload,
-                headers={"Content-Type": "application/json"}
+                content=_json_dumps(payload),
+                headers=_JSON_HEADERS
             ) as response:
                 response.raise_for_status()
 
-                # Stream response line by line
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-
-                    try:
-                        data = json.loads(line)
+                # NDJSON sobre bytes: sin decode a str ni splitlines por chunk.
+                # Sin chunk_size: httpx entrega cada chunk apenas llega (con
+                # chunk_size acumularía bytes y retrasaría los tokens).
+                buf = bytearray()
+                async for raw in response.aiter_bytes():
+                    buf += raw
+                    while (newline := buf.find(b"\n")) != -1:
+                        line = bytes(buf[:newline])
+                        del buf[:newline + 1]
+                        data = self._parse_stream_line(line)
+                        if data is None:
+                            continue
 
                         # Extract content chunk
                         chunk = data.get("message", {}).get("content", "")
@@ -435,11 +753,14 @@ class OllamaProvider(LLMProvider):
 
                         # Check if stream is done
                         if data.get("done", False):
-                            break
+                            return
 
-                    except json.JSONDecodeError:
-                        logger.warning(f"Failed to parse streaming chunk: {line}")
-                        continue
+                # Última línea sin newline final
+                data = self._parse_stream_line(bytes(buf))
+                if data is not None:
+                    chunk = data.get("message", {}).get("content", "")
+                    if chunk:
+                        yield chunk
 
         except httpx.ConnectError as e:
             logger.error(f"Failed to connect to Ollama server: {str(e)}")
@@ -454,48 +775,111 @@ class OllamaProvider(LLMProvider):
                 f"❌ Ollama API error ({e.response.status_code}): {e.response.text}"
             ) from e
 
+    @staticmethod
+    def _parse_stream_line(line: bytes) -> Optional[Dict[str, Any]]:
+        """Parsea una línea NDJSON del stream (None si está vacía o es inválida)"""
+        if not line.strip():
+            return None
+        try:
+            return _json_loads(line)
+        except JSON_DECODE_ERRORS:
+            logger.warning("Failed to parse streaming chunk: %r", line[:200])
+            return None
+
     def count_tokens(self, text: str) -> int:
         """
-        Estimate token count for text
+        Count tokens for text
 
         Note: Ollama doesn't provide a direct token counting API.
-        This is a rough approximation using character count.
-
-        For accurate token counting, consider using the model's tokenizer directly.
+        Uses the configured tokenizer (config "tokenizer") when the optional
+        'tokenizers' package is installed: a local tokenizer.json is loaded on
+        first use, a HuggingFace repo only once warmup() has downloaded it.
+        Otherwise a rough character-based approximation.
 
         Args:
             text: Input text
 
         Returns:
-            Estimated number of tokens (roughly 1 token per 4 characters)
+            Number of tokens (estimate: roughly 1 token per 4 characters)
         """
+        source = self._tokenizer_source
+        if source:
+            # Nunca descargar acá: count_tokens se llama desde código async
+            tokenizer = (
+                _load_tokenizer(source) if _is_local_tokenizer(source) else _TOKENIZERS.get(source)
+            )
+            if tokenizer is not None:
+                return _count_tokens_cached(source, text)
+
         # Rough approximation: 1 token ≈ 4 characters for English text
         # This varies by model and language
         return len(text) // 4
 
-    async def is_model_available(self) -> bool:
+    async def warmup(self) -> bool:
         """
-        Check if the specified model is available in Ollama
+        Load the model into Ollama's memory so the first generate() is not a cold start
+
+        Sends a chat request with no messages, which Ollama answers by loading
+        the model without generating tokens. Also loads the configured
+        tokenizer in a worker thread. Call it at startup; failures are logged,
+        not raised.
 
         Returns:
-            True if model is available, False otherwise
+            True if the model is loaded
         """
-        client = self._get_client()
+        if self._tokenizer_source:
+            await asyncio.to_thread(_load_tokenizer, self._tokenizer_source)
 
         try:
-            # Get list of available models
-            response = await client.get(f"{self.base_url}/api/tags")
+            response = await self._get_client().post(
+                self.chat_endpoint,
+                content=_json_dumps({"model": self.model, "messages": [], "keep_alive": self.keep_alive}),
+                headers=_JSON_HEADERS,
+            )
             response.raise_for_status()
+        except Exception as e:
+            logger.warning("Ollama warm-up failed for %s (non-critical): %s", self.model, e)
+            return False
 
-            data = response.json()
-            models = data.get("models", [])
+        logger.info("Ollama model %s loaded", self.model)
+        return True
 
-            # Check if our model is in the list
-            for model in models:
-                if model.get("name", "").startswith(self.model):
-                    return True
+    async def _get_tags(self) -> List[str]:
+        """
+        Model names from /api/tags, cached for `tags_cache_ttl` seconds
 
-            return False
+        Concurrent callers share a single in-flight fetch (single-flight via
+        asyncio.Lock). Failures are not cached: the exception propagates and
+        the next call retries.
+        """
+        cached = self._tags_cache
+        if cached is not None and time.monotonic() - cached[0] < self._tags_ttl:
+            return cached[1]
+
+        async with self._tags_lock:
+            # Otro caller pudo haber refrescado el cache mientras esperábamos
+            cached = self._tags_cache
+            if cached is not None and time.monotonic() - cached[0] < self._tags_ttl:
+                return cached[1]
+
+            response = await self._get_client().get(f"{self.base_url}/api/tags")
+            response.raise_for_status()
+
+            models = response.json().get("models", [])
+            names = [model.get("name", "") for model in models if model.get("name")]
+            self._tags_cache = (time.monotonic(), names)
+            return names
+
+    async def is_model_available(self) -> bool:
+        """
+        Check if the specified model is available in Ollama
+
+        Returns:
+            True if model is available, False otherwise
+        """
+        try:
+            # Check if our model is in the list
+            return any(name.startswith(self.model) for name in await self._get_tags())
 
         except Exception as e:
             logger.warning(f"Failed to check model availability: {str(e)}")
@@ -513,23 +897,9 @@ class OllamaProvider(LLMProvider):
             >>> print(models)
             ['llama2:latest', 'mistral:7b', 'codellama:13b']
         """
-        client = self._get_client()
-
         try:
-            response = await client.get(f"{self.base_url}/api/tags")
-            response.raise_for_status()
-
-            data = response.json()
-            models = data.get("models", [])
-
-            return [model.get("name", "") for model in models if model.get("name")]
+            return list(await self._get_tags())
 
         except Exception as e:
             logger.error(f"Failed to list models: {str(e)}")
             return []
-
-    def __del__(self):
-        """Cleanup when provider is destroyed"""
-        # Note: __del__ cannot be async, so we just log if client is still open
-        if self._client is not None:
-            logger.warning("OllamaProvider destroyed with open HTTP client. Call _close_client() explicitly.")
@@ -1,10 +1,12 @@
 """
 Modelos para el sistema de Análisis de Riesgo (AR-IA)
 """
-from datetime import datetime
+import time
+from collections import Counter
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class RiskType(str, Enum):
@@ -54,6 +56,10 @@ class RiskDimension(str, Enum):
     GOVERNANCE = "governance"  # Riesgos de gobernanza (RG)
 
 
+def _epoch_to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
 class Risk(BaseModel):
     """
     Representa un riesgo detectado por el AR-IA
@@ -64,7 +70,7 @@ class Risk(BaseModel):
     """
     id: str = Field(description="ID único del riesgo")
     session_id: str = Field(description="ID de la sesión (REQUERIDO para contexto)")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: float = Field(default_factory=time.time, description="Epoch (segundos, UTC)")
     student_id: str = Field(description="ID del estudiante")
     activity_id: str = Field(description="ID de la actividad")
 
@@ -76,15 +82,15 @@ class Risk(BaseModel):
     # Descripción
     description: str = Field(description="Descripción del riesgo detectado")
     impact: Optional[str] = Field(None, description="Impacto del riesgo")
-    evidence: List[str] = Field(default_factory=list, description="Evidencias del riesgo")
-    trace_ids: List[str] = Field(default_factory=list, description="IDs de trazas relacionadas")
+    evidence: Tuple[str, ...] = Field(default=(), description="Evidencias del riesgo")
+    trace_ids: Tuple[str, ...] = Field(default=(), description="IDs de trazas relacionadas")
 
     # Análisis
     root_cause: Optional[str] = Field(None, description="Causa raíz identificada")
     impact_assessment: Optional[str] = Field(None, description="Evaluación del impacto")
 
     # Recomendaciones
-    recommendations: List[str] = Field(default_factory=list, description="Recomendaciones")
+    recommendations: Tuple[str, ...] = Field(default=(), description="Recomendaciones")
     pedagogical_intervention: Optional[str] = Field(
         None,
         description="Intervención pedagógica sugerida"
@@ -97,8 +103,17 @@ class Risk(BaseModel):
     # Metadata
     detected_by: str = Field(default="AR-IA", description="Agente que detectó el riesgo")
 
-    class Config:
-        json_schema_extra = {
+    @property
+    def timestamp_iso(self) -> str:
+        """timestamp como ISO-8601 UTC (compatibilidad con el formato anterior)"""
+        return _epoch_to_iso(self.timestamp)
+
+    # Inmutable: un riesgo detectado no se edita (la resolución se registra en
+    # RiskDB); las secuencias son tuplas (aceptan listas al construir)
+    model_config = ConfigDict(
+        extra="forbid",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "id": "risk_001",
                 "student_id": "student_123",
@@ -112,7 +127,17 @@ class Risk(BaseModel):
                     "Pedir justificación de enfoque"
                 ]
             }
-        }
+        },
+    )
+
+
+# Contador de RiskReport que incrementa cada nivel
+_LEVEL_COUNTERS = {
+    RiskLevel.CRITICAL: "critical_risks",
+    RiskLevel.HIGH: "high_risks",
+    RiskLevel.MEDIUM: "medium_risks",
+    RiskLevel.LOW: "low_risks",
+}
 
 
 class RiskReport(BaseModel):
@@ -120,7 +145,7 @@ class RiskReport(BaseModel):
     Reporte agregado de riesgos para un estudiante/actividad
     """
     id: str = Field(description="ID del reporte")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: float = Field(default_factory=time.time, description="Epoch (segundos, UTC)")
     student_id: str = Field(description="ID del estudiante")
     activity_id: Optional[str] = Field(None, description="ID de actividad (opcional)")
 
@@ -148,23 +173,40 @@ class RiskReport(BaseModel):
     )
     trends: Dict[str, Any] = Field(default_factory=dict, description="Tendencias observadas")
 
+    @property
+    def timestamp_iso(self) -> str:
+        """timestamp como ISO-8601 UTC (compatibilidad con el formato anterior)"""
+        return _epoch_to_iso(self.timestamp)
+
     def add_risk(self, risk: Risk) -> None:
         """Añade un riesgo al reporte"""
         self.risks.append(risk)
         self.total_risks += 1
 
-        # Actualizar contadores por nivel
-        if risk.risk_level == RiskLevel.CRITICAL:
-            self.critical_risks += 1
-        elif risk.risk_level == RiskLevel.HIGH:
-            self.high_risks += 1
-        elif risk.risk_level == RiskLevel.MEDIUM:
-            self.medium_risks += 1
-        elif risk.risk_level == RiskLevel.LOW:
-            self.low_risks += 1
+        # Actualizar contadores por nivel (INFO no tiene contador)
+        level_attr = _LEVEL_COUNTERS.get(risk.risk_level)
+        if level_attr is not None:
+            setattr(self, level_attr, getattr(self, level_attr) + 1)
 
         # Actualizar distribución por tipo
         risk_type_str = risk.risk_type.value
         self.risk_distribution[risk_type_str] = (
             self.risk_distribution.get(risk_type_str, 0) + 1
-        )
\ No newline at end of file
+        )
+
+    def add_risks(self, risks: List[Risk]) -> None:
+        """Añade varios riesgos al reporte (conteos con Counter, un solo merge)"""
+        if not risks:
+            return
+        self.risks.extend(risks)
+        self.total_risks += len(risks)
+
+        for level, count in Counter(risk.risk_level for risk in risks).items():
+            level_attr = _LEVEL_COUNTERS.get(level)
+            if level_attr is not None:
+                setattr(self, level_attr, getattr(self, level_attr) + count)
+
+        for risk_type_str, count in Counter(risk.risk_type.value for risk in risks).items():
+            self.risk_distribution[risk_type_str] = (
+                self.risk_distribution.get(risk_type_str, 0) + count
+            )
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.sql import func
-from backend.database.base import Base
 from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import String, DateTime, Integer, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from backend.database.base import Base, _utc_now, new_uuid7_str
 import enum
-import uuid
 
 class UserRole(str, enum.Enum):
     STUDENT = "student"
@@ -15,19 +16,23 @@ class User(Base):
     __tablename__ = "users"
     __table_args__ = {'extend_existing': True}
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    email = Column(String(255), unique=True, nullable=False, index=True)
-    username = Column(String(100), unique=True, nullable=False, index=True)
-    hashed_password = Column(String(255), nullable=False)
-    full_name = Column(String(255), nullable=True)
-    student_id = Column(String(100), nullable=True)
-    roles = Column(JSONB, default=lambda: ["student"], nullable=False)
-    is_active = Column(Boolean, default=True, nullable=False)
-    is_verified = Column(Boolean, default=False, nullable=False)
-    last_login = Column(DateTime(timezone=False), nullable=True)
-    login_count = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=False), default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime(timezone=False), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Mismo default que UserDB (UUIDv7): ambos mapeos comparten users.id y un
+    # id aleatorio (uuid4) dispersaría los inserts por todo el índice de la PK
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=new_uuid7_str)
+    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    username: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
+    hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
+    full_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    student_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    roles: Mapped[List[str]] = mapped_column(JSONB, default=lambda: ["student"], nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    login_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=_utc_now, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=_utc_now, onupdate=_utc_now, nullable=False
+    )
 
     def __repr__(self):
         role = self.roles[0] if self.roles and len(self.roles) > 0 else "no-role"
@@ -19,7 +19,6 @@ import logging
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional, Dict, Any
-from uuid import uuid4
 import json
 
 from sqlalchemy.orm import Session
@@ -16,7 +16,6 @@ Audiencia: Coordinadores, administradores, docentes
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
-from uuid import uuid4
 
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
@@ -42,4 +42,141 @@ CREATE INDEX IF NOT EXISTS idx_student_created_eval ON evaluations (student_id,
 -- =============================================================================
 
 CREATE INDEX IF NOT EXISTS idx_student_activity_seq ON trace_sequences (student_id, activity_id);
-CREATE INDEX IF NOT EXISTS idx_student_start ON trace_sequences (student_id, start_time);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_student_start ON trace_sequences (student_id, start_time);
+
+-- =============================================================================
+-- Índices para ActivityDB (get_all / get_by_teacher ORDER BY created_at DESC)
+-- =============================================================================
+
+DROP INDEX IF EXISTS idx_activity_teacher_status;
+CREATE INDEX IF NOT EXISTS idx_activity_teacher_status_created ON activities (teacher_id, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_teacher_created ON activities (teacher_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_status_subject_diff_created ON activities (status, subject, difficulty, created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_active_created ON activities (created_at) WHERE status = 'active';
+
+-- =============================================================================
+-- Índices para UserDB
+-- =============================================================================
+
+-- Lookup case-insensitive por email (falla si hay emails duplicados que solo
+-- difieren en mayúsculas: normalizarlos antes con UPDATE users SET email = lower(email))
+CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower ON users (lower(email));
+
+-- (email, is_active) / (username, is_active) no los usa ninguna query: los
+-- lookups de login no filtran por is_active y email/username ya son únicos
+DROP INDEX IF EXISTS idx_email_active;
+DROP INDEX IF EXISTS idx_username_active;
+CREATE INDEX IF NOT EXISTS ix_users_last_login ON users (last_login) WHERE last_login IS NOT NULL;
+
+-- =============================================================================
+-- Índices para GitTraceDB / CourseReportDB / RemediationPlanDB / RiskAlertDB
+-- (columna de ORDER BY al final: lectura en orden de índice, sin sort)
+-- =============================================================================
+
+DROP INDEX IF EXISTS idx_git_student_activity;
+CREATE INDEX IF NOT EXISTS idx_git_student_activity_timestamp ON git_traces (student_id, activity_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_report_course_period ON course_reports (course_id, period_start);
+
+DROP INDEX IF EXISTS idx_plan_student_status;
+CREATE INDEX IF NOT EXISTS idx_plan_student_status_start ON remediation_plans (student_id, status, start_date);
+CREATE INDEX IF NOT EXISTS idx_plan_student_start ON remediation_plans (student_id, start_date);
+
+DROP INDEX IF EXISTS idx_alert_status_severity;
+DROP INDEX IF EXISTS idx_alert_student_status;
+DROP INDEX IF EXISTS idx_alert_assigned_status;
+CREATE INDEX IF NOT EXISTS idx_alert_severity_status_detected ON risk_alerts (severity, status, detected_at);
+CREATE INDEX IF NOT EXISTS idx_alert_student_detected ON risk_alerts (student_id, detected_at);
+CREATE INDEX IF NOT EXISTS idx_alert_student_status_detected ON risk_alerts (student_id, status, detected_at);
+CREATE INDEX IF NOT EXISTS idx_alert_course_status_detected ON risk_alerts (course_id, status, detected_at);
+CREATE INDEX IF NOT EXISTS idx_alert_assigned_detected ON risk_alerts (assigned_to, detected_at);
+CREATE INDEX IF NOT EXISTS idx_alert_assigned_status_detected ON risk_alerts (assigned_to, status, detected_at);
+
+-- =============================================================================
+-- Arrays JSON filtrables -> JSONB + GIN (containment @> por índice)
+-- (users.roles, git_traces.detected_patterns / files_changed,
+--  course_reports.at_risk_students, remediation_plans.trigger_risks,
+--  risk_alerts.evidence)
+-- Solo columnas con un filtro _json_array_contains en los repositorios: cada
+-- GIN se mantiene en cada INSERT/UPDATE de la fila. Las columnas JSON que
+-- solo se leen enteras (simulated_metrics, evaluation, evaluation_breakdown)
+-- no llevan GIN.
+-- =============================================================================
+
+-- users.roles: los chequeos de rol por query (UserRepository.get_by_role,
+-- add_role/remove_role atómicos) usan roles @> '["rol"]' sobre este GIN.
+-- Se mantiene JSONB (no text[]): SQLite dev/tests usa la misma columna JSON
+-- y add_role/remove_role dependen de los operadores || y - de jsonb.
+UPDATE users SET roles = '[]' WHERE roles IS NULL;
+ALTER TABLE users
+    ALTER COLUMN roles TYPE jsonb USING roles::jsonb,
+    ALTER COLUMN roles SET NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_roles ON users USING gin (roles jsonb_path_ops);
+
+UPDATE git_traces SET detected_patterns = '[]' WHERE detected_patterns IS NULL;
+UPDATE git_traces SET files_changed = '[]' WHERE files_changed IS NULL;
+ALTER TABLE git_traces
+    ALTER COLUMN detected_patterns TYPE jsonb USING detected_patterns::jsonb,
+    ALTER COLUMN detected_patterns SET DEFAULT '[]',
+    ALTER COLUMN detected_patterns SET NOT NULL,
+    ALTER COLUMN files_changed TYPE jsonb USING files_changed::jsonb,
+    ALTER COLUMN files_changed SET DEFAULT '[]',
+    ALTER COLUMN files_changed SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_git_traces_patterns_gin ON git_traces USING gin (detected_patterns jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_git_traces_files_gin ON git_traces USING gin (files_changed jsonb_path_ops);
+
+UPDATE course_reports SET at_risk_students = '[]' WHERE at_risk_students IS NULL;
+ALTER TABLE course_reports
+    ALTER COLUMN at_risk_students TYPE jsonb USING at_risk_students::jsonb,
+    ALTER COLUMN at_risk_students SET DEFAULT '[]',
+    ALTER COLUMN at_risk_students SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_report_at_risk_students_gin ON course_reports USING gin (at_risk_students jsonb_path_ops);
+
+UPDATE remediation_plans SET trigger_risks = '[]' WHERE trigger_risks IS NULL;
+ALTER TABLE remediation_plans
+    ALTER COLUMN trigger_risks TYPE jsonb USING trigger_risks::jsonb,
+    ALTER COLUMN trigger_risks SET DEFAULT '[]',
+    ALTER COLUMN trigger_risks SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_plan_trigger_risks_gin ON remediation_plans USING gin (trigger_risks jsonb_path_ops);
+
+UPDATE risk_alerts SET evidence = '[]' WHERE evidence IS NULL;
+ALTER TABLE risk_alerts
+    ALTER COLUMN evidence TYPE jsonb USING evidence::jsonb,
+    ALTER COLUMN evidence SET DEFAULT '[]',
+    ALTER COLUMN evidence SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_alert_evidence_gin ON risk_alerts USING gin (evidence jsonb_path_ops);
+
+-- =============================================================================
+-- Historiales de entrevistas / incidentes
+-- questions_asked, responses y diagnosis_process pasaron a tablas hijas
+-- (interview_questions, interview_responses, incident_diagnosis_steps):
+-- python -m backend.database.migrations.split_simulator_histories
+-- =============================================================================
+
+-- =============================================================================
+-- Historial por estudiante / usuario LTI (ORDER BY created_at DESC, id DESC)
+-- El id completa la clave del cursor keyset: la página sale del índice sin sort
+-- =============================================================================
+
+DROP INDEX IF EXISTS idx_interview_student_created;
+CREATE INDEX IF NOT EXISTS idx_interview_student_created ON interview_sessions (student_id, created_at, id);
+DROP INDEX IF EXISTS idx_incident_student_created;
+CREATE INDEX IF NOT EXISTS idx_incident_student_created ON incident_simulations (student_id, created_at, id);
+DROP INDEX IF EXISTS idx_lti_session_user;
+CREATE INDEX IF NOT EXISTS idx_lti_session_user_created ON lti_sessions (lti_user_id, created_at, id);
+
+-- =============================================================================
+-- Deployments LTI activos: índice parcial (solo filas is_active)
+-- =============================================================================
+
+DROP INDEX IF EXISTS idx_lti_deployment_active;
+CREATE INDEX IF NOT EXISTS idx_lti_deployment_active ON lti_deployments (platform_name) WHERE is_active = true;
+
+-- =============================================================================
+-- Launches LTI idempotentes: UNIQUE (deployment_id, sha256(launch_token))
+-- Las filas existentes quedan con hash NULL (no colisionan): solo los launches
+-- nuevos se deduplican, sin tener que limpiar duplicados históricos.
+-- =============================================================================
+
+ALTER TABLE lti_sessions ADD COLUMN IF NOT EXISTS launch_token_hash VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_lti_session_launch ON lti_sessions (deployment_id, launch_token_hash);
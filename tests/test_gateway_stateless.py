@@ -286,6 +286,48 @@ def test_risks_persisted_to_db_not_memory(gateway_with_repos, repositories, test
     # (This depends on implementation, not critical for stateless test)
 
 
+def test_persisted_trace_and_risk_ids_are_uuid7(gateway_with_repos, repositories, test_session, monkeypatch):
+    """Trazas y riesgos creados por el gateway se persisten con PK UUIDv7"""
+    from uuid import UUID
+    from backend.models.trace import InteractionType, TraceLevel
+    from backend.models.risk import RiskType, RiskLevel, RiskDimension
+
+    gateway = gateway_with_repos
+    session_id = test_session.id
+
+    # Sin métricas Prometheus: solo interesa lo que llega a la BD
+    monkeypatch.setattr("backend.core.ai_gateway._get_metrics", lambda: None)
+
+    trace = gateway._create_trace(
+        session_id=session_id,
+        student_id=test_session.student_id,
+        activity_id=test_session.activity_id,
+        interaction_type=InteractionType.STUDENT_PROMPT,
+        content="¿Qué es una cola?",
+        level=TraceLevel.N4_COGNITIVO,
+    )
+    gateway._persist_trace(trace)
+    gateway._persist_risk(
+        session_id=session_id,
+        student_id=test_session.student_id,
+        activity_id=test_session.activity_id,
+        risk_type=RiskType.COGNITIVE_DELEGATION,
+        risk_level=RiskLevel.HIGH,
+        dimension=RiskDimension.COGNITIVE,
+        description="Delegación total",
+        evidence=["Dame el código completo"],
+        trace_ids=[trace.id],
+    )
+
+    traces_in_db = repositories["trace_repo"].get_by_session(session_id)
+    risks_in_db = repositories["risk_repo"].get_by_session(session_id)
+
+    assert [t.id for t in traces_in_db] == [trace.id]
+    assert len(risks_in_db) == 1
+    for record in (*traces_in_db, *risks_in_db):
+        assert UUID(record.id).version == 7
+
+
 # ============================================================================
 # Idempotency and Side Effects Tests
 # ============================================================================
@@ -181,6 +181,29 @@ class TestRisk:
         assert RiskLevel.CRITICAL.value == "critical"
         assert RiskLevel.INFO.value == "info"
 
+    def test_risk_rejects_unknown_fields(self, sample_risk_delegacion):
+        """Test Risk forbids extra fields (typos fail loudly instead of being dropped)"""
+        data = sample_risk_delegacion.model_dump()
+        data["severity"] = "high"
+
+        with pytest.raises(ValueError):
+            Risk(**data)
+
+    def test_risk_is_immutable_with_tuple_sequences(self, sample_risk_delegacion):
+        """Test Risk is frozen and stores list inputs as tuples"""
+        assert isinstance(sample_risk_delegacion.recommendations, tuple)
+        assert isinstance(sample_risk_delegacion.evidence, tuple)
+
+        with pytest.raises(ValueError):
+            sample_risk_delegacion.resolved = True
+
+    def test_risk_timestamp_is_epoch_with_iso_accessor(self, sample_risk_delegacion):
+        """Test Risk.timestamp is a UTC epoch float and timestamp_iso renders it"""
+        risk = sample_risk_delegacion.model_copy(update={"timestamp": 0.0})
+
+        assert isinstance(sample_risk_delegacion.timestamp, float)
+        assert risk.timestamp_iso == "1970-01-01T00:00:00+00:00"
+
 
 @pytest.mark.unit
 @pytest.mark.models
@@ -206,6 +229,21 @@ class TestRiskReport:
         assert report.medium_risks == 1  # superficial is MEDIUM
         assert report.critical_risks == 0
 
+    def test_add_risks_matches_incremental_add_risk(self, sample_risk_delegacion, sample_risk_superficial):
+        """Test add_risks() produces the same counters as repeated add_risk()"""
+        risks = [sample_risk_delegacion, sample_risk_superficial, sample_risk_delegacion]
+        batched = RiskReport(id="batched", student_id="test_student")
+        incremental = RiskReport(id="incremental", student_id="test_student")
+
+        batched.add_risks(risks)
+        for risk in risks:
+            incremental.add_risk(risk)
+
+        assert batched.model_dump(exclude={"id", "timestamp"}) == \
+            incremental.model_dump(exclude={"id", "timestamp"})
+        assert batched.high_risks == 2
+        assert batched.risk_distribution[RiskType.COGNITIVE_DELEGATION.value] == 2
+
 
 # ============================================================================
 # Evaluation Tests
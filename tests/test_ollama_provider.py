@@ -12,14 +12,24 @@ Verifica:
 6. Integración con metrics (HIGH-01)
 """
 
+import json
+
 import pytest
 import httpx
 from unittest.mock import AsyncMock, MagicMock, patch
 from typing import List
 
+from backend.llm import ollama_provider
 from backend.llm.ollama_provider import OllamaProvider
 from backend.llm.base import LLMMessage, LLMResponse, LLMRole
 
+CHAT_URL = "http://localhost:11434/api/chat"
+
+
+def _ollama_response(payload: dict, status_code: int = 200) -> httpx.Response:
+    """Respuesta HTTP real (el provider parsea response.content)"""
+    return httpx.Response(status_code, json=payload, request=httpx.Request("POST", CHAT_URL))
+
 
 class TestOllamaProviderInitialization:
     """Tests de inicialización de OllamaProvider"""
@@ -57,11 +67,23 @@ class TestOllamaProviderInitialization:
         assert provider.base_url == "http://ollama:11434"
         assert not provider.base_url.endswith("/")
 
+    def test_init_logs_once_per_base_url_and_model(self, caplog):
+        """__init__() loguea la inicialización una sola vez por (base_url, model)"""
+        config = {"base_url": "http://log-once:11434", "model": "mistral"}
+
+        with caplog.at_level("INFO", logger="backend.llm.ollama_provider"):
+            OllamaProvider(config)
+            OllamaProvider(config)
+
+        assert caplog.messages.count("Ollama provider initialized") == 1
+
     def test_init_lazy_client_initialization(self):
         """__init__() no crea cliente HTTP inmediatamente (lazy)"""
-        provider = OllamaProvider()
+        provider = OllamaProvider({"base_url": "http://lazy-ollama:11434"})
 
-        assert provider._client is None
+        assert not any(
+            key[:2] == (provider.base_url, provider.timeout) for key in ollama_provider._CLIENTS
+        )
 
     def test_get_client_creates_httpx_client(self):
         """_get_client() crea cliente httpx.AsyncClient con timeout configurado"""
@@ -81,6 +103,113 @@ class TestOllamaProviderInitialization:
 
         assert client1 is client2
 
+    def test_get_client_shared_across_providers(self):
+        """Providers con el mismo (base_url, timeout) comparten el pool HTTP"""
+        llama = OllamaProvider({"model": "llama2"})
+        mistral = OllamaProvider({"model": "mistral"})
+        slow = OllamaProvider({"model": "llama2", "timeout": 300.0})
+
+        assert llama._get_client() is mistral._get_client()
+        assert llama._get_client() is not slow._get_client()
+
+    @pytest.mark.asyncio
+    async def test_close_shared_clients(self):
+        """close_shared_clients() cierra los pools y el próximo uso crea uno nuevo"""
+        provider = OllamaProvider()
+        client = provider._get_client()
+
+        await ollama_provider.close_shared_clients()
+
+        assert client.is_closed
+        assert provider._get_client() is not client
+
+    def test_shared_client_is_per_event_loop(self):
+        """
+        Dos asyncio.run() seguidos (como los agentes en threads) contra el mismo
+        host: el segundo no reutiliza conexiones del loop ya cerrado.
+        """
+        import asyncio
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        body = json.dumps({"message": {"content": "ok"}, "eval_count": 1}).encode()
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive: el pool guarda la conexión
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        messages = [LLMMessage(role=LLMRole.USER, content="hi")]
+
+        async def _call():
+            provider = OllamaProvider({"base_url": base_url})
+            response = await provider.generate(messages)
+            return response.content, provider._get_client()
+
+        try:
+            with patch.object(ollama_provider, "_get_metrics", return_value=None):
+                first, first_client = asyncio.run(_call())
+                second, second_client = asyncio.run(_call())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert first == second == "ok"
+        assert first_client is not second_client
+        # El cliente del primer loop (ya cerrado) se descartó al crear el segundo
+        assert first_client not in ollama_provider._CLIENTS.values()
+
+        # Los sockets de los loops cerrados se liberan recién con el GC
+        import gc
+        import warnings
+
+        asyncio.run(ollama_provider.close_shared_clients())
+        assert second_client not in ollama_provider._CLIENTS.values()
+        del first_client, second_client
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ResourceWarning)
+            gc.collect()
+
+    def test_provider_collected_without_finalizer(self):
+        """El provider no tiene __del__: se libera sin cerrar el pool compartido"""
+        import gc
+        import weakref
+
+        provider = OllamaProvider()
+        client = provider._get_client()
+        ref = weakref.ref(provider)
+
+        del provider
+        gc.collect()
+
+        assert not hasattr(OllamaProvider, "__del__")
+        assert ref() is None
+        assert not client.is_closed
+
+    def test_get_client_pool_limits_and_connect_timeout(self):
+        """_get_client() usa un pool amplio y connect timeout corto"""
+        provider = OllamaProvider({"timeout": 90.0})
+
+        client = provider._get_client()
+        pool = client._transport._pool
+
+        assert client.timeout.connect == 5.0
+        assert pool._max_connections == 64
+        assert pool._max_keepalive_connections == 32
+        assert pool._keepalive_expiry == 300.0
+
 
 class TestOllamaProviderMessageConversion:
     """Tests de conversión de mensajes a formato Ollama"""
@@ -130,6 +259,36 @@ class TestOllamaProviderMessageConversion:
         assert ollama_messages[2]["role"] == "assistant"
         assert ollama_messages[3]["role"] == "user"
 
+    def test_convert_messages_mixed_dicts_and_llm_messages(self):
+        """_convert_messages_to_ollama_format() soporta listas mixtas dict/LLMMessage"""
+        provider = OllamaProvider()
+        messages = [
+            {"role": "system", "content": "You are a tutor"},
+            LLMMessage(role=LLMRole.USER, content="Hi"),
+        ]
+
+        ollama_messages = provider._convert_messages_to_ollama_format(messages)
+
+        assert ollama_messages == [
+            {"role": "system", "content": "You are a tutor"},
+            {"role": "user", "content": "Hi"},
+        ]
+
+    def test_build_payload_reuses_template_options(self):
+        """_build_payload() solo copia options si la llamada las modifica"""
+        provider = OllamaProvider({"temperature": 0.3})
+        messages = [LLMMessage(role=LLMRole.USER, content="Hi")]
+
+        default = provider._build_payload(messages, 0.3, None, False, {})
+        custom = provider._build_payload(messages, 0.9, 100, True, {"top_p": 0.5})
+
+        assert default["options"] is provider._base_payload["options"]
+        assert default["stream"] is False
+        assert custom["stream"] is True
+        assert custom["options"] == {"temperature": 0.9, "num_predict": 100, "top_p": 0.5}
+        assert provider._base_payload["options"] == {"temperature": 0.3}
+        assert default["keep_alive"] == custom["keep_alive"] == "10m"
+
 
 class TestOllamaProviderGenerate:
     """Tests de generación de respuestas (método generate)"""
@@ -140,9 +299,7 @@ class TestOllamaProviderGenerate:
         provider = OllamaProvider()
 
         # Mock response de Ollama
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _ollama_response({
             "message": {"content": "This is a test response from Ollama"},
             "prompt_eval_count": 10,
             "eval_count": 20,
@@ -150,7 +307,7 @@ class TestOllamaProviderGenerate:
             "load_duration": 500000000,
             "prompt_eval_duration": 300000000,
             "eval_duration": 700000000,
-        }
+        })
 
         # Mock httpx.AsyncClient.post y _get_metrics para evitar importar API config
         with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post, \
@@ -167,18 +324,75 @@ class TestOllamaProviderGenerate:
             assert response.usage["completion_tokens"] == 20
             assert response.usage["total_tokens"] == 30
 
+    @pytest.mark.asyncio
+    async def test_generate_single_body_parsed_from_bytes(self):
+        """generate() pide un único body (stream=False) y lo parsea desde bytes"""
+        provider = OllamaProvider()
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({
+            "message": {"content": "Response"}, "prompt_eval_count": 5, "eval_count": 10,
+        }).encode()
+
+        with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = mock_response
+
+            response = await provider.generate([LLMMessage(role=LLMRole.USER, content="Test")])
+
+            assert response.content == "Response"
+            assert json.loads(mock_post.call_args.kwargs["content"])["stream"] is False
+            mock_response.json.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_generate_chain_feeds_previous_outputs(self):
+        """generate_chain() arma cada paso con las respuestas anteriores"""
+        provider = OllamaProvider()
+
+        async def fake_generate(messages, temperature=None, max_tokens=None, **kwargs):
+            return LLMResponse(content=messages[-1].content.upper(), model="llama2", usage={})
+
+        steps = [
+            lambda prev: [LLMMessage(role=LLMRole.USER, content="review")],
+            lambda prev: [LLMMessage(role=LLMRole.USER, content=f"summarize {prev[0].content}")],
+        ]
+        with patch.object(provider, "generate", side_effect=fake_generate):
+            responses = await provider.generate_chain(steps)
+
+        assert [r.content for r in responses] == ["REVIEW", "SUMMARIZE REVIEW"]
+
+    @pytest.mark.asyncio
+    async def test_generate_many_bounded_concurrency_keeps_order(self):
+        """generate_many() respeta max_concurrency y devuelve en el orden de entrada"""
+        import asyncio
+
+        provider = OllamaProvider({"max_concurrency": 3})
+        in_flight = 0
+        peak = 0
+
+        async def fake_generate(messages, temperature=None, max_tokens=None, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return LLMResponse(content=messages[0].content, model="llama2", usage={})
+
+        batches = [[LLMMessage(role=LLMRole.USER, content=str(i))] for i in range(10)]
+        with patch.object(provider, "generate", side_effect=fake_generate):
+            responses = await provider.generate_many(batches)
+
+        assert [r.content for r in responses] == [str(i) for i in range(10)]
+        assert peak == 3
+
     @pytest.mark.asyncio
     async def test_generate_with_custom_temperature(self):
         """generate() respeta parámetro temperature personalizado"""
         provider = OllamaProvider()
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _ollama_response({
             "message": {"content": "Response"},
             "prompt_eval_count": 5,
             "eval_count": 10,
-        }
+        })
 
         with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
             mock_post.return_value = mock_response
@@ -188,7 +402,7 @@ class TestOllamaProviderGenerate:
 
             # Verificar que se envió temperature=0.9 en payload
             call_args = mock_post.call_args
-            payload = call_args.kwargs["json"]
+            payload = json.loads(call_args.kwargs["content"])
             assert payload["options"]["temperature"] == 0.9
 
     @pytest.mark.asyncio
@@ -196,13 +410,11 @@ class TestOllamaProviderGenerate:
         """generate() incluye num_predict cuando se especifica max_tokens"""
         provider = OllamaProvider()
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _ollama_response({
             "message": {"content": "Response"},
             "prompt_eval_count": 5,
             "eval_count": 10,
-        }
+        })
 
         with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
             mock_post.return_value = mock_response
@@ -212,7 +424,7 @@ class TestOllamaProviderGenerate:
 
             # Verificar que se envió num_predict en payload
             call_args = mock_post.call_args
-            payload = call_args.kwargs["json"]
+            payload = json.loads(call_args.kwargs["content"])
             assert payload["options"]["num_predict"] == 500
 
     @pytest.mark.asyncio
@@ -283,11 +495,9 @@ class TestOllamaProviderGenerate:
         """generate() lanza ValueError si Ollama retorna respuesta vacía"""
         provider = OllamaProvider()
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = _ollama_response({
             "message": {"content": ""},  # Contenido vacío
-        }
+        })
 
         with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
             mock_post.return_value = mock_response
@@ -304,10 +514,9 @@ class TestOllamaProviderGenerate:
         """generate() lanza ValueError si respuesta de Ollama no es JSON válido"""
         provider = OllamaProvider()
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_response.text = "Not a valid JSON response"
+        mock_response = httpx.Response(
+            200, content=b"Not a valid JSON response", request=httpx.Request("POST", CHAT_URL)
+        )
 
         with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
             mock_post.return_value = mock_response
@@ -333,13 +542,13 @@ class TestOllamaProviderStreaming:
         mock_stream_context.__aenter__.return_value = mock_stream_context
         mock_stream_context.__aexit__.return_value = None
 
-        # Simular líneas de respuesta
-        async def mock_aiter_lines():
-            yield '{"message": {"content": "Hello"}, "done": false}'
-            yield '{"message": {"content": " world"}, "done": false}'
-            yield '{"message": {"content": "!"}, "done": true}'
+        # Simular chunks de bytes NDJSON (una línea partida entre dos chunks)
+        async def mock_aiter_bytes():
+            yield b'{"message": {"content": "Hello"}, "done": false}\n{"message": '
+            yield b'{"content": " world"}, "done": false}\n\n'
+            yield b'{"message": {"content": "!"}, "done": true}\n'
 
-        mock_stream_context.aiter_lines = mock_aiter_lines
+        mock_stream_context.aiter_bytes = mock_aiter_bytes
         mock_stream_context.raise_for_status = MagicMock()
 
         with patch.object(httpx.AsyncClient, 'stream', return_value=mock_stream_context):
@@ -351,6 +560,29 @@ class TestOllamaProviderStreaming:
 
             assert chunks == ["Hello", " world", "!"]
 
+    @pytest.mark.asyncio
+    async def test_generate_stream_trailing_line_without_newline(self):
+        """generate_stream() procesa la última línea aunque no termine en newline"""
+        provider = OllamaProvider()
+
+        mock_stream_context = AsyncMock()
+        mock_stream_context.__aenter__.return_value = mock_stream_context
+        mock_stream_context.__aexit__.return_value = None
+
+        async def mock_aiter_bytes():
+            yield b'{"message": {"content": "Hi"}, "done": false}\nnot json\n'
+            yield b'{"message": {"content": "!"}, "done": false}'
+
+        mock_stream_context.aiter_bytes = mock_aiter_bytes
+        mock_stream_context.raise_for_status = MagicMock()
+
+        with patch.object(httpx.AsyncClient, 'stream', return_value=mock_stream_context):
+            messages = [LLMMessage(role=LLMRole.USER, content="Test")]
+
+            chunks = [chunk async for chunk in provider.generate_stream(messages)]
+
+            assert chunks == ["Hi", "!"]
+
     @pytest.mark.asyncio
     async def test_generate_stream_connect_error(self):
         """generate_stream() lanza ValueError si no puede conectar"""
@@ -385,6 +617,45 @@ class TestOllamaProviderUtilities:
 
         assert provider.count_tokens("") == 0
 
+    def test_count_tokens_uses_local_tokenizer_file(self, tmp_path):
+        """count_tokens() carga un tokenizer.json local y cachea textos repetidos"""
+        path = str(tmp_path / "tokenizer.json")
+        open(path, "w").close()
+        provider = OllamaProvider({"model": "llama2:13b", "tokenizer": path})
+        tokenizer = MagicMock()
+        tokenizer.encode.return_value.ids = [1, 2, 3]
+        fake_cls = MagicMock()
+        fake_cls.from_file.return_value = tokenizer
+        ollama_provider._count_tokens_cached.cache_clear()
+
+        with patch.object(ollama_provider, "TOKENIZERS_AVAILABLE", True), \
+                patch.object(ollama_provider, "Tokenizer", fake_cls), \
+                patch.dict(ollama_provider._TOKENIZERS, clear=True):
+            assert provider.count_tokens("system prompt") == 3
+            assert provider.count_tokens("system prompt") == 3
+
+        fake_cls.from_file.assert_called_once_with(path)
+        fake_cls.from_pretrained.assert_not_called()
+        tokenizer.encode.assert_called_once_with("system prompt")
+        ollama_provider._count_tokens_cached.cache_clear()
+
+    def test_count_tokens_never_downloads_repo(self):
+        """Un repo de HuggingFace no se descarga en count_tokens (solo en warmup)"""
+        provider = OllamaProvider({"tokenizer": "org/some-tokenizer"})
+
+        with patch.object(ollama_provider, "_load_tokenizer") as load, \
+                patch.dict(ollama_provider._TOKENIZERS, clear=True):
+            assert provider.count_tokens("12345678") == 2
+
+        load.assert_not_called()
+
+    def test_count_tokens_without_config_uses_estimate(self):
+        """Sin config "tokenizer" no hay tokenizer por nombre de modelo"""
+        provider = OllamaProvider({"model": "mistral"})
+
+        assert provider._tokenizer_source is None
+        assert provider.count_tokens("12345678") == 2
+
     @pytest.mark.asyncio
     async def test_is_model_available_returns_true_when_found(self):
         """is_model_available() retorna True si modelo está disponible"""
@@ -464,6 +735,108 @@ class TestOllamaProviderUtilities:
 
             assert models == []
 
+    @pytest.mark.asyncio
+    async def test_warmup_loads_model_without_messages(self):
+        """warmup() envía un chat sin mensajes con keep_alive"""
+        provider = OllamaProvider({"model": "mistral", "keep_alive": "30m"})
+
+        with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = _ollama_response({"done": True})
+
+            assert await provider.warmup() is True
+
+            payload = json.loads(mock_post.call_args.kwargs["content"])
+            assert payload == {"model": "mistral", "messages": [], "keep_alive": "30m"}
+
+    @pytest.mark.asyncio
+    async def test_warmup_loads_tokenizer_off_the_event_loop(self):
+        """warmup() descarga el tokenizer configurado en un thread aparte"""
+        import threading
+
+        provider = OllamaProvider({"tokenizer": "org/some-tokenizer"})
+        threads = []
+
+        with patch.object(ollama_provider, "_load_tokenizer",
+                          side_effect=lambda source: threads.append(threading.current_thread())), \
+                patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = _ollama_response({"done": True})
+
+            assert await provider.warmup() is True
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
+
+    @pytest.mark.asyncio
+    async def test_warmup_failure_is_not_raised(self):
+        """warmup() devuelve False si Ollama no responde"""
+        provider = OllamaProvider()
+
+        with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.side_effect = httpx.ConnectError("Connection refused")
+
+            assert await provider.warmup() is False
+
+    @pytest.mark.asyncio
+    async def test_tags_cached_and_fetched_once_for_concurrent_callers(self):
+        """is_model_available()/list_available_models() comparten un único GET a /api/tags"""
+        import asyncio
+
+        provider = OllamaProvider({"model": "llama2"})
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"models": [{"name": "llama2:latest"}]}
+
+        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = mock_response
+
+            results = await asyncio.gather(
+                provider.is_model_available(),
+                provider.is_model_available(),
+                provider.list_available_models(),
+            )
+
+            assert results == [True, True, ["llama2:latest"]]
+            assert mock_get.call_count == 1
+
+            # Vencido el TTL se vuelve a consultar
+            provider._tags_ttl = 0
+            await provider.list_available_models()
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tags_errors_are_not_cached(self):
+        """Un fallo de /api/tags no queda cacheado"""
+        provider = OllamaProvider({"model": "llama2"})
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"models": [{"name": "llama2:latest"}]}
+
+        with patch.object(httpx.AsyncClient, 'get', new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = [httpx.ConnectError("Connection error"), mock_response]
+
+            assert await provider.is_model_available() is False
+            assert await provider.is_model_available() is True
+
+    @pytest.mark.asyncio
+    async def test_embed_batches_inputs_per_request(self):
+        """embed() envía los textos en lotes a /api/embed y preserva el orden"""
+        provider = OllamaProvider({"model": "nomic-embed-text", "embed_batch_size": 2})
+
+        def fake_post(url, content, headers):
+            texts = json.loads(content)["input"]
+            return _ollama_response({"embeddings": [[float(len(text))] for text in texts]})
+
+        with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.side_effect = fake_post
+
+            embeddings = await provider.embed(["a", "bb", "ccc"])
+
+        assert embeddings == [[1.0], [2.0], [3.0]]
+        assert mock_post.call_count == 2
+        url, = {call.args[0] for call in mock_post.call_args_list}
+        assert url == "http://localhost:11434/api/embed"
+        assert [json.loads(call.kwargs["content"])["input"] for call in mock_post.call_args_list] == [
+            ["a", "bb"], ["ccc"]
+        ]
+
 
 @pytest.mark.integration
 class TestOllamaProviderIntegration:
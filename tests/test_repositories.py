@@ -10,19 +10,30 @@ Verifica:
 """
 import pytest
 from datetime import datetime
-from uuid import uuid4
+from uuid import UUID, uuid4
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from backend.database.models import Base
+from backend.database.models import Base, GitTraceDB, LTIDeploymentDB
 from backend.database.repositories import (
     SessionRepository,
     TraceRepository,
     RiskRepository,
     EvaluationRepository,
     TraceSequenceRepository,
+    ActivityRepository,
+    UserRepository,
+    GitTraceRepository,
+    RemediationPlanRepository,
+    RiskAlertRepository,
+    InterviewSessionRepository,
+    IncidentSimulationRepository,
+    LTIDeploymentRepository,
+    LTISessionRepository,
+    GIT_TRACE_AUTHOR_COLUMNS,
 )
+from backend.database.transaction import unit_of_work
 from backend.models.trace import (
     CognitiveTrace,
     TraceLevel,
@@ -93,6 +104,18 @@ def sequence_repo(test_db):
     return TraceSequenceRepository(test_db)
 
 
+@pytest.fixture
+def activity_repo(test_db):
+    """ActivityRepository fixture"""
+    return ActivityRepository(test_db)
+
+
+@pytest.fixture
+def user_repo(test_db):
+    """UserRepository fixture"""
+    return UserRepository(test_db)
+
+
 # ============================================================================
 # SessionRepository Tests
 # ============================================================================
@@ -660,6 +683,1178 @@ def test_sequence_get_by_session(sequence_repo, session_repo):
     assert retrieved.session_id == session.id
 
 
+# ============================================================================
+# ActivityRepository Tests
+# ============================================================================
+
+def _create_activity(activity_repo, activity_id="prog2_tp1", teacher_id="teacher_001", **kwargs):
+    return activity_repo.create(
+        activity_id=activity_id,
+        title="Cola circular",
+        instructions="Implementar una cola circular",
+        teacher_id=teacher_id,
+        policies={"max_help_level": "MEDIO"},
+        **kwargs,
+    )
+
+
+def test_activity_create(activity_repo):
+    """Test creating an activity"""
+    activity = _create_activity(activity_repo)
+
+    assert activity.id is not None
+    assert activity.activity_id == "prog2_tp1"
+    assert activity.status == "draft"
+
+
+def test_activity_create_duplicate_raises(activity_repo):
+    """Duplicate activity_id is rejected by the UNIQUE constraint"""
+    _create_activity(activity_repo)
+
+    with pytest.raises(ValueError, match="already exists"):
+        _create_activity(activity_repo)
+
+    # La sesión sigue usable tras el rollback
+    assert activity_repo.get_by_activity_id("prog2_tp1") is not None
+
+
+def test_activity_publish_and_archive(activity_repo):
+    """publish/archive update the row in a single statement"""
+    _create_activity(activity_repo)
+
+    published = activity_repo.publish("prog2_tp1")
+    assert published.status == "active"
+    assert published.published_at is not None
+
+    archived = activity_repo.archive("prog2_tp1")
+    assert archived.status == "archived"
+
+    assert activity_repo.publish("missing") is None
+    assert activity_repo.delete("missing") is False
+    assert activity_repo.delete("prog2_tp1") is True
+
+
+def test_activity_update(activity_repo):
+    """update validates the whitelist and persists changed fields"""
+    _create_activity(activity_repo)
+
+    updated = activity_repo.update("prog2_tp1", title="Cola circular v2", difficulty="AVANZADO")
+    assert updated.title == "Cola circular v2"
+    assert activity_repo.get_by_activity_id("prog2_tp1").difficulty == "AVANZADO"
+
+    with pytest.raises(ValueError):
+        activity_repo.update("prog2_tp1", teacher_id="intruder")
+    with pytest.raises(ValueError):
+        activity_repo.update("prog2_tp1", difficulty="IMPOSIBLE")
+    assert activity_repo.update("missing", title="Nada") is None
+
+
+def test_activity_list_queries_stream(activity_repo):
+    """get_all/get_by_teacher return iterators ordered by created_at DESC"""
+    _create_activity(activity_repo, "act_1", teacher_id="t1")
+    _create_activity(activity_repo, "act_2", teacher_id="t1")
+    _create_activity(activity_repo, "act_3", teacher_id="t2")
+    activity_repo.publish("act_2")
+
+    by_teacher = activity_repo.get_by_teacher("t1")
+    assert not isinstance(by_teacher, list)
+    assert sorted(a.activity_id for a in by_teacher) == ["act_1", "act_2"]
+    assert [a.activity_id for a in activity_repo.get_by_teacher("t1", status="active")] == ["act_2"]
+    assert len(list(activity_repo.get_all(limit=2))) == 2
+
+
+def test_activity_list_rows_projects_columns(activity_repo, test_db):
+    """list_rows returns plain row mappings (no ORM instances) plus a SQL count"""
+    _create_activity(activity_repo, "act_1", teacher_id="t1")
+    _create_activity(activity_repo, "act_2", teacher_id="t1")
+    _create_activity(activity_repo, "act_3", teacher_id="t2")
+    test_db.expunge_all()
+
+    rows = activity_repo.list_rows(teacher_id="t1", limit=1)
+
+    assert activity_repo.count(teacher_id="t1") == 2
+    assert len(rows) == 1
+    assert rows[0]["teacher_id"] == "t1"
+    assert "instructions" in rows[0]
+    assert len(test_db.identity_map) == 0
+
+
+# ============================================================================
+# UserRepository Tests
+# ============================================================================
+
+def _create_user(user_repo, username, roles=None):
+    return user_repo.create(
+        email=f"{username}@example.com",
+        username=username,
+        hashed_password="hashed",
+        roles=roles,
+    )
+
+
+def test_user_get_by_email_case_insensitive(user_repo, test_db):
+    """get_by_email matches rows stored with any casing"""
+    from sqlalchemy import update
+    from backend.database.models import UserDB
+
+    user = _create_user(user_repo, "mallory")
+    # Simular una fila insertada sin normalizar (fuera del repositorio)
+    test_db.execute(update(UserDB).where(UserDB.id == user.id).values(email="Mallory@Example.com"))
+    test_db.commit()
+
+    assert user_repo.get_by_email("MALLORY@example.COM").id == user.id
+
+
+def test_user_get_by_role(user_repo):
+    """get_by_role filters by JSON role membership in SQL"""
+    _create_user(user_repo, "alice", ["student"])
+    _create_user(user_repo, "bob", ["student", "instructor"])
+    _create_user(user_repo, "carol", ["admin"])
+    # "instructor" como substring de otro rol no debe matchear
+    _create_user(user_repo, "dave", ["instructor_assistant"])
+
+    instructors = user_repo.get_by_role("instructor")
+    students = user_repo.get_by_role("student")
+
+    assert [u.username for u in instructors] == ["bob"]
+    assert sorted(u.username for u in students) == ["alice", "bob"]
+    assert user_repo.get_by_role("unknown") == []
+
+
+def test_user_list_queries_raise_on_lazy_load(user_repo, test_db):
+    """List queries use raiseload('*') unless relations are requested"""
+    from sqlalchemy.exc import InvalidRequestError
+
+    _create_user(user_repo, "henry", ["student"])
+    test_db.expunge_all()
+
+    users = user_repo.get_all()
+    with pytest.raises(InvalidRequestError):
+        users[0].sessions
+
+    test_db.expunge_all()
+    users = user_repo.get_by_role("student", load_relations=True)
+    assert users[0].sessions == []
+
+
+def test_user_update_last_login_increments_count(user_repo):
+    """update_last_login increments login_count server-side"""
+    user = _create_user(user_repo, "frank")
+
+    user_repo.update_last_login(user.id)
+    updated = user_repo.update_last_login(user.id)
+
+    assert updated.login_count == 2
+    assert updated.last_login is not None
+    assert user_repo.update_last_login("missing") is None
+
+
+def test_user_get_recently_active_orders_by_last_login(user_repo):
+    """get_recently_active skips users without logins, newest first"""
+    first = _create_user(user_repo, "ivan")
+    second = _create_user(user_repo, "judy")
+    _create_user(user_repo, "karl")
+
+    user_repo.update_last_login(first.id)
+    user_repo.update_last_login(second.id)
+
+    assert [u.username for u in user_repo.get_recently_active()] == ["judy", "ivan"]
+    assert [u.username for u in user_repo.get_recently_active(limit=1)] == ["judy"]
+
+
+def test_login_buffer_flush_coalesces_logins(user_repo, test_db):
+    """LoginActivityBuffer persists several logins with one batched UPDATE"""
+    from backend.database.login_buffer import LoginActivityBuffer
+
+    alice = _create_user(user_repo, "ivan")
+    bob = _create_user(user_repo, "judy")
+    buffer = LoginActivityBuffer()
+    last = datetime(2025, 1, 1, 12, 0, 0)
+    buffer.record(alice.id, datetime(2025, 1, 1, 10, 0, 0))
+    buffer.record(alice.id, last)
+    buffer.record(alice.id, datetime(2025, 1, 1, 11, 0, 0))
+    buffer.record(bob.id)
+
+    assert buffer.flush(test_db) == 2
+    assert buffer.pending_count() == 0
+
+    test_db.expire_all()
+    assert user_repo.get_by_id(alice.id).login_count == 3
+    assert user_repo.get_by_id(alice.id).last_login == last
+    assert user_repo.get_by_id(bob.id).login_count == 1
+    assert buffer.flush(test_db) == 0
+
+
+def test_login_buffer_default_timestamp_is_timezone_aware():
+    """record() without `when` uses an aware UTC timestamp (comparable with aware callers)"""
+    from datetime import timezone
+    from backend.database.login_buffer import LoginActivityBuffer
+
+    buffer = LoginActivityBuffer()
+    buffer.record("user-1")
+    buffer.record("user-1", datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+    count, last = buffer._drain()["user-1"]
+    assert count == 2
+    assert last.tzinfo is not None
+
+
+def test_user_lookup_cache_hit_skips_sql(test_db):
+    """With a cache, repeated lookups are served without SQL"""
+    from sqlalchemy import event
+    from backend.database.user_cache import UserLookupCache
+
+    repo = UserRepository(test_db, cache=UserLookupCache(ttl_seconds=60))
+    user = _create_user(repo, "kate")
+    assert repo.get_by_email("KATE@example.com").id == user.id  # miss -> cachea
+    test_db.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        by_id = repo.get_by_id(user.id)
+        by_username = repo.get_by_username("kate")
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert statements == []
+    assert by_id is by_username
+    assert by_id.roles == ["student"]
+
+
+def test_user_lookup_cache_invalidated_on_mutation(test_db):
+    """Mutations invalidate every cached key of the user"""
+    from backend.database.user_cache import UserLookupCache
+
+    cache = UserLookupCache(ttl_seconds=60)
+    repo = UserRepository(test_db, cache=cache)
+    user = _create_user(repo, "leo")
+    repo.get_by_id(user.id)
+    assert cache.get("username", "leo") is not None
+
+    repo.deactivate_user(user.id)
+
+    assert cache.get("id", user.id) is None
+    assert cache.get("email", "leo@example.com") is None
+    test_db.expunge_all()
+    assert repo.get_by_username("leo").is_active is False
+
+
+def test_snapshot_cache_ttl_lru_and_changed_key_invalidation():
+    """SnapshotCache (base de user/LTI caches): TTL, LRU y claves viejas en invalidate"""
+    from types import SimpleNamespace
+    from backend.database.snapshot_cache import SnapshotCache
+
+    cache = SnapshotCache(
+        snapshot_fn=lambda row: dict(vars(row)),
+        keys_fn=lambda snap: [("id", snap["id"]), ("name", snap["name"])],
+        max_size=4,
+        ttl_seconds=60,
+    )
+    ana = SimpleNamespace(id="1", name="ana")
+    cache.put(ana)
+    cache.put(SimpleNamespace(id="2", name="bob"))
+    cache.put(SimpleNamespace(id="3", name="eve"))  # desaloja las claves de "1"
+    assert cache.get("id", "1") is None
+    assert cache.get("name", "eve") == {"id": "3", "name": "eve"}
+
+    cache.put(ana)
+    ana.name = "anita"
+    cache.invalidate(ana)
+    assert cache.get("id", "1") is None
+    assert cache.get("name", "ana") is None
+
+    expired = SnapshotCache(lambda row: dict(vars(row)), lambda snap: [("id", snap["id"])], 4, -1)
+    expired.put(ana)
+    assert expired.get("id", "1") is None
+    assert expired.get_stats()["current_size"] == 0
+
+
+def test_user_verify_and_reactivate(user_repo):
+    """verify/deactivate/reactivate toggle flags via UPDATE ... RETURNING"""
+    user = _create_user(user_repo, "grace")
+
+    assert user_repo.verify_user(user.id).is_verified is True
+    assert user_repo.deactivate_user(user.id).is_active is False
+    assert user_repo.reactivate_user(user.id).is_active is True
+    assert user_repo.verify_user("missing") is None
+
+
+def test_user_get_by_role_excludes_inactive(user_repo):
+    """get_by_role only returns active users"""
+    user = _create_user(user_repo, "erin", ["admin"])
+    user_repo.deactivate_user(user.id)
+
+    assert user_repo.get_by_role("admin") == []
+
+
+def test_user_add_and_remove_role(user_repo):
+    """add_role/remove_role are idempotent and keep other roles"""
+    user = _create_user(user_repo, "frank", ["student"])
+
+    user_repo.add_role(user.id, "teacher")
+    user_repo.add_role(user.id, "teacher")
+    assert user_repo.get_by_id(user.id).roles == ["student", "teacher"]
+
+    user_repo.remove_role(user.id, "student")
+    assert user_repo.get_by_id(user.id).roles == ["teacher"]
+    assert user_repo.get_by_id(user.id).roles_set == frozenset({"teacher"})
+    assert user_repo.add_role("missing", "admin") is None
+
+
+def test_warm_statement_cache_populates_engine_cache(test_db):
+    """warm_statement_cache compiles the hot-path statements into the engine cache"""
+    from backend.database.repositories import warm_statement_cache
+
+    cache = test_db.get_bind()._compiled_cache
+    before = len(cache)
+
+    assert warm_statement_cache(test_db) == 9
+    assert len(cache) > before
+
+
+def test_user_ids_are_time_ordered_uuid7(user_repo):
+    """User IDs are UUIDv7: valid UUIDs that sort in creation order"""
+    ids = [_create_user(user_repo, f"user{i}").id for i in range(5)]
+
+    assert all(UUID(user_id).version == 7 for user_id in ids)
+    assert ids == sorted(ids)
+
+
+# ============================================================================
+# Sprint 5 Repositories Tests (alerts / remediation plans)
+# ============================================================================
+
+def _git_row(session_id, commit_hash, minute=0):
+    return dict(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        event_type="commit",
+        commit_hash=commit_hash,
+        commit_message=f"commit {commit_hash}",
+        author_name="Ana",
+        author_email="ana@example.com",
+        timestamp=datetime(2025, 1, 1, 10, minute),
+        branch_name="main",
+        parent_commits=[],
+        files_changed=[],
+    )
+
+
+def test_git_trace_bulk_create_skips_known_commits(test_db):
+    """bulk_create inserts all rows in one transaction and ignores duplicate hashes"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+
+    rows = [_git_row(session.id, f"{i:040x}", minute=i) for i in range(3)]
+    assert repo.bulk_create(rows) == 3
+    assert repo.bulk_create(rows[1:] + [_git_row(session.id, "f" * 40, minute=9)]) == 1
+
+    traces = repo.get_by_session(session.id)
+    assert [t.commit_hash for t in traces][-1] == "f" * 40
+    assert len(traces) == 4
+    assert traces[0].detected_patterns == []
+
+
+def test_git_trace_diff_stored_compressed(test_db):
+    """diff is compressed on write and transparently decompressed on read"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    diff = "+    return queue.pop(0)\n" * 200
+    repo.bulk_create([{**_git_row(session.id, "c" * 40), "diff": diff}])
+    test_db.expire_all()
+
+    trace = repo.get_by_commit_hash("c" * 40)
+
+    assert trace.diff == diff
+    assert trace.diff_text is None
+    assert len(trace.diff_compressed) < len(diff) // 5
+    assert "diff_compressed" not in trace.to_dict()
+
+
+def test_git_trace_iter_by_session_projects_timeline(test_db):
+    """iter_by_session streams only the timeline columns, oldest first"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create([_git_row(session.id, c * 40, minute=m) for c, m in (("b", 5), ("a", 1))])
+
+    rows = list(repo.iter_by_session(session.id))
+
+    assert [r["commit_hash"] for r in rows] == ["a" * 40, "b" * 40]
+    assert set(rows[0].keys()) == {"id", "event_type", "commit_hash", "timestamp", "commit_message"}
+    assert [r["commit_hash"] for r in repo.iter_by_student("student_001", limit=1)] == ["b" * 40]
+
+
+def test_git_trace_counts_by_student(test_db):
+    """count_by_student / count_by_students use SQL aggregates"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create([_git_row(session.id, c * 40) for c in "abc"])
+
+    assert repo.count_by_student("student_001") == 3
+    assert repo.count_by_students(["student_001", "student_002"]) == {
+        "student_001": 3,
+        "student_002": 0,
+    }
+    assert repo.count_by_students([]) == {}
+
+
+def test_git_trace_session_summary_and_daily_bins(test_db):
+    """summary_by_session / daily_activity_by_session aggregate in SQL"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create([
+        {**_git_row(session.id, "a" * 40), "total_lines_added": 10, "complexity_delta": 2},
+        {**_git_row(session.id, "b" * 40, minute=5), "total_lines_added": 5, "total_lines_deleted": 3},
+        {**_git_row(session.id, "c" * 40), "timestamp": datetime(2025, 1, 2, 9), "total_lines_added": 1},
+    ])
+
+    summary = repo.summary_by_session(session.id)
+    assert summary["commits"] == 3
+    assert (summary["lines_added"], summary["lines_deleted"], summary["complexity_delta"]) == (16, 3, 2)
+    assert summary["last_commit_at"] == datetime(2025, 1, 2, 9)
+
+    assert repo.daily_activity_by_session(session.id) == [
+        {"day": "2025-01-01", "commits": 2, "lines_added": 15, "lines_deleted": 3},
+        {"day": "2025-01-02", "commits": 1, "lines_added": 1, "lines_deleted": 0},
+    ]
+    assert repo.summary_by_session("missing")["commits"] == 0
+
+
+def test_git_trace_get_by_commit_hash_uses_cached_id(test_db):
+    """get_by_commit_hash resolves cached hashes through the identity map"""
+    from backend.core.cache import LRUCache
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db, commit_cache=LRUCache(max_size=10))
+    repo.bulk_create([_git_row(session.id, "a" * 40)])
+
+    first = repo.get_by_commit_hash("a" * 40)
+    assert repo.commit_cache.get_stats()["hits"] == 1
+    assert repo.get_by_commit_hash("a" * 40) is first
+    assert repo.get_by_commit_hash("b" * 40) is None
+
+    # Un id cacheado que no existe en esta base cae a la query por hash
+    stale = GitTraceRepository(test_db, commit_cache=LRUCache(max_size=10))
+    stale.commit_cache.set("a" * 40, "missing-id")
+    assert stale.get_by_commit_hash("a" * 40) is first
+
+
+def test_git_trace_get_by_pattern_and_file(test_db):
+    """get_by_pattern / get_by_file filter by JSON array containment"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create([
+        {**_git_row(session.id, "a" * 40), "detected_patterns": ["refactor"],
+         "files_changed": [{"file_path": "src/queue.py", "change_type": "modified"}]},
+        {**_git_row(session.id, "b" * 40, minute=1), "detected_patterns": ["bug_fix"],
+         "files_changed": [{"file_path": "src/stack.py", "change_type": "added"}]},
+    ])
+
+    assert [t.commit_hash for t in repo.get_by_pattern("refactor", "student_001")] == ["a" * 40]
+    assert [t.commit_hash for t in repo.get_by_file("src/stack.py", "student_001")] == ["b" * 40]
+    assert repo.get_by_pattern("refactor", "student_002") == []
+
+
+def test_git_trace_create_single_cached_insert(test_db):
+    """create() is one INSERT ... RETURNING served from the compiled cache"""
+    from sqlalchemy import event
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    row = _git_row(session.id, "a" * 40)
+    repo.create(**row)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        trace = repo.create(**{**row, "commit_hash": "b" * 40, "diff": "+x\n"})
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO git_traces")
+    assert trace.diff == "+x\n"
+    assert trace.detected_patterns == []
+    assert repo.get_by_commit_hash("b" * 40) is trace
+
+
+def test_git_trace_get_by_students_top_k(test_db):
+    """get_by_students returns the latest K commits per student in one query"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create(
+        [_git_row(session.id, c * 40, minute=m) for c, m in (("a", 1), ("b", 2), ("c", 3))]
+        + [{**_git_row(session.id, "d" * 40), "student_id": "student_002"}]
+    )
+
+    grouped = repo.get_by_students(["student_001", "student_002", "student_003"], limit_per_student=2)
+
+    assert [t.commit_hash for t in grouped["student_001"]] == ["c" * 40, "b" * 40]
+    assert [t.commit_hash for t in grouped["student_002"]] == ["d" * 40]
+    assert grouped["student_003"] == []
+    assert len(repo.get_by_students(["student_001"])["student_001"]) == 3
+
+
+def test_git_trace_authors_normalized(test_db):
+    """Commits by the same author share one git_authors row (author_id FK)"""
+    from backend.database.models import GitAuthorDB
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = GitTraceRepository(test_db)
+    repo.bulk_create([_git_row(session.id, c * 40) for c in "ab"])
+    repo.create(**_git_row(session.id, "c" * 40))
+    repo.create(**{**_git_row(session.id, "d" * 40), "author_name": "Ana M."})
+
+    traces = repo.get_by_session(session.id)
+    assert test_db.query(GitAuthorDB).count() == 2
+    assert len({t.author_id for t in traces}) == 2
+    assert traces[0].to_dict()["author_email"] == "ana@example.com"
+
+    row = next(repo.iter_by_session(session.id, columns=(GitTraceDB.id, *GIT_TRACE_AUTHOR_COLUMNS)))
+    assert row["author_name"] == "Ana"
+
+
+@pytest.fixture
+def alert_repo(test_db):
+    """Create a RiskAlertRepository instance"""
+    return RiskAlertRepository(test_db)
+
+
+def _create_alert(alert_repo, student_id="student_001", **kwargs):
+    defaults = dict(
+        alert_type="ai_dependency_spike",
+        severity="high",
+        scope="student",
+        title="AI dependency spike",
+        description="Dependencia de IA > 0.7 en 3 sesiones",
+        detection_rule="ai_dependency > 0.7 for 3+ sessions",
+        student_id=student_id,
+    )
+    defaults.update(kwargs)
+    return alert_repo.create(**defaults)
+
+
+def test_risk_alert_workflow_single_update(alert_repo):
+    """assign/acknowledge/resolve update the alert in place and return it"""
+    alert = _create_alert(alert_repo)
+
+    assert alert_repo.assign_to(alert.id, "teacher_001").assigned_to == "teacher_001"
+    acked = alert_repo.acknowledge(alert.id, "teacher_001")
+    assert acked.status == "acknowledged"
+    assert acked.acknowledged_at is not None
+
+    # Lookups repetidos se resuelven desde el identity map
+    assert alert_repo.get_by_id(alert.id) is acked
+
+    resolved = alert_repo.resolve(alert.id, "Tutoría realizada")
+    assert resolved.status == "resolved"
+    assert alert_repo.get_by_id(alert.id).resolution_notes == "Tutoría realizada"
+    assert alert_repo.mark_false_positive("missing") is None
+
+
+def test_risk_alert_updates_bump_updated_at(alert_repo, test_db):
+    """updated_at comes from the column onupdate inside the same UPDATE ... RETURNING"""
+    from sqlalchemy import event
+
+    alert = _create_alert(alert_repo)
+    alert_id, created_updated_at = alert.id, alert.updated_at
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        flagged = alert_repo.mark_false_positive(alert_id)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    # Una sola escritura (el SELECT posterior es el expire_on_commit del fixture)
+    assert statements[0].startswith("UPDATE risk_alerts")
+    assert "updated_at=" in statements[0].replace(" ", "")
+    assert flagged.status == "false_positive"
+    assert flagged.updated_at >= created_updated_at.replace(tzinfo=None)
+
+
+def test_risk_alert_create_issues_single_insert(alert_repo, test_db):
+    """create() no refresh SELECT: alert + outbox event in one transaction"""
+    from sqlalchemy import event
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        _create_alert(alert_repo)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    # El orden de los INSERT lo decide el unit of work (no hay FK entre ambas)
+    assert sorted(s.split("(")[0].strip() for s in statements) == [
+        "INSERT INTO outbox_events",
+        "INSERT INTO risk_alerts",
+    ]
+
+
+def test_outbox_dispatches_risk_alert_created(alert_repo, test_db):
+    """The dispatcher runs the handlers and deletes delivered events"""
+    from backend.database.models import OutboxEventDB
+    from backend.database.outbox import OutboxDispatcher
+
+    alert = _create_alert(alert_repo)
+    received = []
+    dispatcher = OutboxDispatcher()
+    dispatcher.register("risk_alert.created", received.append)
+
+    assert dispatcher.dispatch_pending(test_db) == 1
+    assert received[0]["alert_id"] == alert.id
+    assert test_db.query(OutboxEventDB).count() == 0
+
+
+def test_outbox_failed_handler_backs_off(alert_repo, test_db):
+    """A failing handler keeps the event and schedules a retry"""
+    from backend.database.models import OutboxEventDB
+    from backend.database.outbox import OutboxDispatcher
+
+    _create_alert(alert_repo)
+
+    def failing(payload):
+        raise RuntimeError("smtp down")
+
+    dispatcher = OutboxDispatcher()
+    dispatcher.register("risk_alert.created", failing)
+
+    assert dispatcher.dispatch_pending(test_db) == 0
+    event = test_db.query(OutboxEventDB).one()
+    assert event.attempts == 1
+    assert "smtp down" in event.last_error
+    # Reprogramado: no vuelve a despacharse hasta available_at
+    assert dispatcher.dispatch_pending(test_db) == 0
+    assert test_db.query(OutboxEventDB).one().attempts == 1
+
+
+def test_outbox_keeps_events_without_handlers(alert_repo, test_db):
+    """Events whose topic has no handler stay queued until one is registered"""
+    from backend.database.models import OutboxEventDB
+    from backend.database.outbox import OutboxDispatcher
+
+    _create_alert(alert_repo)
+    dispatcher = OutboxDispatcher()
+    dispatcher.register("other.topic", lambda payload: None)
+
+    assert dispatcher.dispatch_pending(test_db) == 0
+    assert test_db.query(OutboxEventDB).one().attempts == 0
+
+    received = []
+    dispatcher.register("risk_alert.created", received.append)
+    assert dispatcher.dispatch_pending(test_db) == 1
+    assert len(received) == 1
+
+
+def test_outbox_handlers_run_after_claim_commit(alert_repo, test_db):
+    """Handlers run outside the claim transaction, with the event leased"""
+    from backend.database.base import _utc_now
+    from backend.database.models import OutboxEventDB
+    from backend.database.outbox import OutboxDispatcher
+
+    _create_alert(alert_repo)
+    seen = []
+
+    def handler(payload):
+        seen.append(test_db.in_transaction())
+        leased_until = test_db.query(OutboxEventDB.available_at).scalar()
+        seen.append(leased_until > _utc_now().replace(tzinfo=None))
+        test_db.rollback()
+
+    dispatcher = OutboxDispatcher()
+    dispatcher.register("risk_alert.created", handler)
+
+    assert dispatcher.dispatch_pending(test_db) == 1
+    assert seen == [False, True]
+    assert test_db.query(OutboxEventDB).count() == 0
+
+
+def test_risk_alert_lists_raise_on_lazy_load(alert_repo):
+    """List queries use raiseload: relationship access fails instead of N+1"""
+    from sqlalchemy.exc import InvalidRequestError
+
+    _create_alert(alert_repo, severity="critical")
+    _create_alert(alert_repo, severity="low")
+
+    alerts = alert_repo.get_by_student("student_001")
+    assert len(alerts) == 2
+    assert [a.severity for a in alert_repo.get_by_severity("critical")] == ["critical"]
+    with pytest.raises(InvalidRequestError):
+        alerts[0].remediation_plan
+
+
+def test_risk_alert_get_by_evidence(alert_repo):
+    """get_by_evidence finds alerts whose evidence array cites an ID"""
+    cited = _create_alert(alert_repo, evidence=["risk_001", "risk_002"])
+    _create_alert(alert_repo, evidence=["risk_003"])
+
+    assert [a.id for a in alert_repo.get_by_evidence("risk_002")] == [cited.id]
+    assert alert_repo.get_by_evidence("risk_002", status="resolved") == []
+
+
+def test_risk_alert_get_by_students(alert_repo):
+    """get_by_students groups alerts per student with an optional status filter"""
+    _create_alert(alert_repo, "student_001")
+    resolved = _create_alert(alert_repo, "student_002")
+    alert_repo.resolve(resolved.id, "ok")
+
+    grouped = alert_repo.get_by_students(["student_001", "student_002"], status="open")
+
+    assert len(grouped["student_001"]) == 1
+    assert grouped["student_002"] == []
+
+
+def test_risk_alert_ids_are_uuid7(alert_repo):
+    """create() paths generate time-ordered UUIDv7 ids"""
+    ids = [_create_alert(alert_repo).id for _ in range(3)]
+
+    assert all(UUID(alert_id).version == 7 for alert_id in ids)
+    assert ids == sorted(ids)
+
+
+def test_base_repository_insert_reuses_statement(test_db):
+    """_insert() builds one INSERT ... RETURNING per model and fills a UUIDv7 id"""
+    from backend.database.models import RemediationPlanDB
+    from backend.database.repositories import _insert_returning
+
+    repo = RemediationPlanRepository(test_db)
+    fields = dict(
+        student_id="student_001",
+        teacher_id="teacher_001",
+        plan_type="tutoring",
+        description="Plan",
+        start_date=datetime(2025, 1, 1),
+        target_completion_date=datetime(2025, 2, 1),
+    )
+    first = repo._insert(RemediationPlanDB, **fields)
+    stmt = _insert_returning[RemediationPlanDB]
+    second = repo._insert(RemediationPlanDB, **fields)
+
+    assert _insert_returning[RemediationPlanDB] is stmt
+    assert UUID(first.id).version == 7
+    assert first.id < second.id
+    assert second.created_at is not None
+
+
+def test_unit_of_work_commits_once(test_db):
+    """Mutators inside unit_of_work() flush; only the block commits"""
+    from sqlalchemy import event
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = InterviewSessionRepository(test_db)
+
+    commits = []
+    listener = lambda *args: commits.append(1)
+    event.listen(test_db, "after_commit", listener)
+    try:
+        with unit_of_work(test_db):
+            interview = repo.create(session.id, "student_001", "CONCEPTUAL")
+            with unit_of_work(test_db):
+                repo.add_question(interview.id, {"question": "q1"})
+            repo.add_response(interview.id, {"response": "r1"})
+            assert commits == []
+    finally:
+        event.remove(test_db, "after_commit", listener)
+
+    assert len(commits) == 1
+    stored = repo.get_by_id(interview.id)
+    assert stored.questions_asked == [{"question": "q1"}]
+    assert stored.responses == [{"response": "r1"}]
+
+
+def test_unit_of_work_rolls_back_block(test_db):
+    """An exception inside unit_of_work() discards every write of the block"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = InterviewSessionRepository(test_db)
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(test_db):
+            repo.create(session.id, "student_001", "CONCEPTUAL")
+            raise RuntimeError("LLM failed")
+
+    assert repo.get_by_session(session.id) == []
+
+
+def test_interview_add_questions_bulk(test_db):
+    """add_questions_bulk appends every question, in order, with one INSERT"""
+    from sqlalchemy import event
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = InterviewSessionRepository(test_db)
+    interview_id = repo.create(
+        session.id, "student_001", "CONCEPTUAL", questions_asked=[{"question": "q0"}]
+    ).id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        repo.add_questions_bulk(interview_id, [{"question": "q1"}, {"question": "q2"}])
+        assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    stored = repo.get_by_id(interview_id)
+    assert [q["question"] for q in stored.questions_asked] == ["q0", "q1", "q2"]
+    assert repo.add_questions_bulk(interview_id, []) is stored
+
+
+def test_diagnosis_steps_append_as_rows(test_db):
+    """add_diagnosis_step touches the incident and inserts one row, without reading the history"""
+    from sqlalchemy import event
+
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = IncidentSimulationRepository(test_db)
+    incident_id = repo.create(session.id, "student_001", "API_ERROR", "500s en /login").id
+    repo.add_diagnosis_step(incident_id, {"step": 1, "action": "logs"})
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        updated = repo.add_diagnosis_step(incident_id, {"step": 2, "action": "metrics"})
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+    assert statements[1].startswith("INSERT INTO incident_diagnosis_steps")
+    assert [step["step"] for step in updated.diagnosis_process] == [1, 2]
+    assert repo.add_diagnosis_step("missing", {"step": 1}) is None
+
+
+def test_diagnosis_buffer_flushes_steps_in_batches(test_db):
+    """DiagnosisStepBuffer persists a burst of steps with one INSERT per incident"""
+    from sqlalchemy import event
+    from backend.database.diagnosis_buffer import DiagnosisStepBuffer
+
+    session_id = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR").id
+    repo = IncidentSimulationRepository(test_db)
+    incident_id = repo.create(session_id, "student_001", "API_ERROR", "500s en /login").id
+    repo.add_diagnosis_step(incident_id, {"step": 1})
+    buffer = DiagnosisStepBuffer()
+    for step in (2, 3, 4):
+        buffer.enqueue(incident_id, {"step": step})
+    buffer.enqueue("missing", {"step": 1})
+
+    test_db.expunge_all()
+    incident, pending = buffer.read(
+        incident_id, lambda: repo.get_by_id(incident_id, load_history=True)
+    )
+    assert [s["step"] for s in incident.diagnosis_process + pending] == [1, 2, 3, 4]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert buffer.flush(test_db) == 4
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert sum(s.startswith("INSERT INTO incident_diagnosis_steps") for s in statements) == 1
+    assert buffer.pending_count() == 0
+    test_db.expire_all()
+    assert [s["step"] for s in repo.get_by_id(incident_id).diagnosis_process] == [1, 2, 3, 4]
+    assert buffer.flush(test_db, incident_id) == 0
+
+
+def test_interview_page_by_student_keyset(test_db):
+    """page_by_student walks the history newest first with (created_at, id) cursors"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = InterviewSessionRepository(test_db)
+    ids = [repo.create(session.id, "student_001", "CONCEPTUAL").id for _ in range(5)]
+    repo.create(session.id, "student_002", "CONCEPTUAL")
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = repo.page_by_student("student_001", cursor=cursor, limit=2)
+        seen.append([interview.id for interview in page])
+        if cursor is None:
+            break
+
+    assert [len(p) for p in seen] == [2, 2, 1]
+    assert [i for p in seen for i in p] == ids[::-1]
+
+
+def test_interview_page_by_student_has_more_without_count(test_db):
+    """The LIMIT n+1 probe ends on the last full page, with no COUNT(*) query"""
+    from sqlalchemy import event
+
+    session_id = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR").id
+    repo = InterviewSessionRepository(test_db)
+    for _ in range(4):
+        repo.create(session_id, "student_001", "CONCEPTUAL")
+
+    statements = []
+    listener = lambda *args: statements.append(args[2].lower())
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        first, cursor = repo.page_by_student("student_001", limit=2)
+        second, cursor_after_last = repo.page_by_student("student_001", cursor=cursor, limit=2)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert (len(first), len(second)) == (2, 2)
+    assert cursor is not None and cursor_after_last is None
+    assert len(statements) == 2
+    assert not any("count(" in statement for statement in statements)
+
+
+def test_interview_iter_by_session_streams(test_db):
+    """iter_by_session yields the session's interviews in creation order"""
+    session = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR")
+    repo = InterviewSessionRepository(test_db)
+    ids = [repo.create(session.id, "student_001", kind).id for kind in ("CONCEPTUAL", "DESIGN")]
+
+    stream = repo.iter_by_session(session.id)
+
+    assert not isinstance(stream, list)
+    assert [interview.id for interview in stream] == ids
+    assert [interview.id for interview in repo.get_by_session(session.id)] == ids
+
+
+def test_interview_get_by_session_loads_history(test_db):
+    """load_history=True trae preguntas y respuestas con un selectinload por colección"""
+    from sqlalchemy import event
+
+    session_id = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR").id
+    repo = InterviewSessionRepository(test_db)
+    for n in range(3):
+        interview_id = repo.create(
+            session_id, "student_001", "CONCEPTUAL", questions_asked=[{"question": f"q{n}"}]
+        ).id
+        repo.add_response(interview_id, {"response": f"r{n}"})
+    test_db.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        interviews = repo.get_by_session(session_id, load_history=True)
+        histories = [(i.questions_asked, i.responses) for i in interviews]
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 3
+    assert histories == [
+        ([{"question": f"q{n}"}], [{"response": f"r{n}"}]) for n in range(3)
+    ]
+
+
+def test_interview_get_by_id_served_from_identity_map(test_db):
+    """Con expire_on_commit=False, get_by_id tras create/add_question no emite SQL"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session as OrmSession
+
+    db = OrmSession(bind=test_db.get_bind(), expire_on_commit=False)
+    repo = InterviewSessionRepository(db)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        interview = repo.create(
+            session_id="session_1", student_id="student_1", interview_type="CONCEPTUAL"
+        )
+        repo.add_question(interview.id, {"question": "¿Qué es una cola?"})
+        statements.clear()
+
+        loaded = repo.get_by_id(interview.id)
+        assert repo.get_by_id(interview.id) is loaded
+        assert statements == []
+        assert loaded is interview
+        # La colección de preguntas se expiró con el append: un SELECT de las filas hijas
+        assert loaded.questions_asked == [{"question": "¿Qué es una cola?"}]
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+        db.close()
+
+
+def test_lti_deployment_writes_single_statement(test_db):
+    """create/deactivate are one INSERT/UPDATE ... RETURNING, no refresh SELECT"""
+    from sqlalchemy import event
+
+    repo = LTIDeploymentRepository(test_db)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        deployment = repo.create(
+            platform_name="Moodle",
+            issuer="https://moodle.example.edu",
+            client_id="client",
+            deployment_id="1",
+            auth_login_url="https://moodle.example.edu/auth",
+            auth_token_url="https://moodle.example.edu/token",
+            public_keyset_url="https://moodle.example.edu/certs",
+        )
+        # (el fixture usa expire_on_commit: leer atributos después sí hace SELECT)
+        assert [s.split()[0] for s in statements] == ["INSERT"]
+        deployment_id = deployment.id
+
+        statements.clear()
+        deactivated = repo.deactivate(deployment_id)
+        assert [s.split()[0] for s in statements] == ["UPDATE"]
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert deactivated.is_active is False
+    assert repo.deactivate("missing") is None
+    assert repo.get_by_issuer_and_deployment("https://moodle.example.edu", "1").id == deployment_id
+    assert repo.get_by_issuer_and_deployment("https://moodle.example.edu", "2") is None
+
+
+def test_lti_session_link_to_session_single_update(test_db):
+    """link_to_session is one UPDATE ... RETURNING by primary key, no SELECT first"""
+    from sqlalchemy import event
+
+    lti_repo = LTISessionRepository(test_db)
+    lti_session_id = lti_repo.create(
+        deployment_id="deployment_1", lti_user_id="lti_user_1", resource_link_id="link_1"
+    ).id
+    session_id = SessionRepository(test_db).create("student_001", "prog2_tp1", "TUTOR").id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        linked = lti_repo.link_to_session(lti_session_id, session_id)
+        assert [s.split()[0] for s in statements] == ["UPDATE"]
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert linked.session_id == session_id
+    assert lti_repo.link_to_session("missing", session_id) is None
+
+
+def test_lti_session_create_is_idempotent_per_launch_token(test_db):
+    """A retried launch (same deployment + token) returns the existing session"""
+    from sqlalchemy import event, func, select
+    from backend.database.models import LTISessionDB
+
+    repo = LTISessionRepository(test_db)
+    launch = dict(
+        deployment_id="deployment_1",
+        lti_user_id="lti_user_1",
+        resource_link_id="link_1",
+        launch_token="eyJhbGciOiJSUzI1NiJ9.payload.signature",
+    )
+    first_id = repo.create(**launch).id
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        retried = repo.create(**launch)
+        assert [s.split()[0] for s in statements] == ["INSERT"]
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert retried.id == first_id
+    other_deployment = repo.create(**{**launch, "deployment_id": "deployment_2"})
+    assert other_deployment.id != first_id
+    repo.create(deployment_id="deployment_1", lti_user_id="lti_user_1", resource_link_id="link_1")
+    repo.create(deployment_id="deployment_1", lti_user_id="lti_user_1", resource_link_id="link_1")
+    assert test_db.execute(select(func.count()).select_from(LTISessionDB)).scalar() == 4
+
+
+def test_lti_deployment_lookup_cache(test_db):
+    """get_by_issuer_and_deployment serves hits without SQL; deactivate invalidates"""
+    from sqlalchemy import event
+    from backend.database.lti_cache import LTIDeploymentCache
+
+    repo = LTIDeploymentRepository(test_db, cache=LTIDeploymentCache())
+    deployment_id = repo.create(
+        platform_name="Moodle",
+        issuer="https://moodle.example.edu",
+        client_id="client",
+        deployment_id="1",
+        auth_login_url="https://moodle.example.edu/auth",
+        auth_token_url="https://moodle.example.edu/token",
+        public_keyset_url="https://moodle.example.edu/certs",
+    ).id
+    repo.get_by_issuer_and_deployment("https://moodle.example.edu", "1")
+    test_db.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        cached = repo.get_by_issuer_and_deployment("https://moodle.example.edu", "1")
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert statements == []
+    assert cached.id == deployment_id and cached.is_active is True
+
+    repo.deactivate(deployment_id)
+    assert repo.cache.get("https://moodle.example.edu", "1") is None
+    assert repo.get_by_issuer_and_deployment("https://moodle.example.edu", "1").is_active is False
+
+
+def test_gin_indexes_only_on_filtered_json_columns():
+    """GIN solo en los arrays JSON que los repositorios filtran por containment"""
+    gin_columns = {
+        (table.name, column.name)
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.dialect_options["postgresql"]["using"] == "gin"
+        for column in index.columns
+    }
+
+    assert gin_columns == {
+        ("users", "roles"),
+        ("git_traces", "detected_patterns"),
+        ("git_traces", "files_changed"),
+        ("course_reports", "at_risk_students"),
+        ("remediation_plans", "trigger_risks"),
+        ("risk_alerts", "evidence"),
+    }
+
+
+def test_active_deployments_use_partial_index(test_db):
+    """iter_active_deployments se resuelve con el índice parcial de filas activas"""
+    from sqlalchemy import select
+
+    stmt = (
+        select(LTIDeploymentDB)
+        .where(LTIDeploymentDB.is_active == True)
+        .order_by(LTIDeploymentDB.platform_name)
+    )
+    compiled = stmt.compile(test_db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = test_db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+    plan = " ".join(str(row[-1]) for row in rows)
+
+    assert "idx_lti_deployment_active" in plan
+
+
+def test_remediation_plan_update_status_and_complete(test_db):
+    """update_status/complete_plan persist optional fields only when given"""
+    repo = RemediationPlanRepository(test_db)
+    plan = repo.create(
+        student_id="student_001",
+        teacher_id="teacher_001",
+        plan_type="tutoring",
+        description="Plan de tutoría",
+        start_date=datetime(2025, 1, 1),
+        target_completion_date=datetime(2025, 2, 1),
+    )
+
+    updated = repo.update_status(plan.id, "in_progress", progress_notes="Primera sesión")
+    assert updated.status == "in_progress"
+    assert updated.actual_completion_date is None
+
+    completed = repo.complete_plan(plan.id, "Objetivos alcanzados")
+    assert completed.status == "completed"
+    assert completed.actual_completion_date is not None
+    assert completed.progress_notes == "Primera sesión"
+    assert repo.update_status("missing", "cancelled") is None
+
+
 # ============================================================================
 # Transaction and Error Handling Tests
 # ============================================================================
@@ -741,6 +741,27 @@ class TestIncidentSimulator:
 
                     assert response.status_code == 200
 
+    def test_diagnose_persists_step_before_responding(self, client, test_db, sample_session):
+        """Sin write-behind el paso queda en la BD al responder (cualquier worker lo ve)"""
+        from backend.database.repositories import IncidentSimulationRepository
+        from backend.database.diagnosis_buffer import get_diagnosis_buffer
+
+        repo = IncidentSimulationRepository(test_db)
+        incident = repo.create(sample_session.id, "test-student", "API_ERROR", "500s en /login")
+
+        response = client.post("/api/v1/simulators/incident/diagnose", json={
+            "incident_id": incident.id,
+            "action": "Revisar logs de la API",
+            "finding": "Error 500 en /login",
+        })
+
+        assert response.status_code == 200
+        assert len(response.json()["data"]["diagnosis_process"]) == 1
+        assert get_diagnosis_buffer().pending(incident.id) == []
+        test_db.expire_all()
+        steps = repo.get_by_id(incident.id, load_history=True).diagnosis_process
+        assert [step["action"] for step in steps] == ["Revisar logs de la API"]
+
     def test_get_incident_not_found(self, client):
         """Test getting non-existent incident"""
         with patch('backend.api.routers.simulators.IncidentSimulationRepository') as mock_repo:
@@ -0,0 +1,110 @@
+"""
+Tests for structured logging
+
+Tests para backend/core/structured_logging.py
+
+Verifica:
+1. ContextQueueHandler captura el contexto de request al encolar
+2. stop_queue_logging() drena la cola y restaura los handlers originales
+3. Sin handlers no se instala la cola (se conserva logging.lastResort)
+4. Con la cola activa sobre otro logger no se instala nada
+"""
+
+import logging
+
+import pytest
+
+from backend.core import structured_logging
+from backend.core.structured_logging import (
+    ContextQueueHandler,
+    clear_request_context,
+    set_request_context,
+    start_queue_logging,
+    stop_queue_logging,
+)
+
+
+class _ListHandler(logging.Handler):
+    """Handler que guarda (mensaje, request_id) de cada record"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), getattr(record, "request_id", None)))
+
+
+@pytest.fixture
+def target_logger():
+    """Logger aislado (fuera del manager, sin propagate): ni pytest ni el root le agregan handlers"""
+    logger = logging.Logger("tests.structured_logging", logging.INFO)
+    logger.propagate = False
+    stop_queue_logging()  # la app puede haber dejado la cola instalada sobre el root
+    yield logger
+    stop_queue_logging()
+    clear_request_context()
+
+
+def test_queue_handler_captures_request_context_at_enqueue():
+    """El contexto se copia al record en el thread que loguea, no en el listener"""
+    import queue
+
+    log_queue = queue.SimpleQueue()
+    handler = ContextQueueHandler(log_queue)
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "user %s", ("ana",), None)
+
+    set_request_context("req-1", correlation_id="corr-1", user_id="user-1")
+    handler.emit(record)
+    clear_request_context()
+
+    queued = log_queue.get_nowait()
+    assert queued.getMessage() == "user ana"
+    assert queued.args is None
+    assert (queued.request_id, queued.correlation_id, queued.user_id) == (
+        "req-1", "corr-1", "user-1"
+    )
+
+
+def test_stop_queue_logging_drains_and_restores_handlers(target_logger):
+    """stop_queue_logging() entrega los records pendientes y repone los handlers"""
+    sink = _ListHandler()
+    target_logger.addHandler(sink)
+
+    listener = start_queue_logging(target_logger)
+    assert listener is not None
+    assert start_queue_logging(target_logger) is listener  # idempotente
+    assert target_logger.handlers != [sink]
+
+    set_request_context("req-42")
+    for i in range(50):
+        target_logger.info("event %d", i)
+    clear_request_context()
+
+    stop_queue_logging()
+
+    assert target_logger.handlers == [sink]
+    assert [message for message, _ in sink.records] == [f"event {i}" for i in range(50)]
+    assert {request_id for _, request_id in sink.records} == {"req-42"}
+
+
+def test_start_queue_logging_without_handlers_is_noop(target_logger):
+    """Sin handlers no hay cola: WARNING+ sigue llegando a logging.lastResort"""
+    assert start_queue_logging(target_logger) is None
+    assert target_logger.handlers == []
+    assert structured_logging._queue_logging is None
+
+
+def test_start_queue_logging_on_other_logger_returns_none(target_logger):
+    """Un solo listener por proceso: otro target no recibe (ni comparte) la cola"""
+    sink = _ListHandler()
+    target_logger.addHandler(sink)
+    other = logging.Logger("tests.structured_logging.other", logging.INFO)
+    other_sink = _ListHandler()
+    other.addHandler(other_sink)
+
+    listener = start_queue_logging(target_logger)
+    assert listener is not None
+    assert start_queue_logging(other) is None
+    assert other.handlers == [other_sink]
+    assert start_queue_logging(target_logger) is listener